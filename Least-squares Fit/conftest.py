@@ -0,0 +1,9 @@
+"""
+Makes hubble_fit, in the repository root, importable for the tests of
+the scripts in this directory.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
@@ -4,20 +4,41 @@ and generates a plot displaying the data points with error bars and the best-fit
 It imports the necessary libraries, including functions from `linear_fit.py` and loads
 the filtered grouped data from the csv file. It performs a weighted least-squares linear fit
 using uncertainties in `v`. Finally, it plots the grouped data with error bars and overlays the
-best-fit line.
+best-fit line, next to the 1, 2 and 3 sigma confidence contours of the
+intercept and slope. The saved figure of --output shows only the data and
+the fit, without the contours.
 
 Dependencies:
 - `linear_fit.py`: This script requires the `linear_fit` and `read_data_from_csv` functions.
 - `grouped_data_filtered.csv`: The filtered data output file produced by the
 `grouped_data_generator.py` script.
+- `hubble_fit.contours`: chi squared surface of the fit for the confidence
+  contours.
+- `hubble_fit.render`: headless figures that aggregate large data into
+  binned means or a 2-D density image before drawing.
+
+Importing the module has no side effects and does not load matplotlib; run
+it as a script to show the plot, or to save it without a display:
+    python "Least-squares Fit/fit_and_plot.py" --output fit.png --mode density
 
 """
 
+import argparse
 import csv
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
 from linear_fit import linear_fit
 
+if __name__ == '__main__':
+    # Run as a script only this directory is importable; importers are
+    # expected to have the repository root (hubble_fit) on their path.
+    sys.path.insert(0, os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), os.pardir))
+from hubble_fit.contours import confidence_region  # noqa: E402
+from hubble_fit.render import MODES, render_fit  # noqa: E402
+
 # Path to the filtered CSV file created by grouped_data_generator.py
 CSV_FILE_PATH = 'Least-squares Fit/grouped_data_filtered.csv'
 
@@ -45,24 +66,89 @@ def read_data_from_csv(file_path):
 
     return {'distances': distances, 'velocities': velocities, 'sigmas': sigmas}
 
-# Use read_data_from_csv function to load the filtered data
-x, y, sigma = read_data_from_csv(CSV_FILE_PATH)
-
-# Perform the linear fit using linear_fit function
-fit_results = linear_fit(x, y, sigma)
-print(fit_results)
-
-# Generate plot with fit line and parameters
-x_fit = np.linspace(min(x), max(x), 100)
-y_fit = fit_results['intercept'] + fit_results['slope'] * x_fit
-
-plt.figure(figsize=(8, 6))
-plt.errorbar(x, y, yerr=sigma, fmt='o', color='purple', label='Grouped Data with Uncertainties')
-plt.plot(x_fit, y_fit, color='red',
-          label=f'Best Fit Line: v = {fit_results["intercept"]:.2f} + {fit_results["slope"]:.2f}*r')
-plt.xlabel('r ($10^6$ parsecs)')
-plt.ylabel('v (km/s)')
-plt.title('Grouped Data with Least-Squares Fit')
-plt.legend(loc='upper left')
-plt.grid(True)
-plt.show()
+
+def plot_confidence_contours(ax, x, y, sigma, n_sigma=(1, 2, 3)):
+    """
+    Draws the joint confidence contours of the intercept and slope.
+
+    Parameters:
+    ax (matplotlib Axes): The axes to draw on.
+    x, y, sigma (list): Distances, velocities and uncertainties of the
+      velocities.
+    n_sigma (sequence of int): Contours, in standard deviations.
+
+    Returns:
+    dict: The confidence region from hubble_fit.contours.confidence_region.
+    """
+    region = confidence_region(x, y, sigma, n_sigma=n_sigma)
+    contours = ax.contour(region['intercepts'], region['slopes'],
+                          region['chi_squared'], levels=region['levels'],
+                          colors=['red', 'orange', 'gold'])
+    ax.clabel(contours, fmt={level: f'{k}$\\sigma$'
+                             for level, k in zip(region['levels'],
+                                                 sorted(n_sigma))})
+    ax.plot(region['fit']['intercept'], region['fit']['slope'], '+',
+            color='purple')
+    ax.set_xlabel('Intercept (km/s)')
+    ax.set_ylabel('Slope (km/s/Mpc)')
+    ax.set_title('Confidence Contours of the Fit')
+    return region
+
+
+def main(argv=None):
+    """
+    Fits the grouped data and shows the plot, or with --output renders it
+    headlessly to a file (aggregating large data, see hubble_fit.render).
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--csv', default=CSV_FILE_PATH,
+                        help='CSV file with x, y and sigma')
+    parser.add_argument('--output',
+                        help='save the figure to this file instead of '
+                        'showing it')
+    parser.add_argument('--mode', default='auto', choices=MODES,
+                        help='how to draw the data in the saved figure')
+    parser.add_argument('--bins', type=int, default=50,
+                        help='bins of the binned and density modes')
+    args = parser.parse_args(argv)
+
+    # Use read_data_from_csv function to load the filtered data
+    data = read_data_from_csv(args.csv)
+    x, y, sigma = data['distances'], data['velocities'], data['sigmas']
+
+    if args.output is not None:
+        fit_results = render_fit(x, y, sigma, args.output, mode=args.mode,
+                                 bins=args.bins,
+                                 title='Grouped Data with Least-Squares Fit')
+        print(fit_results)
+        return
+
+    # pyplot (and a display) is only needed to show the plot
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    # Perform the linear fit using linear_fit function
+    fit_results = linear_fit(x, y, sigma)
+    print(fit_results)
+
+    # Generate plot with fit line and parameters
+    x_fit = np.linspace(min(x), max(x), 100)
+    y_fit = fit_results['intercept'] + fit_results['slope'] * x_fit
+
+    _, (data_ax, contour_ax) = plt.subplots(1, 2, figsize=(14, 6))
+    data_ax.errorbar(x, y, yerr=sigma, fmt='o', color='purple',
+                     label='Grouped Data with Uncertainties')
+    data_ax.plot(x_fit, y_fit, color='red',
+                 label=f'Best Fit Line: v = {fit_results["intercept"]:.2f}'
+                 f' + {fit_results["slope"]:.2f}*r')
+    data_ax.set_xlabel('r ($10^6$ parsecs)')
+    data_ax.set_ylabel('v (km/s)')
+    data_ax.set_title('Grouped Data with Least-Squares Fit')
+    data_ax.legend(loc='upper left')
+    data_ax.grid(True)
+    plot_confidence_contours(contour_ax, x, y, sigma)
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,23 +5,34 @@ iglesias-cardinale (github ID: 112112966). This module calculates grouped averag
 and uncertainties, and saves the results to a CSV file for further analysis.
 
 Main steps:
-1. Import required libraries.
-2. Load and extract relevant columns (OBJECT, r, and v) from raw data.
-3. Apply group labels based on predefined groups.
-4. Calculate mean values and uncertainties for each group.
-5. Filter out rows with undefined uncertainties and save the final processed data to CSV.
+1. Load the relevant columns (OBJECT, r, and v) from raw data
+   (hubble_fit.tables.read_markdown_table, typed NumPy columns in one pass).
+2. Apply group labels based on predefined groups.
+3. Calculate mean values and uncertainties for each group
+   (hubble_fit.grouping.group_statistics, one bincount pass per sum).
+4. Filter out rows with undefined uncertainties and save the final processed data to CSV.
+
+Importing the module has no side effects and does not load pandas; run it as
+a script to write the CSV:
+    python "Least-squares Fit/grouped_data_generator.py"
 """
 
-import pandas as pd
-import numpy as np
+import os
+import sys
+
+if __name__ == '__main__':
+    # The script's directory is on the path, but not the repository root.
+    sys.path.insert(0, os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), os.pardir))
+from hubble_fit.grouping import group_statistics  # noqa: E402
+from hubble_fit.tables import read_markdown_table  # noqa: E402
 
-# Read the data and extract relevant columns
-file_path_grouped = 'Least-squares Fit/raw_data_table1_grouped.md'
-data_grouped = pd.read_csv(file_path_grouped, delim_whitespace=True)
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+INPUT_PATH = os.path.join(DIRECTORY, 'raw_data_table1_grouped.md')
+OUTPUT_PATH = os.path.join(DIRECTORY, 'grouped_data_filtered.csv')
 
-# Extract OBJECT, r, and v columns and apply group labels
-object_r_v_columns_grouped = data_grouped[['OBJECT', 'r', 'v']]
-group_labels = {
+# Group label of every object in the OBJECT column
+GROUP_LABELS = {
     "'S.Mag.'": 'Group 1', "'L.Mag.'": 'Group 1',
     '598': 'Group 2', '221': 'Group 2', '224': 'Group 2',
     '1068': 'Group 3',
@@ -33,24 +44,31 @@ group_labels = {
     "'N.G.C.6822'": 'Group 7',
     '7331': 'Group 8'
 }
-object_r_v_columns_grouped['Group'] = object_r_v_columns_grouped['OBJECT'].map(group_labels)
-
-# Calculate mean r, v, and uncertainty of v for each group without filtering
-group_means = object_r_v_columns_grouped.groupby('Group')[['r', 'v']].mean()
-group_std = object_r_v_columns_grouped.groupby('Group')['v'].std()
-group_size = object_r_v_columns_grouped.groupby('Group')['v'].count()
-group_uncertainty_v = group_std / np.sqrt(group_size)
-
-# Create the initial unfiltered data table
-group_summary_unfiltered = pd.DataFrame({
-    'x': group_means['r'],
-    'y': group_means['v'],
-    'sigma': group_uncertainty_v
-}).reset_index()
-
-# Apply filtering to remove rows with NaN in 'sigma' and create filtered data table
-group_summary_filtered = group_summary_unfiltered.dropna(subset=['sigma'])
-
-# Save the filtered data to CSV file
-output_path_filtered = 'Least-squares Fit/grouped_data_filtered.csv'
-group_summary_filtered.to_csv(output_path_filtered, index=False)
+
+
+def group_table(file_path=INPUT_PATH, label_map=None):
+    """
+    Reads the whitespace separated table and returns the group summary.
+
+    Parameters:
+    file_path (str): Path to the table with OBJECT, r and v columns.
+    label_map (dict): Object name to group label; GROUP_LABELS if None.
+
+    Returns:
+    pandas.DataFrame: Columns 'Group', 'x' (mean r), 'y' (mean v) and 'sigma'
+    (standard error of v) for every group with more than one member.
+    """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+    if label_map is None:
+        label_map = GROUP_LABELS
+    data = read_markdown_table(file_path, columns=['OBJECT', 'r', 'v'],
+                               dtypes={'OBJECT': str})
+    summary = group_statistics(data['OBJECT'], data['r'], data['v'],
+                               label_map)
+    return pd.DataFrame({'Group': summary['group'], 'x': summary['x'],
+                         'y': summary['y'], 'sigma': summary['sigma']})
+
+
+if __name__ == '__main__':
+    # Save the filtered data to CSV file
+    group_table().to_csv(OUTPUT_PATH, index=False)
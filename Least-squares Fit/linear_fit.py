@@ -1,7 +1,7 @@
 """ This code was written by dnxjay (github ID: 181004305). I have added it to this directory
-to import it to my main script to produce a least-squares fit """
-
-import pandas as pd
+to import it to my main script to produce a least-squares fit.
+Importing it loads no third-party modules; pandas is imported by
+read_data_from_csv. """
 
 def read_data_from_csv(filename):
     """
@@ -13,6 +13,7 @@ def read_data_from_csv(filename):
     Returns:
         tuple: Three lists containing x, y, and sigma values.
     """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
     df = pd.read_csv(filename)
     x = df['x'].tolist()
     y = df['y'].tolist()
@@ -75,7 +76,9 @@ def linear_fit(x, y, sigma):
     }
 
 # Usage example
-filename = 'data.csv'
-x, y, sigma = read_data_from_csv(filename)
-result = linear_fit(x, y, sigma)
-print("Results:", result)
+# Only runs when run directly, so importing the module has no side effects.
+if __name__ == "__main__":
+    filename = 'data.csv'
+    x, y, sigma = read_data_from_csv(filename)
+    result = linear_fit(x, y, sigma)
+    print("Results:", result)
@@ -36,4 +36,5 @@ def test_read_data_from_csv():
         # Clean up the temporary CSV file
         os.remove(test_csv_path)
 
-test_read_data_from_csv()
+if __name__ == '__main__':
+    test_read_data_from_csv()
@@ -3,10 +3,36 @@
 this is for if i have the constant already if not ill need
 to revies it, since the hubbles constant is velocity moving
 away from earth over distance from earth it shouldnt be hard
+
+age_array does the same for whole arrays of Hubble constants
+(e.g. Monte Carlo samples) and converts to years or Gyr in the
+same single division.
 """
 
+import numpy as np
+
+MEGPAR_TO_KM = 3.09 * (10 ** 19)
+# Seconds per unit of age_array (Julian years).
+SECONDS_PER_UNIT = {'s': 1.0, 'yr': 3.15576e7, 'Gyr': 3.15576e16}
+
 
 def age(hub_cons):
     """So for this it takes Hubbles cons and outputs the age"""
-    MEGPAR_TO_KM = 3.09 * (10 ** 19)  # pylint: disable=C0103
     return MEGPAR_TO_KM * (hub_cons ** (-1))
+
+
+def age_array(hub_cons, unit='s', out=None):
+    """
+    Age of the universe for every Hubble constant in an array.
+
+    Parameters:
+    - hub_cons (numpy array): Hubble constants in km/s/Mpc.
+    - unit (str): 's', 'yr' or 'Gyr'.
+    - out (numpy array, optional): Where to write the ages; may be
+      hub_cons itself, so no temporary array is made.
+
+    Returns:
+    - numpy array of the ages (out if given).
+    """
+    factor = MEGPAR_TO_KM / SECONDS_PER_UNIT[unit]
+    return np.divide(factor, hub_cons, out=out)
@@ -0,0 +1,283 @@
+"""
+Benchmarks every implementation of the straight-line fit in this repository
+across input sizes and dtypes, and checks the timings against a stored
+baseline.
+
+Backends:
+- dict_maker: fit_param.dict_maker (unweighted, NumPy).
+- fit: pseudo_code/linear_fit.fit (pure Python, lists).
+- linear_fit: Least-squares Fit/linear_fit.linear_fit (pure Python, lists).
+- compute_with_cython: cython/code/compute (needs the built extension).
+- parallel_compute_with_cython: the OpenMP kernel of the same module.
+- fit_batch: hubble_fit.fit_batch with a single series (NumPy).
+
+For each backend the size grows until one call takes longer than
+--max-seconds; larger sizes are recorded as skipped ('time'), as are sizes
+whose inputs would not fit in a quarter of the physical memory ('memory').
+Each timing is the best of --repeat calls, throughput is points per second
+of that call, and the peak memory is the tracemalloc peak of one extra call
+(Python and NumPy allocations; list inputs are built before measuring).
+
+Usage (from the repository root):
+    python benchmarks/bench_fitters.py --output results.json
+    python benchmarks/bench_fitters.py --baseline benchmarks/baseline.json
+    python benchmarks/bench_fitters.py --output benchmarks/baseline.json
+
+Exits with status 1 if a timing is slower than the baseline by more than
+--tolerance.
+"""
+
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [10**i for i in range(1, 9)]
+
+
+def load_module(name, relative_path):
+    """
+    Imports the file at relative_path (from the repository root) as name,
+    or returns None if it cannot be imported.
+    """
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except (ImportError, FileNotFoundError):
+        return None
+    return module
+
+
+def load_compute():
+    """
+    The compiled compute module, or None if it has not been built.
+    """
+    sys.path.insert(0, os.path.join(ROOT, 'cython', 'code'))
+    try:
+        import compute    # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    finally:
+        sys.path.pop(0)
+    return compute
+
+
+def adapt(function, call):
+    """
+    Marks call, which calls function with (x, y, sigma), as wrapping it, so
+    profilers can find the fit function behind a backend.
+    """
+    call.__wrapped__ = function
+    return call
+
+
+def backends():
+    """
+    Dictionary of backend name -> (function(x, y, sigma), input kind), for
+    the backends that can be imported. The input kind is 'list' or 'array'.
+    Functions that adapt the arguments have the fit function as
+    __wrapped__.
+    """
+    sys.path.insert(0, ROOT)
+    found = {}
+    fit_param = load_module('fit_param', 'fit_param.py')
+    if fit_param is not None:
+        found['dict_maker'] = (adapt(
+            fit_param.dict_maker,
+            lambda x, y, sigma: fit_param.dict_maker(y, x)), 'array')
+    pseudo = load_module('pseudo_linear_fit', 'pseudo_code/linear_fit.py')
+    if pseudo is not None:
+        found['fit'] = (pseudo.fit, 'list')
+    least = load_module('least_squares_linear_fit',
+                        'Least-squares Fit/linear_fit.py')
+    if least is not None:
+        found['linear_fit'] = (least.linear_fit, 'list')
+    compute = load_compute()
+    if compute is not None:
+        found['compute_with_cython'] = (compute.compute_with_cython, 'array')
+        found['parallel_compute_with_cython'] = (
+            compute.parallel_compute_with_cython, 'array')
+    try:
+        from hubble_fit import fit_batch    # pylint: disable=C0415
+    except ImportError:
+        pass
+    else:
+        found['fit_batch'] = (adapt(
+            fit_batch,
+            lambda x, y, sigma: fit_batch(x[None], y[None], sigma[None])),
+            'array')
+    return found
+
+
+def physical_memory():
+    """
+    Physical memory in bytes, or None where it cannot be determined.
+    """
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def make_data(size, dtype, seed=0):
+    """
+    Seeded Hubble-like data: distances, velocities and their errors.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0.0, 2.0, size).astype(dtype)
+    sigma = rng.uniform(50.0, 150.0, size).astype(dtype)
+    y = (500.0 * x + rng.normal(0.0, 100.0, size)).astype(dtype)
+    return x, y, sigma
+
+
+def machine_info():
+    """
+    Date, versions and hardware the results were measured with.
+    """
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def measure(function, args, repeat):
+    """
+    Best wall time of repeat calls and the tracemalloc peak of one call.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(names=None, sizes=None, dtypes=('float64', 'float32'), repeat=3,
+        max_seconds=2.0):
+    """
+    Runs the benchmarks and returns the result document (see module
+    docstring); names selects backends, all available ones if None.
+    """
+    available = backends()
+    names = list(available) if names is None else names
+    memory = physical_memory()
+    results = []
+    for dtype in dtypes:
+        for name in names:
+            function, kind = available[name]
+            too_slow = False
+            for size in sizes or DEFAULT_SIZES:
+                record = {'backend': name, 'size': size, 'dtype': dtype}
+                # Inputs are 3 arrays of size points, generated (and mostly
+                # processed) as float64; a list of floats takes 4 times that.
+                needed = 3 * size * (32 if kind == 'list' else 8)
+                if too_slow or (memory and needed > memory / 4):
+                    record['skipped'] = 'time' if too_slow else 'memory'
+                    results.append(record)
+                    continue
+                args = make_data(size, dtype)
+                if kind == 'list':
+                    args = [a.tolist() for a in args]
+                seconds, peak = measure(function, args, repeat)
+                del args
+                record.update(seconds=seconds, throughput=size / seconds,
+                              peak_bytes=peak)
+                results.append(record)
+                too_slow = seconds > max_seconds
+    return {'meta': machine_info(), 'results': results}
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Timings more than tolerance (a fraction) slower than the baseline.
+
+    Returns:
+    - list of dictionaries with backend, size, dtype, seconds, baseline
+      seconds and ratio, one per regression.
+    """
+    reference = {(r['backend'], r['size'], r['dtype']): r['seconds']
+                 for r in baseline['results'] if 'seconds' in r}
+    regressions = []
+    for record in results['results']:
+        key = (record['backend'], record['size'], record['dtype'])
+        if 'seconds' not in record or key not in reference:
+            continue
+        ratio = record['seconds'] / reference[key]
+        if ratio > 1 + tolerance:
+            regressions.append({'backend': key[0], 'size': key[1],
+                                'dtype': key[2],
+                                'seconds': record['seconds'],
+                                'baseline': reference[key], 'ratio': ratio})
+    return regressions
+
+
+def print_table(results):
+    """
+    Prints the results as a plain text table.
+    """
+    print(f"{'backend':30} {'dtype':8} {'size':>10} {'seconds':>10} "
+          f"{'points/s':>10} {'peak MB':>8}")
+    for r in results['results']:
+        if r.get('skipped'):
+            continue
+        print(f"{r['backend']:30} {r['dtype']:8} {r['size']:>10} "
+              f"{r['seconds']:>10.3g} {r['throughput']:>10.3g} "
+              f"{r['peak_bytes'] / 2**20:>8.1f}")
+
+
+def main(argv=None):
+    """
+    Command line entry point; returns the exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--backends', nargs='+', help='backends to run')
+    parser.add_argument('--sizes', nargs='+', type=int, help='input sizes')
+    parser.add_argument('--dtypes', nargs='+',
+                        default=['float64', 'float32'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=2.0)
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run(args.backends, args.sizes, args.dtypes, args.repeat,
+                  args.max_seconds)
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['backend']} {r['dtype']} n={r['size']}: "
+                  f"{r['seconds']:.3g} s vs {r['baseline']:.3g} s "
+                  f"({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Measures how long importing the fitting code takes and checks that imports
+have no side effects.
+
+Every target is imported in a fresh interpreter (python -I), so nothing is
+cached between measurements. For each target the child process reports:
+- seconds: wall time of the import statement alone.
+- process_seconds: wall time of the whole process (interpreter start-up,
+  import and exit), as seen by short-lived workers and command line calls.
+- modules: number of modules the import loaded.
+- loaded: which of WATCHED (NumPy, pandas, matplotlib, the compiled
+  compute extension, SciPy) the import loaded.
+- opened: files other than modules and their bytecode caches that the
+  import opened (sys audit hook), i.e. any I/O the import did.
+Timings are the best of --repeat processes.
+
+Usage (from the repository root):
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --budget 0.05 --output imports.json
+
+Exits with status 1 if an import loads one of HEAVY, opens a file, or
+(with --budget) takes longer than the budget in seconds.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import bench_fitters as bench
+
+ROOT = bench.ROOT
+SCRIPTS = os.path.join(ROOT, 'Least-squares Fit')
+
+# Import statement and extra sys.path entries of every target.
+TARGETS = {
+    'numpy': ('import numpy', []),
+    'hubble_fit': ('import hubble_fit', []),
+    'hubble_fit.fit': ('from hubble_fit import fit', []),
+    'hubble_fit.read_markdown_table':
+        ('from hubble_fit import read_markdown_table', []),
+    'hubble_fit.render_fit': ('from hubble_fit import render_fit', []),
+    'hubble_fit.client': ('from hubble_fit.client import FitClient', []),
+    'linear_fit': ('import linear_fit', [SCRIPTS]),
+    'fit_and_plot': ('import fit_and_plot', [SCRIPTS]),
+    'grouped_data_generator': ('import grouped_data_generator', [SCRIPTS]),
+}
+WATCHED = ('numpy', 'pandas', 'matplotlib', 'compute', 'scipy')
+# Modules that only the functions needing them may import.
+HEAVY = ('pandas', 'matplotlib', 'compute', 'scipy')
+
+CHILD = """
+import json, sys, time
+opened = []
+def audit(event, args):
+    if event == 'open' and isinstance(args[0], str) \\
+            and not args[0].endswith(('.py', '.pyc', '.so', '.pyd')) \\
+            and '__pycache__' not in args[0]:
+        opened.append(args[0])
+sys.addaudithook(audit)
+sys.path[:0] = {paths!r}
+before = len(sys.modules)
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': seconds, 'modules': len(sys.modules) - before,
+    'loaded': [name for name in {watched!r} if name in sys.modules],
+    'opened': opened}}))
+"""
+
+
+def measure(statement, paths, repeat):
+    """
+    Best import and process times of repeat fresh interpreters running
+    statement, with what the last one loaded and opened.
+    """
+    code = CHILD.format(statement=statement, paths=[ROOT] + paths,
+                        watched=WATCHED)
+    result = {'seconds': float('inf'), 'process_seconds': float('inf')}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-I', '-c', code],
+                                cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout
+        process_seconds = time.perf_counter() - start
+        child = json.loads(output)
+        result.update(child, seconds=min(result['seconds'],
+                                         child['seconds']),
+                      process_seconds=min(result['process_seconds'],
+                                          process_seconds))
+    return result
+
+
+def run(names=None, repeat=5):
+    """
+    Measures the targets (all if names is None) and returns the results
+    with the machine information.
+    """
+    results = []
+    for name in names or TARGETS:
+        statement, paths = TARGETS[name]
+        results.append(dict(measure(statement, paths, repeat), target=name))
+    return {'machine': bench.machine_info(), 'results': results}
+
+
+def check(results, budget=None):
+    """
+    Problems of the results: heavy modules loaded, files opened and (if
+    budget is given) imports slower than budget seconds.
+    """
+    problems = []
+    for r in results['results']:
+        heavy = [name for name in r['loaded'] if name in HEAVY]
+        if heavy:
+            problems.append(f"{r['target']} imports {', '.join(heavy)}")
+        if r['opened']:
+            problems.append(f"{r['target']} opens {', '.join(r['opened'])}")
+        if budget is not None and r['seconds'] > budget:
+            problems.append(f"{r['target']} takes {r['seconds']:.3g} s "
+                            f"(budget {budget:.3g} s)")
+    return problems
+
+
+def print_table(results):
+    """
+    Prints the results as a plain text table.
+    """
+    print(f"{'target':32} {'import ms':>10} {'process ms':>11} "
+          f"{'modules':>8}  loaded")
+    for r in results['results']:
+        print(f"{r['target']:32} {r['seconds'] * 1e3:>10.1f} "
+              f"{r['process_seconds'] * 1e3:>11.1f} {r['modules']:>8}  "
+              f"{', '.join(r['loaded']) or '-'}")
+
+
+def main(argv=None):
+    """
+    Command line entry point; returns the exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS),
+                        help='imports to measure')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float,
+                        help='largest import time in seconds')
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args(argv)
+
+    results = run(args.targets, args.repeat)
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=1)
+    problems = check(results, args.budget)
+    for problem in problems:
+        print(f"PROBLEM {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""
+Profiles one fit backend of bench_fitters.py on seeded data.
+
+The backend runs on make_data(size, dtype, seed) in separate passes, so the
+instrumentation of one pass does not distort the others:
+- timing: best wall (perf_counter) and CPU (process_time, all threads)
+  time of --repeat calls; CPU time above wall time means several threads.
+- memory: tracemalloc peak of one call.
+- cProfile: the --top functions by cumulative time.
+- stacks: wall time of every call stack, recorded with sys.setprofile and
+  written in the folded format of flamegraph.pl and speedscope
+  ('outer;inner;leaf microseconds', one stack per line).
+- lines (--lines): self time and hits of every line of the backend's
+  source file, recorded with sys.settrace. For the Cython backends this
+  needs compute built with CYTHON_LINETRACE=1 (see cython/code/setup.py),
+  and then covers the cdef helpers of compute.pyx as well.
+The tracing passes slow Python-level code down much more than compiled
+code, so their times are for comparing hot spots, not for benchmarking.
+
+Usage (from the repository root):
+    python benchmarks/profile_fitters.py compute_with_cython --size 10000000
+    python benchmarks/profile_fitters.py fit --size 100000 --lines \\
+        --output fit.json --stacks fit.folded
+    python benchmarks/profile_fitters.py fit --compare fit.json
+"""
+
+import argparse
+import collections
+import cProfile
+import json
+import linecache
+import os
+import pstats
+import sys
+import time
+
+import bench_fitters as bench
+
+
+def profile(name, size=10**6, dtype='float64', seed=0, repeat=3, top=20,
+            lines=False, pstats_path=None):
+    """
+    Profiles the backend called name.
+
+    Parameters:
+    - name (str): Backend name, see bench_fitters.backends.
+    - size (int): Number of data points.
+    - dtype (str): dtype of the data.
+    - seed (int): Seed of the data.
+    - repeat (int): Timed calls; the best is reported.
+    - top (int): Number of functions reported from cProfile.
+    - lines (bool): Also record the time of every source line.
+    - pstats_path (str, optional): Where to write the cProfile statistics
+      (for pstats or snakeviz).
+
+    Returns:
+    - Dictionary with 'meta', 'backend', 'size', 'dtype', 'seed',
+      'wall_seconds', 'cpu_seconds', 'peak_bytes', 'functions' (see
+      function_rows), 'stacks' (folded stack -> microseconds) and 'lines'
+      (see line_times, None unless lines is set).
+
+    Defined Errors:
+    - Unknown or unavailable backend (KeyError).
+    """
+    available = bench.backends()
+    if name not in available:
+        raise KeyError(f"Backend {name!r} is not available; choose from "
+                       f"{', '.join(available)}.")
+    function, kind = available[name]
+    args = bench.make_data(size, dtype, seed)
+    if kind == 'list':
+        args = [a.tolist() for a in args]
+
+    wall, cpu = time_calls(function, args, repeat)
+    peak = bench.measure(function, args, 0)[1]    # Only the traced call.
+    stats = cprofile_stats(function, args)
+    if pstats_path:
+        stats.dump_stats(pstats_path)
+    return {
+        'meta': bench.machine_info(),
+        'backend': name, 'size': size, 'dtype': dtype, 'seed': seed,
+        'wall_seconds': wall, 'cpu_seconds': cpu, 'peak_bytes': peak,
+        'functions': function_rows(stats, top),
+        'stacks': folded_stacks(function, args),
+        'lines': line_times(function, args) if lines else None,
+    }
+
+
+def time_calls(function, args, repeat):
+    """
+    Best wall time and best CPU time of repeat calls of function(*args).
+    """
+    wall = cpu = float('inf')
+    for _ in range(max(repeat, 1)):
+        start, start_cpu = time.perf_counter(), time.process_time()
+        function(*args)
+        wall = min(wall, time.perf_counter() - start)
+        cpu = min(cpu, time.process_time() - start_cpu)
+    return wall, cpu
+
+
+def cprofile_stats(function, args):
+    """
+    pstats.Stats of one call of function(*args) under cProfile.
+    """
+    profiler = cProfile.Profile()
+    profiler.runcall(function, *args)
+    return pstats.Stats(profiler)
+
+
+def function_rows(stats, top=20, sort='cumulative'):
+    """
+    The top functions of stats as dictionaries with 'function'
+    ('file:line(name)'), 'calls', 'primitive_calls', 'tottime' and
+    'cumtime', sorted by sort (a pstats sort key).
+    """
+    stats.sort_stats(sort)
+    rows = []
+    for key in stats.fcn_list[:top]:
+        primitive, calls, tottime, cumtime, _ = stats.stats[key]
+        rows.append({'function': _function_label(key), 'calls': calls,
+                     'primitive_calls': primitive, 'tottime': tottime,
+                     'cumtime': cumtime})
+    return rows
+
+
+def folded_stacks(function, args):
+    """
+    Wall time spent in every call stack during function(*args).
+
+    Returns:
+    - Dictionary of stack (frame labels from the outermost, separated by
+      ';') -> self time in whole microseconds, at least 1 so that every
+      stack that ran is listed. Calls of C functions, and of Cython
+      functions built with profiling, are frames of their own.
+    """
+    times = collections.Counter()
+    stack = []
+    last = [time.perf_counter()]
+
+    def tracer(frame, event, arg):
+        now = time.perf_counter()
+        if stack:
+            times[';'.join(stack)] += now - last[0]
+        if event == 'call':
+            stack.append(_code_label(frame.f_code))
+        elif event == 'c_call':
+            stack.append(_c_label(arg))
+        elif stack and event in ('return', 'c_return', 'c_exception'):
+            stack.pop()
+        last[0] = time.perf_counter()
+
+    sys.setprofile(tracer)
+    try:
+        function(*args)
+    finally:
+        sys.setprofile(None)
+    return {key: max(round(seconds * 1e6), 1)
+            for key, seconds in times.items()}
+
+
+def line_times(function, args, files=None):
+    """
+    Self time and hits of every executed line of files during
+    function(*args). Time spent in functions of other files counts towards
+    the calling line; time in traced functions counts towards their own
+    lines.
+
+    Parameters:
+    - files (set of str, optional): Source files to trace, as in
+      code.co_filename; the file of the fit function behind function if
+      None.
+
+    Returns:
+    - List of dictionaries with 'file', 'function', 'line', 'hits',
+      'seconds' and 'source', sorted by decreasing seconds.
+    """
+    target = getattr(function, '__wrapped__', function)
+    if files is None:
+        files = {target.__code__.co_filename}
+    seconds = collections.Counter()
+    hits = collections.Counter()
+    frames = []    # [line key or None, start] of the traced frames
+
+    def local(frame, event, arg):
+        key, start = frames[-1]
+        if key is not None:
+            seconds[key] += time.perf_counter() - start
+        if event == 'line':
+            key = (frame.f_code.co_filename, frame.f_code.co_name,
+                   frame.f_lineno)
+            hits[key] += 1
+        if event == 'return':
+            frames.pop()
+            if frames:
+                frames[-1][1] = time.perf_counter()
+        else:
+            frames[-1] = [key, time.perf_counter()]
+        return local
+
+    def tracer(frame, event, arg):
+        if frame.f_code.co_filename not in files:
+            return None
+        if frames and frames[-1][0] is not None:
+            seconds[frames[-1][0]] += time.perf_counter() - frames[-1][1]
+        frames.append([None, time.perf_counter()])
+        return local
+
+    sys.settrace(tracer)
+    try:
+        function(*args)
+    finally:
+        sys.settrace(None)
+
+    directory = os.path.dirname(getattr(sys.modules.get(target.__module__),
+                                        '__file__', '') or '')
+    rows = []
+    for key in sorted(hits, key=lambda k: -seconds[k]):
+        file, name, line = key
+        path = file if os.path.isabs(file) else os.path.join(directory, file)
+        rows.append({'file': file, 'function': name, 'line': line,
+                     'hits': hits[key], 'seconds': seconds[key],
+                     'source': linecache.getline(path, line).strip()})
+    return rows
+
+
+def compare(report, baseline, top=20):
+    """
+    Functions of report whose total time (tottime) changed most from
+    baseline, another report of profile.
+
+    Returns:
+    - List of up to top dictionaries with 'function', 'tottime',
+      'baseline' and 'change' (seconds, positive if slower), with 0.0 for
+      functions missing from one of the reports.
+    """
+    new = {r['function']: r['tottime'] for r in report['functions']}
+    old = {r['function']: r['tottime'] for r in baseline['functions']}
+    rows = [{'function': f, 'tottime': new.get(f, 0.0),
+             'baseline': old.get(f, 0.0),
+             'change': new.get(f, 0.0) - old.get(f, 0.0)}
+            for f in set(new) | set(old)]
+    rows.sort(key=lambda r: -abs(r['change']))
+    return rows[:top]
+
+
+def write_folded(stacks, path):
+    """
+    Writes stacks (see folded_stacks) to path, one 'stack count' line each.
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        for stack, count in sorted(stacks.items()):
+            file.write(f'{stack} {count}\n')
+
+
+def print_report(report, lines=10):
+    """
+    Prints the timings, the cProfile functions and the slowest lines.
+    """
+    print(f"{report['backend']} {report['dtype']} n={report['size']} "
+          f"seed={report['seed']}: wall {report['wall_seconds']:.4g} s, "
+          f"CPU {report['cpu_seconds']:.4g} s, "
+          f"peak {report['peak_bytes'] / 2**20:.1f} MB")
+    print(f"\n{'calls':>10} {'tottime':>10} {'cumtime':>10}  function")
+    for r in report['functions']:
+        print(f"{r['calls']:>10} {r['tottime']:>10.4g} {r['cumtime']:>10.4g}"
+              f"  {r['function']}")
+    if report['lines']:
+        print(f"\n{'hits':>10} {'seconds':>10}  line")
+        for r in report['lines'][:lines]:
+            print(f"{r['hits']:>10} {r['seconds']:>10.4g}  "
+                  f"{os.path.basename(r['file'])}:{r['line']}"
+                  f"({r['function']}) {r['source']}")
+
+
+def main(argv=None):
+    """
+    Command line entry point; returns the exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('backend', help='backend to profile')
+    parser.add_argument('--size', type=int, default=10**6)
+    parser.add_argument('--dtype', default='float64')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--lines', action='store_true',
+                        help='record the time of every source line')
+    parser.add_argument('--output', help='write the report as JSON')
+    parser.add_argument('--stacks', help='write the folded stacks')
+    parser.add_argument('--pstats', help='write the cProfile statistics')
+    parser.add_argument('--compare', help='JSON report to compare with')
+    args = parser.parse_args(argv)
+
+    try:
+        report = profile(args.backend, args.size, args.dtype, args.seed,
+                         args.repeat, args.top, args.lines, args.pstats)
+    except KeyError as exc:
+        print(exc.args[0], file=sys.stderr)
+        return 2
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=1)
+    if args.stacks:
+        write_folded(report['stacks'], args.stacks)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            changes = compare(report, json.load(file), args.top)
+        print(f"\n{'tottime':>10} {'baseline':>10} {'change':>10}  function")
+        for r in changes:
+            print(f"{r['tottime']:>10.4g} {r['baseline']:>10.4g} "
+                  f"{r['change']:>+10.4g}  {r['function']}")
+    return 0
+
+
+def _function_label(key):
+    file, line, name = key
+    if file == '~':    # Built-in functions.
+        return name
+    return f'{os.path.basename(file)}:{line}({name})'
+
+
+def _code_label(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:' \
+           f'{code.co_firstlineno})'
+
+
+def _c_label(function):
+    module = getattr(function, '__module__', None)
+    name = getattr(function, '__qualname__', repr(function))
+    return f'{module}.{name}' if module else name
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Provides unit testing for the benchmark suite in bench_fitters.py.
+"""
+import bench_fitters as bench
+
+
+def test_small_run():
+    """
+    A tiny run times every available backend and records skipped sizes.
+    """
+    results = bench.run(sizes=[10, 100], dtypes=['float64'], repeat=1,
+                        max_seconds=0.0)
+    names = set(bench.backends())
+    assert {'dict_maker', 'fit', 'linear_fit', 'fit_batch'} <= names
+    timed = [r for r in results['results'] if 'seconds' in r]
+    skipped = [r for r in results['results'] if r.get('skipped')]
+    assert {r['backend'] for r in timed} == names
+    assert all(r['size'] == 10 and r['throughput'] > 0 for r in timed)
+    assert all(r['size'] == 100 and r['skipped'] == 'time' for r in skipped)
+
+
+def test_compare():
+    """
+    Only timings slower than the baseline by more than the tolerance
+    are reported, and unknown entries are ignored.
+    """
+    baseline = {'results': [
+        {'backend': 'fit', 'size': 10, 'dtype': 'float64', 'seconds': 1.0},
+        {'backend': 'fit', 'size': 100, 'dtype': 'float64', 'seconds': 1.0},
+    ]}
+    results = {'results': [
+        {'backend': 'fit', 'size': 10, 'dtype': 'float64', 'seconds': 1.2},
+        {'backend': 'fit', 'size': 100, 'dtype': 'float64', 'seconds': 2.0},
+        {'backend': 'fit', 'size': 1000, 'dtype': 'float64', 'seconds': 9.0},
+        {'backend': 'fit', 'size': 10, 'dtype': 'float32', 'skipped': 'time'},
+    ]}
+    regressions = bench.compare(results, baseline, tolerance=0.25)
+    assert [(r['size'], r['ratio']) for r in regressions] == [(100, 2.0)]
@@ -0,0 +1,35 @@
+"""
+Provides unit testing for the import benchmark in bench_imports.py.
+"""
+import bench_imports as bench
+
+
+def test_imports_have_no_side_effects():
+    """
+    The package and the scripts import without loading pandas,
+    matplotlib or the compiled extension and without opening files; the
+    package alone loads nothing heavier than itself.
+    """
+    names = ['hubble_fit', 'hubble_fit.fit', 'linear_fit', 'fit_and_plot',
+             'grouped_data_generator']
+    results = bench.run(names, repeat=1)
+    assert [r['target'] for r in results['results']] == names
+    assert bench.check(results) == []
+    package = results['results'][0]
+    assert package['loaded'] == []
+    assert 0 < package['seconds'] < package['process_seconds']
+    assert 'numpy' in results['results'][1]['loaded']
+
+
+def test_check():
+    """
+    Heavy modules, opened files and imports over the budget are reported.
+    """
+    results = {'results': [
+        {'target': 'a', 'seconds': 0.01, 'loaded': ['numpy'], 'opened': []},
+        {'target': 'b', 'seconds': 0.2, 'loaded': ['numpy', 'pandas'],
+         'opened': ['data.csv']},
+    ]}
+    assert bench.check(results) == ['b imports pandas', 'b opens data.csv']
+    assert bench.check(results, budget=0.1)[-1] == \
+        'b takes 0.2 s (budget 0.1 s)'
@@ -0,0 +1,58 @@
+"""
+Provides unit testing for the profiling harness in profile_fitters.py.
+"""
+import pytest
+
+import profile_fitters as prof
+
+
+def test_profile(tmp_path):
+    """
+    A profile of the pure Python fit has timings, cProfile rows, stacks
+    and line timings of linear_fit.py, and is reproducible for a seed.
+    """
+    path = tmp_path / 'fit.prof'
+    report = prof.profile('fit', size=200, seed=1, repeat=1, top=5,
+                          lines=True, pstats_path=str(path))
+    assert report['wall_seconds'] > 0 and report['cpu_seconds'] >= 0
+    assert path.exists()
+    assert 0 < len(report['functions']) <= 5
+    assert any('(fit)' in r['function'] for r in report['functions'])
+    assert all(s.split(';')[0].startswith('fit (linear_fit.py:')
+               for s in report['stacks'])
+    assert all(isinstance(t, int) and t > 0
+               for t in report['stacks'].values())
+    lines = report['lines']
+    assert {r['file'] for r in lines} == {lines[0]['file']}
+    assert lines[0]['file'].endswith('linear_fit.py')
+    assert any(r['hits'] == 200 and 'sigma[i]' in r['source']
+               for r in lines)
+    again = prof.profile('fit', size=200, seed=1, repeat=1)
+    assert again['lines'] is None
+    assert set(again['stacks']) == set(report['stacks'])
+
+
+def test_unknown_backend():
+    """
+    Unknown backends are reported with the available ones.
+    """
+    with pytest.raises(KeyError, match='fit_batch'):
+        prof.profile('no_such_fitter', size=10)
+
+
+def test_compare_and_folded(tmp_path):
+    """
+    compare orders functions by the size of the change, and write_folded
+    writes one 'stack count' line per stack.
+    """
+    old = {'functions': [{'function': 'a', 'tottime': 1.0},
+                         {'function': 'b', 'tottime': 1.0}]}
+    new = {'functions': [{'function': 'a', 'tottime': 1.5},
+                         {'function': 'c', 'tottime': 3.0}]}
+    changes = prof.compare(new, old)
+    assert [(r['function'], r['change']) for r in changes] == \
+        [('c', 3.0), ('b', -1.0), ('a', 0.5)]
+
+    path = tmp_path / 'stacks.folded'
+    prof.write_folded({'f (x.py:1);g (x.py:5)': 7, 'f (x.py:1)': 2}, path)
+    assert path.read_text() == 'f (x.py:1) 2\nf (x.py:1);g (x.py:5) 7\n'
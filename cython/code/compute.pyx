@@ -5,110 +5,480 @@ containing computed values or an error indicator. Specifically, it processes inp
 to perform calculations and supports returning detailed results or error information,
 depending on the success of execution.
 
+All kernels read the data through typed memoryviews in a single pass, updating the
+weighted means and centred sums of squares point by point (a weighted Welford update).
+float32 and float64 arrays are accepted through a fused type, as are strided and
+read-only (e.g. memory-mapped) arrays, without copying.
+
 Dependencies:
     - numpy: Used for handling array operations efficiently.
     - typing: For type annotations in the function signature.
 """
 
 
+import os
 import numpy as np
 cimport numpy as np
+cimport cython
+from cython cimport floating
+from cython.parallel cimport prange
+from libc.math cimport fabs, sqrt
+from libc.stdlib cimport malloc, free
 from typing import Dict
 
+
+# Running statistics of a weighted straight-line fit: the sum of the weights
+# (S), the weighted means of x and y and the weighted sums of products of the
+# deviations from those means. c_xx equals s_tt of the pseudo-code.
+cdef struct Moments:
+    Py_ssize_t count
+    double S
+    double mean_x
+    double mean_y
+    double c_xx
+    double c_xy
+    double c_yy
+    int bad_sigma
+
+
+cdef inline void _reset(Moments* m) noexcept nogil:
+    m.count = 0
+    m.S = 0.0
+    m.mean_x = 0.0
+    m.mean_y = 0.0
+    m.c_xx = 0.0
+    m.c_xy = 0.0
+    m.c_yy = 0.0
+    m.bad_sigma = 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef void _accumulate(
+    const floating[:] x,
+    const floating[:] y,
+    const floating[:] sigma,
+    Py_ssize_t lo,
+    Py_ssize_t hi,
+    Moments* m
+    ) noexcept nogil:
+    # Adds points lo..hi-1 to m in one pass; stops if a sigma is too small.
+    cdef Py_ssize_t i
+    cdef double w, xi, yi, dx, dy
+    for i in range(lo, hi):
+        # make sure sigma is large enough
+        if fabs(sigma[i]) < 0.00001:
+            m.bad_sigma = 1
+            return
+        w = 1.0 / (<double>sigma[i] * sigma[i])
+        xi = x[i]
+        yi = y[i]
+        m.S += w
+        dx = xi - m.mean_x
+        dy = yi - m.mean_y
+        m.mean_x += dx * w / m.S
+        m.mean_y += dy * w / m.S
+        m.c_xx += w * dx * (xi - m.mean_x)
+        m.c_xy += w * dx * (yi - m.mean_y)
+        m.c_yy += w * dy * (yi - m.mean_y)
+    m.count += hi - lo
+
+
+@cython.cdivision(True)
+cdef inline void _merge(Moments* a, const Moments* b) noexcept nogil:
+    # Adds the statistics of b to a (Chan, Golub and LeVeque).
+    cdef double total, delta_x, delta_y, factor
+    a.bad_sigma = a.bad_sigma or b.bad_sigma
+    if b.count == 0:
+        return
+    if a.count == 0:
+        a[0] = b[0]
+        return
+    total = a.S + b.S
+    delta_x = b.mean_x - a.mean_x
+    delta_y = b.mean_y - a.mean_y
+    factor = a.S * b.S / total
+    a.c_xx += b.c_xx + delta_x * delta_x * factor
+    a.c_xy += b.c_xy + delta_x * delta_y * factor
+    a.c_yy += b.c_yy + delta_y * delta_y * factor
+    a.mean_x += delta_x * b.S / total
+    a.mean_y += delta_y * b.S / total
+    a.S = total
+    a.count += b.count
+
+
+# Relative size of the spread of x below which the x values count as equal
+# (the rest is rounding, e.g. from removed points of a rolling window).
+# hubble_fit/dispatch.py uses the same tolerance.
+cdef double EQUAL_X_TOLERANCE = 1e-12
+
+
+cdef int _finish(const Moments* m, double* out, bint verbose=True) noexcept:
+    # Writes intercept, slope, sigma_a, sigma_b and chi2 to out.
+    # Returns -1 (after printing the reason if verbose) if the fit is
+    # undefined.
+    cdef double b, s_x
+    if m.bad_sigma:
+        if verbose:
+            print("Error! Sigma too small!")
+        return -1
+    # Check error size
+    if fabs(m.S) < 0.000001:
+        if verbose:
+            print("Error! Error too small!")
+        return -1
+    if m.c_xx <= EQUAL_X_TOLERANCE * (m.c_xx + m.S * m.mean_x * m.mean_x):
+        if verbose:
+            print("Error! All x values are equal!")
+        return -1
+    s_x = m.S * m.mean_x
+    b = m.c_xy / m.c_xx
+    out[0] = m.mean_y - b * m.mean_x
+    out[1] = b
+    out[2] = sqrt((1 + s_x * s_x / (m.S * m.c_xx)) / m.S)
+    out[3] = sqrt(1.0 / m.c_xx)
+    # chi2 is the weighted residual sum of squares; rounding can leave a
+    # tiny negative value for a perfect fit.
+    out[4] = max(m.c_yy - b * m.c_xy, 0.0)
+    return 0
+
+
+@cython.cdivision(True)
+cdef inline void _add(Moments* m, double w, double xi, double yi) noexcept nogil:
+    # Adds one point to m, as one step of _accumulate.
+    cdef double dx = xi - m.mean_x
+    cdef double dy = yi - m.mean_y
+    m.count += 1
+    m.S += w
+    m.mean_x += dx * w / m.S
+    m.mean_y += dy * w / m.S
+    m.c_xx += w * dx * (xi - m.mean_x)
+    m.c_xy += w * dx * (yi - m.mean_y)
+    m.c_yy += w * dy * (yi - m.mean_y)
+
+
+@cython.cdivision(True)
+cdef inline void _remove(Moments* m, double w, double xi, double yi) noexcept nogil:
+    # Takes one point out of m, undoing _add.
+    cdef double rest, old_x, old_y
+    m.count -= 1
+    rest = m.S - w
+    if m.count == 0 or rest <= 0.0:
+        _reset(m)
+        return
+    old_x = m.mean_x
+    old_y = m.mean_y
+    m.mean_x -= (xi - old_x) * w / rest
+    m.mean_y -= (yi - old_y) * w / rest
+    m.c_xx -= w * (xi - m.mean_x) * (xi - old_x)
+    m.c_xy -= w * (xi - m.mean_x) * (yi - old_y)
+    m.c_yy -= w * (yi - m.mean_y) * (yi - old_y)
+    m.S = rest
+
+
+cdef dict _as_dict(const double* out):
+    return {
+        'intercept': out[0],
+        'slope': out[1],
+        'sigma_a': out[2],
+        'sigma_b': out[3],
+        'chi_squared': out[4]
+    }
+
+
+# Number of points per block. The blocks depend only on the data length, so
+# the order in which partial results are merged, and therefore the result,
+# is the same for any number of threads.
+cdef Py_ssize_t BLOCK_SIZE = 16384
+
+
 # Compute with Cython
-# This function returns a double OR None if there is an error
+# This function returns a dict of doubles OR {"error": -1} if there is an error
 # (note the use of the typing module)
 def compute_with_cython(
-    np.ndarray[np.float64_t, ndim=1] x,
-    np.ndarray[np.float64_t, ndim=1] y,
-    np.ndarray[np.float64_t, ndim=1] sigma
+    const floating[:] x,
+    const floating[:] y,
+    const floating[:] sigma,
+    bint verbose=True
     ) -> Dict[str, float]:
     """
-       Processes input arrays x, y, and params with optimized Cython performance,
-       performing calculations and returning results or an error indicator.
+       Processes input arrays x, y, and sigma with optimized Cython performance,
+       performing a weighted least-squares straight-line fit in one pass over the data.
 
        Args:
-           x (np.ndarray[np.float64_t, ndim=1]): 1D array of float values representing
-               the primary dataset for processing.
-           y (np.ndarray[np.float64_t, ndim=1]): 1D array of float values representing
-               secondary data to complement x in computations.
-           params (np.ndarray[np.float64_t, ndim=1]): 1D array of float values containing
-               parameters used to modulate or control the calculations applied to x and y.
+           x (np.ndarray[float32 or float64, ndim=1]): 1D array of x values. May be
+               strided or read-only.
+           y (np.ndarray[float32 or float64, ndim=1]): 1D array of y values, same
+               dtype as x.
+           sigma (np.ndarray[float32 or float64, ndim=1]): 1D array of the
+               uncertainties of y, same dtype as x.
+           verbose (bool): whether the reason of an error is printed.
 
        Returns:
-           Dict[str, np.ndarray]: A dictionary containing computed values based on x, y,
-               and params if successful, or an error dictionary with a sentinel value of -1
-               under the key "e" to signal an error during execution.
-
-       Raises:
-           ValueError: If input arrays have mismatched lengths or do not meet processing
-               requirements.
+           Dict[str, float]: A dictionary with the keys 'intercept', 'slope',
+               'sigma_a', 'sigma_b' and 'chi_squared' if successful, or an error
+               dictionary with a sentinel value of -1 under the key "error" to
+               signal an error during execution.
        """
     # Get the length of the array
-    cdef int n = x.shape[0]
+    cdef Py_ssize_t n = x.shape[0]
+    cdef Py_ssize_t j, lo
+    cdef Moments m, block
+    cdef double out[5]
 
     # Check that it has more than 2 elements
     if n < 2:
-        print("Error! Not enough data!")
+        if verbose:
+            print("Error! Not enough data!")
         return {"error": -1}
     # make sure the arrays are the same size
-    if n != y.shape[0]:
-        print("Error! Data length mismatch!")
+    if n != y.shape[0] or n != sigma.shape[0]:
+        if verbose:
+            print("Error! Data length mismatch!")
+        return {"error": -1}
+
+    # single fused loop, merged block by block as in
+    # parallel_compute_with_cython (which keeps rounding errors small)
+    _reset(&m)
+    with nogil:
+        for j in range((n + BLOCK_SIZE - 1) // BLOCK_SIZE):
+            lo = j * BLOCK_SIZE
+            _reset(&block)
+            _accumulate(x, y, sigma, lo, min(lo + BLOCK_SIZE, n), &block)
+            _merge(&m, &block)
+
+    if _finish(&m, out, verbose) < 0:
         return {"error": -1}
+    return _as_dict(out)
 
-    # Define some vars for the first loop
-    cdef double S = 0.0
-    cdef double s_x = 0.0
-    cdef double s_y = 0.0
 
-    # Define some vars for the second loop
-    cdef double t_i = 0.0
-    cdef double s_tt = 0.0
-    cdef double b = 0.0          # slope
+# Structured dtype of the array returned by batch_compute_with_cython
+FIT_DTYPE = np.dtype([
+    ('intercept', np.float64),
+    ('slope', np.float64),
+    ('sigma_a', np.float64),
+    ('sigma_b', np.float64),
+    ('chi_squared', np.float64),
+])
 
-    # Define post-loop vars
-    cdef double a = 0.0          # intercept
-    cdef double sigma_a = 0.0
-    cdef double sigma_b = 0.0
-    cdef double chi2 = 0.0       # chi SQUARED
 
-    # first loop
-    for i in range(x.shape[0]):
-        # make sure sigma is large enough
-        if abs(sigma[i]) < 0.00001:
-            print("Error! Sigma too small!")
+def batch_compute_with_cython(
+    const floating[:] x,
+    const floating[:] y,
+    const floating[:] sigma,
+    const np.intp_t[:] offsets
+    ):
+    """
+       Fits many independent series stored back to back in x, y and sigma,
+       running the single-pass kernel of compute_with_cython once per series.
+
+       Args:
+           x (np.ndarray[float32 or float64, ndim=1]): concatenated x values of
+               all series.
+           y (np.ndarray[float32 or float64, ndim=1]): concatenated y values.
+           sigma (np.ndarray[float32 or float64, ndim=1]): concatenated
+               uncertainties of y.
+           offsets (np.ndarray[np.intp_t, ndim=1]): m + 1 indices; series j
+               is x[offsets[j]:offsets[j + 1]].
+
+       Returns:
+           np.ndarray: structured array (FIT_DTYPE) with one row per series,
+               or an error dictionary with a sentinel value of -1 under the
+               key "error" if any series can not be fitted.
+       """
+    cdef Py_ssize_t m = offsets.shape[0] - 1
+    cdef Py_ssize_t n = x.shape[0]
+    cdef Py_ssize_t j
+    cdef Moments moments
+    cdef double out[5]
+
+    if m < 1 or offsets[0] != 0 or offsets[m] != n:
+        print("Error! Offsets do not match the data!")
+        return {"error": -1}
+    if n != y.shape[0] or n != sigma.shape[0]:
+        print("Error! Data length mismatch!")
+        return {"error": -1}
+    # The kernel runs without bounds checks, so every series must lie inside
+    # the data before the first one is read.
+    counts = np.diff(np.asarray(offsets))
+    if np.any(counts < 2):
+        print("Error! Not enough data!")
+        return {"error": -1}
+
+    result = np.empty(m, dtype=FIT_DTYPE)
+    cdef double[:, ::1] rows = result.view(np.float64).reshape(m, 5)
+
+    for j in range(m):
+        _reset(&moments)
+        with nogil:
+            _accumulate(x, y, sigma, offsets[j], offsets[j + 1], &moments)
+        if _finish(&moments, &rows[j, 0]) < 0:
             return {"error": -1}
-        # Compound values
-        S += 1.0 / sigma[i]**2
-        s_x += x[i] / sigma[i]**2
-        s_y += y[i] / sigma[i]**2
 
-    # second loop
-    for i in range(x.shape[0]):
-        t_i = (1.0 / sigma[i]) * (x[i] - (s_x / S))
-        s_tt += t_i**2
-        b += (t_i * y[i]) / sigma[i]
+    return result
 
-    # Check error size
-    if abs(S) < 0.000001:
-        print("Error! Error too small!")
+
+def parallel_compute_with_cython(
+    const floating[:] x,
+    const floating[:] y,
+    const floating[:] sigma,
+    int num_threads=0,
+    bint verbose=True
+    ) -> Dict[str, float]:
+    """
+       Multi-threaded version of compute_with_cython. The data is cut into
+       fixed-size blocks that are reduced without the GIL on OpenMP threads;
+       each block keeps its own partial statistics and the blocks are merged
+       in order afterwards, so the result is bit-for-bit reproducible
+       regardless of the thread count.
+
+       Args:
+           x (np.ndarray[float32 or float64, ndim=1]): x values.
+           y (np.ndarray[float32 or float64, ndim=1]): y values, same dtype.
+           sigma (np.ndarray[float32 or float64, ndim=1]): uncertainties of y,
+               same dtype.
+           num_threads (int): number of threads to use; 0 (the default)
+               uses all CPUs. Without OpenMP support at build time the
+               loops run serially.
+           verbose (bool): whether the reason of an error is printed.
+
+       Returns:
+           Dict[str, float]: the same dictionary as compute_with_cython, or
+               an error dictionary with a sentinel value of -1 under the
+               key "error".
+       """
+    cdef Py_ssize_t n = x.shape[0]
+    cdef Py_ssize_t nblocks, j, lo
+    cdef Moments total
+    cdef Moments* parts
+    cdef double out[5]
+
+    if n < 2:
+        if verbose:
+            print("Error! Not enough data!")
+        return {"error": -1}
+    if n != y.shape[0] or n != sigma.shape[0]:
+        if verbose:
+            print("Error! Data length mismatch!")
         return {"error": -1}
+    if num_threads < 1:
+        num_threads = os.cpu_count() or 1
 
-    # compute a, b, and sigmas
-    b = b / s_tt
-    a = (s_x - s_y * b) / S
-    sigma_a = ((1 + s_x**2 / (S * s_tt)) / S)**0.5
-    sigma_b = (1.0 / s_tt)**0.5
+    nblocks = (n + BLOCK_SIZE - 1) // BLOCK_SIZE
+    parts = <Moments*> malloc(nblocks * sizeof(Moments))
+    if parts == NULL:
+        raise MemoryError()
+    try:
+        for j in prange(nblocks, nogil=True, num_threads=num_threads,
+                        schedule='static'):
+            lo = j * BLOCK_SIZE
+            _reset(&parts[j])
+            _accumulate(x, y, sigma, lo, min(lo + BLOCK_SIZE, n), &parts[j])
+        _reset(&total)
+        for j in range(nblocks):
+            _merge(&total, &parts[j])
+    finally:
+        free(parts)
 
-    # compute chi2
-    for i in range(x.shape[0]):
-        chi2 += ((y[i] - a - b * x[i]) / sigma[i])**2
+    if _finish(&total, out, verbose) < 0:
+        return {"error": -1}
+    return _as_dict(out)
 
-    # Return the computed values
-    return {
-        'intercept': a,
-        'slope': b,
-        'sigma_a': sigma_a,
-        'sigma_b': sigma_b,
-        'chi_squared': chi2
-    }
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def rolling_compute_with_cython(
+    const floating[:] x,
+    const floating[:] y,
+    const floating[:] sigma,
+    Py_ssize_t window,
+    bint expanding=False
+    ):
+    """
+       Fits every window of consecutive points, adding the point that enters
+       and removing the point that leaves each window in constant time. The
+       sums of a sliding window are rebuilt from its points every window
+       steps, as deviations from its first point, which bounds the rounding
+       errors of the removals at amortized constant cost.
+
+       Args:
+           x (np.ndarray[float32 or float64, ndim=1]): x values, in window
+               order.
+           y (np.ndarray[float32 or float64, ndim=1]): y values, same dtype.
+           sigma (np.ndarray[float32 or float64, ndim=1]): uncertainties of y,
+               same dtype.
+           window (int): points per window (at least 2); with expanding, the
+               fewest points of a window that is fitted.
+           expanding (bool): if set, window j holds points 0 to j instead of
+               points j to j + window - 1.
+
+       Returns:
+           np.ndarray: structured array (FIT_DTYPE) with one row per window
+               (len(x) - window + 1 rows, or len(x) with expanding), NaN for
+               windows whose x values are all equal or, with expanding,
+               that hold fewer than window points; or an error dictionary
+               with a sentinel value of -1 under the key "error".
+       """
+    cdef Py_ssize_t n = x.shape[0]
+    cdef Py_ssize_t m, j, k, first, last
+    cdef Moments moments
+    cdef double origin_x = 0.0, origin_y = 0.0
+    cdef double b, mean_x, nan = float("nan")
+
+    if window < 2 or n < window:
+        print("Error! Not enough data!")
+        return {"error": -1}
+    if n != y.shape[0] or n != sigma.shape[0]:
+        print("Error! Data length mismatch!")
+        return {"error": -1}
+    for j in range(n):
+        if fabs(sigma[j]) < 0.00001:
+            print("Error! Sigma too small!")
+            return {"error": -1}
+
+    m = n if expanding else n - window + 1
+    result = np.empty(m, dtype=FIT_DTYPE)
+    cdef double[:, ::1] rows = result.view(np.float64).reshape(m, 5)
+
+    with nogil:
+        _reset(&moments)
+        for j in range(m):
+            if expanding:
+                if j == 0:
+                    origin_x = x[0]
+                    origin_y = y[0]
+                _add(&moments, 1.0 / (<double>sigma[j] * sigma[j]),
+                     x[j] - origin_x, y[j] - origin_y)
+            elif j % window == 0:
+                _reset(&moments)
+                origin_x = x[j]
+                origin_y = y[j]
+                for k in range(j, j + window):
+                    _add(&moments, 1.0 / (<double>sigma[k] * sigma[k]),
+                         x[k] - origin_x, y[k] - origin_y)
+            else:
+                first = j - 1
+                last = j + window - 1
+                _remove(&moments, 1.0 / (<double>sigma[first] * sigma[first]),
+                        x[first] - origin_x, y[first] - origin_y)
+                _add(&moments, 1.0 / (<double>sigma[last] * sigma[last]),
+                     x[last] - origin_x, y[last] - origin_y)
+            # c_xx within rounding of zero: all x of the window are equal
+            if (moments.count < window or fabs(moments.S) < 0.000001
+                    or moments.c_xx <= EQUAL_X_TOLERANCE * (
+                        moments.c_xx + moments.S * moments.mean_x * moments.mean_x)):
+                for k in range(5):
+                    rows[j, k] = nan
+                continue
+            b = moments.c_xy / moments.c_xx
+            mean_x = moments.mean_x + origin_x
+            rows[j, 0] = moments.mean_y + origin_y - b * mean_x
+            rows[j, 1] = b
+            rows[j, 2] = sqrt((1 + moments.S * mean_x * mean_x / moments.c_xx)
+                              / moments.S)
+            rows[j, 3] = sqrt(1.0 / moments.c_xx)
+            rows[j, 4] = max(moments.c_yy - b * moments.c_xy, 0.0)
+
+    return result
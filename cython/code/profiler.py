@@ -1,29 +1,33 @@
 # profile_examples.py
-import cProfile
+"""
+Profiles compute_with_cython on 10^7 seeded points and writes the
+statistics to output.prof and the top 10 functions to
+profiling_results.txt.
+
+This is a shortcut for benchmarks/profile_fitters.py, which can profile
+every fit backend with any seed and size, record line timings and write
+JSON reports and flamegraph stacks:
+    python ../../benchmarks/profile_fitters.py compute_with_cython --help
+"""
+import os
 import pstats
-# Import the cython function
-from compute import compute_with_cython
-# get numpy
-import numpy as np
-import random
+import sys
 
-# create some mock data, use 1e7 data points
-x = np.linspace(1, random.uniform(1.0, 500.0), 10000000)
-y = np.linspace(1, random.uniform(1.0, 500.0), 10000000)
-sigma = np.linspace(1, random.uniform(1.0, 500.0), 10000000)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'benchmarks'))
+import profile_fitters    # noqa: E402  pylint: disable=wrong-import-position
 
-# In this profile we will:
-def run_profile():
-    # call the function
-    compute_with_cython(x, y, sigma)
 
-# Profile and print statistics saved to file
-cProfile.run('run_profile()', 'output.prof')
+if __name__ == '__main__':
+    report = profile_fitters.profile('compute_with_cython', size=10**7,
+                                     seed=0, repeat=1, top=10,
+                                     pstats_path='output.prof')
+    profile_fitters.print_report(report)
 
-# Print profiling results to terminal
-with open("profiling_results.txt", "w") as f:
-    p = pstats.Stats('output.prof', stream=f)
-    # List the top 10 results
-    p.strip_dirs().sort_stats('cumulative').print_stats(10)
+    # Print profiling results to file
+    with open("profiling_results.txt", "w") as f:
+        p = pstats.Stats('output.prof', stream=f)
+        # List the top 10 results
+        p.strip_dirs().sort_stats('cumulative').print_stats(10)
 
-print("Profiling complete. Results saved to profiling_results.txt.")
+    print("Profiling complete. Results saved to profiling_results.txt.")
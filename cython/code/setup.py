@@ -1,9 +1,38 @@
 # setup.py
-from setuptools import setup
+import os
+import sys
+from setuptools import setup, Extension
 from Cython.Build import cythonize
 import numpy as np
 
+# OpenMP flags for parallel_compute_with_cython. Apple's clang ships
+# without OpenMP, so there the parallel loops are built serial.
+if sys.platform == 'win32':
+    OPENMP_FLAGS = ['/openmp']
+elif sys.platform == 'darwin':
+    OPENMP_FLAGS = []
+else:
+    OPENMP_FLAGS = ['-fopenmp']
+
+# With CYTHON_LINETRACE=1 every line of compute.pyx reports to line
+# profilers (see benchmarks/profile_fitters.py --lines). Tracing slows the
+# kernels down, so the traced C file is generated under build/linetrace
+# and the regular compute.c is left alone.
+LINETRACE = os.environ.get('CYTHON_LINETRACE') == '1'
+DIRECTIVES = {'profile': True, 'language_level': "3"}
+if LINETRACE:
+    DIRECTIVES.update(linetrace=True, binding=True)
+
+extension = Extension(
+    "compute",
+    ["compute.pyx"],
+    extra_compile_args=OPENMP_FLAGS,
+    extra_link_args=OPENMP_FLAGS if sys.platform != 'win32' else [],
+    define_macros=[('CYTHON_TRACE_NOGIL', '1')] if LINETRACE else [],
+)
+
 setup(
-    ext_modules=cythonize("compute.pyx", compiler_directives={'profile': True,'language_level': "3"}, annotate=True),
+    ext_modules=cythonize([extension], compiler_directives=DIRECTIVES, annotate=True,
+                          build_dir='build/linetrace' if LINETRACE else None),
     include_dirs=[np.get_include()]  # Add this line to include NumPy headers
 )
@@ -0,0 +1,128 @@
+"""
+Provides unit testing for the compiled compute module.
+The module has to be built first (python -m setup build_ext --inplace);
+otherwise the tests are skipped.
+"""
+import numpy as np
+import pytest
+
+compute = pytest.importorskip("compute")
+
+X = np.array([0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+Y = np.array([-1.0, 1.0, 3.0, 5.0, 7.0, 9.0])
+SIGMA = np.full(6, 0.1)
+EXPECTED = {
+    'intercept': -1.0,
+    'slope': 2.0,
+    'sigma_a': 0.0723747,
+    'sigma_b': 0.0239046,
+    'chi_squared': 0.0
+}
+
+
+def random_data(n):
+    """
+    Returns noisy straight-line data of n points.
+    """
+    rng = np.random.default_rng(5)
+    x = rng.uniform(1.0, 500.0, n)
+    sigma = rng.uniform(1.0, 5.0, n)
+    y = 3.0 * x + 2.0 + rng.normal(0.0, sigma)
+    return x, y, sigma
+
+
+def test_compute_known_values():
+    """
+    compute_with_cython reproduces the known fit of the mock data.
+    """
+    result = compute.compute_with_cython(X, Y, SIGMA)
+    assert result == pytest.approx(EXPECTED, rel=1e-5, abs=1e-12)
+
+
+def test_batch_matches_single():
+    """
+    Each series of batch_compute_with_cython equals a single fit.
+    """
+    x, y, sigma = random_data(1000)
+    offsets = np.array([0, 3, 400, 1000], dtype=np.intp)
+    result = compute.batch_compute_with_cython(x, y, sigma, offsets)
+    for j in range(3):
+        part = slice(offsets[j], offsets[j + 1])
+        single = compute.compute_with_cython(x[part], y[part], sigma[part])
+        for name in result.dtype.names:
+            assert result[j][name] == pytest.approx(single[name], rel=1e-9)
+
+
+def test_batch_rejects_bad_offsets():
+    """
+    Offsets that are not increasing or leave a series too short are
+    rejected before any data is read.
+    """
+    x, y, sigma = random_data(3)
+    for offsets in ([0, 50, 3], [0, 2, 1, 3], [0, 1, 3]):
+        offsets = np.array(offsets, dtype=np.intp)
+        result = compute.batch_compute_with_cython(x, y, sigma, offsets)
+        assert result == {"error": -1}
+
+
+def test_parallel_reproducible():
+    """
+    parallel_compute_with_cython gives identical results for any number
+    of threads, equal to the serial kernel.
+    """
+    x, y, sigma = random_data(200001)
+    results = [compute.parallel_compute_with_cython(x, y, sigma, n)
+               for n in (1, 2, 3, 8)]
+    assert all(r == results[0] for r in results)
+    serial = compute.compute_with_cython(x, y, sigma)
+    assert results[0] == serial
+
+
+def test_input_layouts():
+    """
+    float32, strided and read-only memory-mapped inputs are accepted.
+    """
+    x, y, sigma = random_data(1000)
+    expected = compute.compute_with_cython(x, y, sigma)
+    single = compute.compute_with_cython(*(i.astype(np.float32)
+                                           for i in (x, y, sigma)))
+    assert single == pytest.approx(expected, rel=1e-4)
+    stacked = np.stack([x, y, sigma], axis=1)
+    strided = compute.compute_with_cython(*stacked.T)
+    assert strided == pytest.approx(expected, rel=1e-12)
+    stacked.setflags(write=False)
+    assert compute.compute_with_cython(*stacked.T) == strided
+
+
+def test_parallel_errors():
+    """
+    parallel_compute_with_cython returns the error sentinel for bad data.
+    """
+    assert compute.parallel_compute_with_cython(X[:1], Y[:1], SIGMA[:1]) \
+        == {"error": -1}
+    assert compute.parallel_compute_with_cython(X, Y[:5], SIGMA) \
+        == {"error": -1}
+    assert compute.parallel_compute_with_cython(X, Y, np.zeros(6)) \
+        == {"error": -1}
+
+
+def test_rolling_matches_batch():
+    """
+    Each window of rolling_compute_with_cython equals a single fit, for
+    sliding and expanding windows.
+    """
+    x, y, sigma = random_data(300)
+    result = compute.rolling_compute_with_cython(x, y, sigma, 25)
+    assert result.size == 276
+    for j in (0, 1, 24, 25, 26, 275):
+        part = slice(j, j + 25)
+        single = compute.compute_with_cython(x[part], y[part], sigma[part])
+        for name in result.dtype.names:
+            assert result[j][name] == pytest.approx(single[name], rel=1e-9)
+    expanding = compute.rolling_compute_with_cython(x, y, sigma, 3, True)
+    assert np.all(np.isnan(expanding['slope'][:2]))
+    single = compute.compute_with_cython(x[:100], y[:100], sigma[:100])
+    assert expanding[99]['slope'] == pytest.approx(single['slope'],
+                                                   rel=1e-9)
+    assert compute.rolling_compute_with_cython(X, Y, SIGMA, 7) \
+        == {"error": -1}
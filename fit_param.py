@@ -4,50 +4,66 @@ allow the user to specify velocity and distance data such
 that best fit parameters may be calculated. The parameters
 are output as a dictionary with keys: "Slope", "Y-intercept",
 "Uncertainty of Slope", "Uncertainty of y-intercept"
+
+The sums are computed with whole-array NumPy operations, so
+lists, NumPy arrays and any object exposing the buffer protocol
+(array.array, memoryview, np.memmap, ...) can be passed directly.
 """
 
 import numpy as np
 
+
 def dict_maker(v, d):
     """
-    dict_maker takes in velocity and 
-    position data as two lists and 
-    calls other functions to determine the
-    parameters which are returned as a 
+    dict_maker takes in velocity and
+    position data as two lists (or arrays/buffers)
+    and calls other functions to determine the
+    parameters which are returned as a
     dictionary
     """
-    #Invalid datasets are accounted for here.
-    if len(v)!=len(d):
+    # Invalid datasets are accounted for here.
+    if len(v) != len(d):
         print("Invalid Dataset. Try again")
         return 0
-    if len(v)<2:
+    if len(v) < 2:
         print("Not enough data for a fit. Try again")
         return 0
 
+    # No copy is made if the data is already a float64 array.
+    v_in = np.asarray(v)
+    d_in = np.asarray(d)
+    v = np.asarray(v_in, dtype=np.float64)
+    d = np.asarray(d_in, dtype=np.float64)
+    n = v.shape[0]
 
-    sx=np.sum(d)
-    sy=np.sum(v)
-    d2=[i**2 for i in d]
-    sxx=np.sum(d2)
-    sxy=0
+    # Sums of integer data are taken on Python ints, which
+    # neither overflow nor round, so that the denominator of
+    # data with no spread is exactly 0 and large integers
+    # fit as exactly as small ones.
+    d_sum = d_in.astype(object) if d_in.dtype.kind in 'iu' else d
+    v_sum = v_in.astype(object) if v_in.dtype.kind in 'iu' else v
+    sx = np.sum(d_sum)
+    sy = np.sum(v_sum)
+    sxx = np.dot(d_sum, d_sum)
 
-    #If an invalid denominator which is used for 
-    #future calculations is determined, the function
-    #stops.
-    if len(v)*sxx-sx**2==0:
+    # If an invalid denominator which is used for
+    # future calculations is determined, the function
+    # stops.
+    if n*sxx-sx**2 == 0:
         print("Error. Denominator is 0")
         return 0
-    
-    for count, value in enumerate(v):
-        sxy+=value*d[count]
 
-    s=slope(sxx, sy, sx, sxy, len(v))
-    b=yint(sxx,sy,sx,sxy,len(v))
-    sig=sigma(len(v), s,b, v,d)
-    sig_b=sigma_b(sig,sxx, sx, len(v))
-    sig_s=sigma_s(sig, len(v),sxx,sx)
+    sxy = np.dot(v_sum, d_sum)
+
+    s = slope(sxx, sy, sx, sxy, n)
+    b = yint(sxx, sy, sx, sxy, n)
+    sig = sigma(n, s, b, v, d)
+    sig_b = sigma_b(sig, sxx, sx, n)
+    sig_s = sigma_s(sig, n, sxx, sx)
+
+    return {"Slope": s, "Y-intercept": b, "Uncertainty of Slope": sig_s,
+            "Uncertainty of y-intercept": sig_b}
 
-    return {"Slope":s, "Y-intercept":b, "Uncertainty of Slope":sig_s, "Uncertainty of y-intercept":sig_b}
 
 def yint(sxx, sy, sx, sxy, n):
     """
@@ -56,6 +72,7 @@ def yint(sxx, sy, sx, sxy, n):
     """
     return (sxx*sy-sx*sxy)/(n*sxx-sx**2)
 
+
 def slope(sxx, sy, sx, sxy, n):
     """
     slope produces the slope from
@@ -68,32 +85,32 @@ def sigma(n, s, b, y, x):
     """
     sigma, which is necessary for calculating
     uncertainties is determined from n, s, b,
-    y, x. s and b are slope and y-intercept 
+    y, x. s and b are slope and y-intercept
     respectively, y and x are velocity and distance
     data respectively.
     """
-    #Ensures that if n<=2, sigma is zero
-    if n<=2:
+    # Ensures that if n<=2, sigma is zero
+    if n <= 2:
         return 0
-    
-    sum=0
-    den=n-2
-    for count, value in enumerate(x):
-        sum+=(y[count]-(s*value+b))**2
 
-    return np.sqrt(sum/den)
+    # Residuals are formed in a single array expression.
+    resid = np.asarray(y, dtype=np.float64) - (
+        s*np.asarray(x, dtype=np.float64) + b)
+
+    return np.sqrt(np.dot(resid, resid)/(n-2))
+
 
 def sigma_b(sig, sxx, sx, n):
     """
-    sigma_b is determined from sig (sigma), 
+    sigma_b is determined from sig (sigma),
     sxx, sx, n
     """
     return np.sqrt(sig**2*sxx/(n*sxx-sx**2))
 
+
 def sigma_s(sig, n, sxx, sx):
     """
-    sigma_s is determined from sig (sigma), 
+    sigma_s is determined from sig (sigma),
     sxx, sx, n
     """
     return np.sqrt(sig**2*n/(n*sxx-sx**2))
-
@@ -0,0 +1,78 @@
+"""
+hubble_fit collects array-based tools for the straight-line fits of
+Hubble's velocity-distance data.
+
+Modules:
+- batch: weighted least-squares fits of many series in one call.
+- accumulator: streaming fit over chunks with mergeable state.
+- resample: bootstrap and jackknife uncertainties of the fit.
+- grouping: per-group averages of velocity-distance data.
+- cache: binary columnar cache of the source tables.
+- memo: content-addressed LRU memoization of fit results.
+- dispatch: one fit entry point choosing the fastest backend.
+- montecarlo: Monte Carlo propagation of the fit to the age of the
+  universe.
+- robust: robust fits by iteratively reweighted least squares.
+- york: fits with uncertainties in both x and y.
+- diagnostics: leave-one-out fits, leverage and Cook's distance.
+- rolling: fits over sliding and expanding windows.
+- contours: chi squared surfaces and confidence contours of the fit.
+- render: headless figures of the fit, aggregating large data.
+- tables: native reader of the whitespace separated source tables.
+- validation: whole-array checks of the data of a fit.
+- files: fits of directories of CSV files on a process pool.
+- server, client: local fit server batching concurrent small fits, and
+  its standard library client.
+
+Importing the package does no I/O and loads no submodule: every name of
+__all__ is imported from its submodule on first access, so short-lived
+processes that need one function (a worker, a command line call) load
+only that function's module and its dependencies (NumPy). pandas,
+matplotlib and the compiled extension are in turn only imported inside
+the functions that use them.
+"""
+
+import importlib
+
+# Submodule of every public name.
+_EXPORTS = {
+    'FitAccumulator': 'accumulator',
+    'FIT_DTYPE': 'batch', 'fit_batch': 'batch',
+    'TableCache': 'cache', 'load_table': 'cache',
+    'FitClient': 'client',
+    'chi2_surface': 'contours', 'confidence_region': 'contours',
+    'delta_chi2': 'contours',
+    'influence': 'diagnostics',
+    'fit': 'dispatch',
+    'fit_files': 'files', 'read_csv_blocks': 'files',
+    'group_statistics': 'grouping',
+    'FitCache': 'memo',
+    'age_distribution': 'montecarlo', 'age_statistics': 'montecarlo',
+    'render_batch': 'render', 'render_fit': 'render',
+    'render_groups': 'render',
+    'bootstrap': 'resample', 'jackknife': 'resample',
+    'expanding_fit': 'rolling', 'rolling_fit': 'rolling',
+    'robust_fit': 'robust', 'robust_fit_batch': 'robust',
+    'FitServer': 'server',
+    'read_markdown_table': 'tables',
+    'validate_fit_data': 'validation',
+    'york_fit': 'york', 'york_fit_batch': 'york',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Imports a public name from its submodule on first access.
+    """
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__),
+                    name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
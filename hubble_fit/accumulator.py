@@ -0,0 +1,140 @@
+"""
+Streaming weighted least-squares straight-line fit.
+
+FitAccumulator takes the data in chunks and keeps only a handful of
+sufficient statistics: the sum of weights, the weighted means of x and y
+and the weighted sums of squared deviations about those means. Chunks
+are combined with the pairwise update of Chan, Golub and LeVeque, which
+stays accurate where the raw power sums used by fit lose precision, and
+two accumulators filled on different shards can be merged. The result
+equals fit in pseudo_code/linear_fit.py without keeping the data.
+"""
+
+import numpy as np
+
+
+class FitAccumulator:
+    """
+    Incremental weighted straight-line fit with mergeable state.
+
+    Attributes:
+    - count (int): Number of datapoints seen.
+    - weight_sum (float): Sum of 1 / sigma**2 (S in fit).
+    - mean_x, mean_y (float): Weighted means of x and y.
+    - c_xx, c_xy, c_yy (float): Weighted sums of products of deviations
+      from the means; c_xx equals s_tt in fit.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.weight_sum = 0.0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.c_xx = 0.0
+        self.c_xy = 0.0
+        self.c_yy = 0.0
+
+    def update(self, x, y, sigma):
+        """
+        Adds one chunk of data.
+
+        Parameters:
+        - x, y, sigma (array_like): 1-D chunk of x values, y values and
+          uncertainties of y, all the same length.
+
+        Returns:
+        - self, so calls can be chained.
+
+        Defined Errors:
+        - Chunks not of the same length.
+        - Element of sigma too small (divide by zero).
+        """
+        x, y, sigma = (np.asarray(i, dtype=np.float64).ravel()
+                       for i in (x, y, sigma))
+        if not x.size == y.size == sigma.size:
+            raise TypeError("Data must be lists of same length.")
+        if x.size == 0:
+            return self
+        if np.any(np.abs(sigma) < 0.00001):    # Avoids divide by 0 error.
+            raise ZeroDivisionError("Element of sigma is too small.")
+
+        weight = sigma**-2
+        chunk = FitAccumulator()
+        chunk.count = x.size
+        chunk.weight_sum = weight.sum()
+        chunk.mean_x = np.dot(weight, x) / chunk.weight_sum
+        chunk.mean_y = np.dot(weight, y) / chunk.weight_sum
+        dx = x - chunk.mean_x
+        dy = y - chunk.mean_y
+        wdx = weight * dx
+        chunk.c_xx = np.dot(wdx, dx)
+        chunk.c_xy = np.dot(wdx, dy)
+        chunk.c_yy = np.dot(weight * dy, dy)
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """
+        Combines the statistics of another accumulator into this one.
+
+        Parameters:
+        - other (FitAccumulator): State reduced from another shard.
+
+        Returns:
+        - self, so calls can be chained.
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        total = self.weight_sum + other.weight_sum
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        factor = self.weight_sum * other.weight_sum / total
+
+        self.c_xx += other.c_xx + delta_x * delta_x * factor
+        self.c_xy += other.c_xy + delta_x * delta_y * factor
+        self.c_yy += other.c_yy + delta_y * delta_y * factor
+        self.mean_x += delta_x * other.weight_sum / total
+        self.mean_y += delta_y * other.weight_sum / total
+        self.weight_sum = total
+        self.count += other.count
+        return self
+
+    def result(self):
+        """
+        Fit parameters of all data added so far.
+
+        Returns:
+        - Dictionary of intercept, slope, error of each, and quality of fit,
+          with the same keys as fit.
+
+        Defined Errors:
+        - Fewer than 2 datapoints added.
+        - Sum of variance too small (divide by zero).
+        """
+        if self.count < 2:
+            raise TypeError("Not enough data to fit.")
+        if abs(self.weight_sum) < 0.000001:    # Avoids divide by 0 error.
+            raise ZeroDivisionError("Sum of variance is too small.")
+        if self.c_xx == 0:
+            raise ZeroDivisionError("All x values are equal.")
+
+        s_x = self.weight_sum * self.mean_x
+        b = self.c_xy / self.c_xx
+        a = self.mean_y - b * self.mean_x
+        sigma_a = ((1 + s_x**2 / (self.weight_sum * self.c_xx))
+                   / self.weight_sum)**0.5
+        sigma_b = (1.0 / self.c_xx)**0.5
+        # Weighted residual sum of squares; rounding can leave a tiny
+        # negative value for a perfect fit.
+        chi2 = max(self.c_yy - b * self.c_xy, 0.0)
+
+        return {
+            'intercept': float(a),
+            'slope': float(b),
+            'sigma_a': float(sigma_a),
+            'sigma_b': float(sigma_b),
+            'chi_squared': float(chi2)
+        }
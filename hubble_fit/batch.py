@@ -0,0 +1,145 @@
+"""
+Batched weighted least-squares straight-line fits.
+
+Fits many independent (x, y, sigma) series in one call using the same
+equations as fit in pseudo_code/linear_fit.py. The series are given
+either as the rows of 2-D arrays or as one concatenated 1-D array split
+by offsets (a ragged layout). Every sum is a whole-array NumPy
+reduction, so the cost does not grow with Python call overhead per series.
+"""
+
+import numpy as np
+
+# Columns of the structured array returned by fit_batch.
+FIT_DTYPE = np.dtype([
+    ('intercept', np.float64),
+    ('slope', np.float64),
+    ('sigma_a', np.float64),
+    ('sigma_b', np.float64),
+    ('chi_squared', np.float64),
+])
+
+
+def fit_batch(x, y, sigma, offsets=None):
+    """
+    Perform a weighted least-squares linear fit on every series of a batch.
+
+    Parameters:
+    - x (array_like): x values, 2-D of shape (m, n) for m series of n
+      points, or 1-D with all series concatenated when offsets is given.
+    - y (array_like): y values, same layout as x.
+    - sigma (array_like): Uncertainty values for y, same layout as x.
+    - offsets (array_like, optional): m + 1 non-decreasing indices
+      starting at 0 and ending at len(x); series i is
+      x[offsets[i]:offsets[i + 1]].
+
+    Returns:
+    - numpy structured array of length m with the fields 'intercept',
+      'slope', 'sigma_a', 'sigma_b' and 'chi_squared' (see FIT_DTYPE).
+
+    Defined Errors:
+    - Data not of the same shape, or not 2-D without offsets.
+    - Offsets not describing a split of the data.
+    - A series with fewer than 2 datapoints.
+    - Element of sigma too small (divide by zero).
+    - Sum of variance of a series too small (divide by zero).
+    - All x values of a series equal (divide by zero).
+    """
+    x, y, sigma = (np.asarray(i, dtype=np.float64) for i in (x, y, sigma))
+    if not x.shape == y.shape == sigma.shape:
+        raise TypeError("Data must be arrays of same shape.")
+    if np.any(np.abs(sigma) < 0.00001):    # Avoids divide by 0 error.
+        raise ZeroDivisionError("Element of sigma is too small.")
+
+    if offsets is None:
+        if x.ndim != 2:
+            raise TypeError("Data must be 2-D unless offsets are given.")
+        if x.shape[1] < 2:
+            raise TypeError("Not enough data to fit.")
+        return _fit_rows(x, y, sigma)
+
+    if x.ndim != 1:
+        raise TypeError("Data must be 1-D when offsets are given.")
+    offsets = np.asarray(offsets, dtype=np.intp)
+    if (offsets.ndim != 1 or offsets.size < 2 or offsets[0] != 0
+            or offsets[-1] != x.size or np.any(np.diff(offsets) < 0)):
+        raise ValueError("Offsets must run from 0 to len(x) in order.")
+    return _fit_ragged(x, y, sigma, offsets)
+
+
+def _fit_rows(x, y, sigma):
+    """
+    Sums for series stored as the rows of 2-D arrays.
+    """
+    weight = sigma**-2
+    variance_sum = weight.sum(axis=1)
+    s_x = np.einsum('ij,ij->i', weight, x)
+    s_y = np.einsum('ij,ij->i', weight, y)
+    _check_variance_sum(variance_sum)
+
+    # t_i**2 = w_i (x_i - s_x/S)**2 and t_i y_i / sigma_i = w_i dx_i y_i;
+    # y is centred too, as sum(w dx) = 0, to avoid cancellation when x has
+    # a large offset.
+    dx = x - (s_x / variance_sum)[:, None]
+    dy = y - (s_y / variance_sum)[:, None]
+    wdx = weight * dx
+    s_tt = np.einsum('ij,ij->i', wdx, dx)
+    b = np.einsum('ij,ij->i', wdx, dy)
+
+    result = _finish(variance_sum, s_x, s_y, s_tt, b)
+    resid = (y - result['intercept'][:, None]
+             - result['slope'][:, None] * x) / sigma
+    result['chi_squared'] = np.einsum('ij,ij->i', resid, resid)
+    return result
+
+
+def _fit_ragged(x, y, sigma, offsets):
+    """
+    Sums for concatenated series split by offsets.
+    """
+    counts = np.diff(offsets)
+    if np.any(counts < 2):
+        raise TypeError("Not enough data to fit.")
+    m = counts.size
+    ids = np.repeat(np.arange(m), counts)
+
+    weight = sigma**-2
+    variance_sum = np.bincount(ids, weight, minlength=m)
+    s_x = np.bincount(ids, weight * x, minlength=m)
+    s_y = np.bincount(ids, weight * y, minlength=m)
+    _check_variance_sum(variance_sum)
+
+    dx = x - (s_x / variance_sum)[ids]
+    dy = y - (s_y / variance_sum)[ids]
+    wdx = weight * dx
+    s_tt = np.bincount(ids, wdx * dx, minlength=m)
+    b = np.bincount(ids, wdx * dy, minlength=m)
+
+    result = _finish(variance_sum, s_x, s_y, s_tt, b)
+    resid = (y - result['intercept'][ids] - result['slope'][ids] * x) / sigma
+    result['chi_squared'] = np.bincount(ids, resid * resid, minlength=m)
+    return result
+
+
+def _check_variance_sum(variance_sum):
+    """
+    Raises the same error as fit when a sum of variance is too small.
+    """
+    if np.any(np.abs(variance_sum) < 0.000001):
+        raise ZeroDivisionError("Sum of variance is too small.")
+
+
+def _finish(variance_sum, s_x, s_y, s_tt, b):
+    """
+    Turns per-series sums into the fit parameters (chi_squared left empty).
+    """
+    if np.any(s_tt == 0):
+        raise ZeroDivisionError("All x values of a series are equal.")
+    result = np.empty(variance_sum.size, dtype=FIT_DTYPE)
+    b = b / s_tt
+    result['slope'] = b
+    result['intercept'] = (s_y - s_x * b) / variance_sum
+    result['sigma_a'] = np.sqrt(
+        (1 + s_x**2 / (variance_sum * s_tt)) / variance_sum)
+    result['sigma_b'] = np.sqrt(1.0 / s_tt)
+    return result
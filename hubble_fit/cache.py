@@ -0,0 +1,267 @@
+"""
+Binary columnar cache of the Hubble source tables.
+
+The first load of a table (a whitespace Markdown table such as
+Data/raw_data_table1.md or a CSV such as hubble_9_grouping.csv) parses it
+and stores every column as its own .npy file in a cache entry named by
+the SHA-256 of the source contents. Later loads memory-map those files
+instead of parsing again.
+
+An index records the size and modification time of every source it has
+seen, so an unchanged file is found without reading it. Every entry also
+records which reader parsed it, and a load with another reader parses
+the source again. When the size or
+modification time changes, the file is hashed again: identical contents
+reuse their entry, new contents get a new entry and the old entry is
+removed once no source refers to it. The total size of all entries is
+kept under max_bytes by evicting the least recently used ones.
+
+Processes may share a cache directory: each load holds an exclusive lock
+on the file index.lock (fcntl on POSIX, msvcrt on Windows) from reading
+the index to writing it back, so no update of the index is lost.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:    # Windows
+    fcntl = None
+    import msvcrt
+
+from .tables import read_markdown_table
+
+# Default cache location, overridable with the HUBBLE_FIT_CACHE variable.
+DEFAULT_DIRECTORY = os.environ.get(
+    'HUBBLE_FIT_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'hubble_fit'))
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+
+class TableCache:
+    """
+    Cache of parsed tables as memory-mapped .npy columns.
+
+    Parameters:
+    - directory (str, optional): Where entries and the index are kept;
+      DEFAULT_DIRECTORY if None.
+    - max_bytes (int): Upper bound of the total size of the entries.
+
+    Attributes:
+    - hits, misses (int): Loads served from the cache and loads that
+      parsed the source.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = DEFAULT_DIRECTORY if directory is None else directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def load(self, path, reader=None, tag=None):
+        """
+        Columns of the table at path, memory-mapped from the cache.
+
+        Parameters:
+        - path (str): Source table.
+        - reader (callable, optional): reader(path) returning a DataFrame
+          or a dict of columns; read_table if None.
+        - tag (str, optional): Identity of the reader in the cache; the
+          reader's qualified name if None. Readers without a distinct
+          name, such as lambdas, need a tag.
+
+        Returns:
+        - dict: Column name -> read-only numpy array.
+
+        Defined Errors:
+        - Source file not found.
+        """
+        path = os.path.abspath(path)
+        reader = reader or read_table
+        if tag is None:
+            tag = f'{reader.__module__}.{reader.__qualname__}'
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError as exc:
+            raise FileNotFoundError("File was not found.") from exc
+        with self._index_lock():
+            return self._load(path, stat, reader, tag)
+
+    def _load(self, path, stat, reader, tag):
+        # load with the index locked.
+        index = self._read_index()
+        source = index['sources'].get(path)
+
+        if source is None or source['size'] != stat.st_size \
+                or source['mtime_ns'] != stat.st_mtime_ns:
+            key = _content_hash(path)
+            index['sources'][path] = {'size': stat.st_size,
+                                      'mtime_ns': stat.st_mtime_ns,
+                                      'key': key}
+            if source is not None and source['key'] != key:
+                self._drop_unused(index, source['key'])
+        else:
+            key = source['key']
+
+        entry = index['entries'].get(key)
+        if entry is None or entry.get('reader') != tag \
+                or not os.path.isdir(self._entry_path(key)):
+            self.misses += 1
+            columns = _to_columns(reader(path))
+            entry = self._write_entry(key, columns)
+            entry['reader'] = tag
+            index['entries'][key] = entry
+        else:
+            self.hits += 1
+        entry['last_used'] = time.time()
+        self._evict(index, keep=key)
+        self._write_index(index)
+
+        return {name: np.load(os.path.join(self._entry_path(key), file),
+                              mmap_mode='r')
+                for name, file in entry['columns']}
+
+    def size(self):
+        """
+        Total size in bytes of the cached entries.
+        """
+        return sum(e['bytes'] for e in self._read_index()['entries'].values())
+
+    def clear(self):
+        """
+        Removes every entry and the index.
+        """
+        with self._index_lock():
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif name != 'index.lock':
+                    os.remove(path)
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _index_path(self):
+        return os.path.join(self.directory, 'index.json')
+
+    @contextlib.contextmanager
+    def _index_lock(self):
+        # Exclusive lock of the index across processes; the lock file is
+        # never removed, so every process locks the same file.
+        with open(os.path.join(self.directory, 'index.lock'), 'a+b') as file:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            else:
+                file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:    # Still locked after 10 seconds.
+                        pass
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path(), encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'sources': {}, 'entries': {}}
+
+    def _write_index(self, index):
+        # Written to a temporary file and renamed, so readers never see a
+        # partly written index.
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            json.dump(index, file)
+        os.replace(temp, self._index_path())
+
+    def _write_entry(self, key, columns):
+        temp = tempfile.mkdtemp(dir=self.directory)
+        files = []
+        for i, (name, values) in enumerate(columns.items()):
+            file = f'{i}.npy'
+            np.save(os.path.join(temp, file), values)
+            files.append([name, file])
+        total = sum(os.path.getsize(os.path.join(temp, f)) for _, f in files)
+        shutil.rmtree(self._entry_path(key), ignore_errors=True)
+        os.replace(temp, self._entry_path(key))
+        return {'columns': files, 'bytes': total}
+
+    def _drop_unused(self, index, key):
+        # Removes an entry no source refers to any more.
+        if all(s['key'] != key for s in index['sources'].values()):
+            index['entries'].pop(key, None)
+            shutil.rmtree(self._entry_path(key), ignore_errors=True)
+
+    def _evict(self, index, keep):
+        # Drops least recently used entries while over max_bytes.
+        entries = index['entries']
+        total = sum(e['bytes'] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries.pop(key)['bytes']
+            shutil.rmtree(self._entry_path(key), ignore_errors=True)
+            for path in [p for p, s in index['sources'].items()
+                         if s['key'] == key]:
+                del index['sources'][path]
+
+
+def read_table(path):
+    """
+    Parses a source table: CSV files by extension with pandas, anything
+    else as a whitespace separated table where '#' starts a comment and
+    '..' marks a missing value (tables.read_markdown_table).
+    """
+    if path.endswith('.csv'):
+        import pandas as pd    # pylint: disable=import-outside-toplevel
+        return pd.read_csv(path)
+    return read_markdown_table(path)
+
+
+def load_table(path, reader=None, tag=None):
+    """
+    Columns of the table at path through a TableCache in the default
+    directory.
+    """
+    return TableCache().load(path, reader, tag)
+
+
+def _content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(2**20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _to_columns(table):
+    # Numeric columns are kept as they are, everything else as fixed-width
+    # unicode so that it can be memory-mapped.
+    columns = {}
+    for name in table.keys():
+        values = np.asarray(table[name])
+        if values.dtype.kind not in 'biuf':
+            values = np.asarray(values.astype(str), dtype=str)
+        columns[str(name)] = values
+    return columns
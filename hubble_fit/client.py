@@ -0,0 +1,173 @@
+"""
+Client of the local fit server (hubble_fit/server.py).
+
+The client only needs the standard library, so a short-lived process that
+sends its fits to a running server pays neither the import of NumPy nor
+the warm-up of the fitting code.
+
+Protocol: every message is a frame of
+- 8 bytes: the lengths of the header and of the payload, two big-endian
+  unsigned 32-bit integers,
+- the header: a UTF-8 JSON object,
+- the payload: raw bytes (possibly none).
+Requests:
+- {"op": "fit", "x": [...], "y": [...], "sigma": [...] or null}: data as
+  JSON lists, no payload.
+- {"op": "fit", "n": n, "sigma": true or false}: data as a payload of
+  little-endian float64 values, the n values of x, then of y, then of
+  sigma if given.
+- {"op": "stats"}: the server's statistics.
+Responses have no payload: {"ok": true, "result": {...}} (or "stats"), or
+{"ok": false, "error": exception name, "message": text}.
+"""
+
+import array
+import json
+import socket
+import struct
+import sys
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8642
+
+FRAME = struct.Struct('!II')
+
+# Errors of the fit raised again on the client; any other is RuntimeError.
+ERRORS = {error.__name__: error
+          for error in (TypeError, ValueError, ZeroDivisionError)}
+
+
+class FitClient:
+    """
+    Blocking connection to a fit server.
+
+    Parameters:
+    - path (str, optional): Unix socket of the server; if None, the server
+      is reached over TCP at host and port.
+    - host (str): Host of the server.
+    - port (int): Port of the server.
+    - timeout (float, optional): Seconds to wait for the server.
+    """
+
+    def __init__(self, path=None, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 timeout=None):
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = path
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY,
+                                    1)
+            address = (host, port)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(address)
+        except OSError:
+            self._socket.close()
+            raise
+        self._file = self._socket.makefile('rb')
+
+    def fit(self, x, y, sigma=None, binary=True):
+        """
+        Weighted least-squares linear fit on the server.
+
+        Parameters:
+        - x (sequence of float): x values; a float64 array or
+          array.array('d') is sent without conversion.
+        - y (sequence of float): y values.
+        - sigma (sequence of float, optional): Uncertainty values for y;
+          all 1 if None.
+        - binary (bool): Whether to send the data as float64 bytes instead
+          of JSON lists.
+
+        Returns:
+        - Dictionary of intercept, slope, error of each, quality of fit
+          and 'backend', as returned by hubble_fit.fit.
+
+        Defined Errors:
+        - The errors of hubble_fit.fit, raised again here.
+        - Server errors (RuntimeError), connection errors (OSError).
+        """
+        columns = (x, y) if sigma is None else (x, y, sigma)
+        if not binary:
+            try:
+                lists = [[float(v) for v in values] for values in columns]
+            except (TypeError, ValueError) as exc:
+                raise TypeError("Elements of data are not all "
+                                "numeric.") from exc
+            header = {'op': 'fit', 'x': lists[0], 'y': lists[1],
+                      'sigma': lists[2] if len(lists) == 3 else None}
+            return self._request(header)['result']
+        try:
+            buffers = [_float64_bytes(values) for values in columns]
+        except TypeError as exc:
+            raise TypeError("Elements of data are not all numeric.") from exc
+        n = len(buffers[0]) // 8
+        if any(len(buffer) != 8 * n for buffer in buffers):
+            raise TypeError("Data must be 1-D arrays of same length.")
+        header = {'op': 'fit', 'n': n, 'sigma': sigma is not None}
+        return self._request(header, b''.join(buffers))['result']
+
+    def stats(self):
+        """
+        Statistics of the server (see FitServer.stats).
+        """
+        return self._request({'op': 'stats'})['stats']
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, header, payload=b''):
+        """
+        Sends one request and returns its response, raising its error.
+        """
+        self._socket.sendall(encode_frame(header, payload))
+        lengths = self._file.read(FRAME.size)
+        if len(lengths) < FRAME.size:
+            raise ConnectionError("Server closed the connection.")
+        header_size, payload_size = FRAME.unpack(lengths)
+        response = json.loads(self._file.read(header_size))
+        self._file.read(payload_size)
+        if not response['ok']:
+            raise ERRORS.get(response['error'], RuntimeError)(
+                response['message'])
+        return response
+
+
+def encode_frame(header, payload=b''):
+    """
+    One message of the protocol from its header dictionary and payload.
+    """
+    data = json.dumps(header, separators=(',', ':')).encode()
+    return FRAME.pack(len(data), len(payload)) + data + payload
+
+
+def _float64_bytes(values):
+    """
+    values as little-endian float64 bytes, without a copy when they
+    already are float64.
+    """
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is not None and view.format in ('d', '<d', '=d') \
+            and view.c_contiguous:
+        data = view.cast('B')
+    else:
+        data = memoryview(array.array('d', values)).cast('B')
+    if sys.byteorder == 'big':
+        swapped = array.array('d', data.tobytes())
+        swapped.byteswap()
+        return memoryview(swapped).cast('B')
+    return data
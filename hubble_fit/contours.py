@@ -0,0 +1,188 @@
+"""
+Chi squared surfaces of the straight-line fit and their confidence
+contours in (intercept, slope) space.
+
+For the weighted fit of fit and compute_with_cython, chi squared is a
+quadratic function of the parameters,
+    chi2(a, b) = chi2_min + S (da + mean_x db)**2 + c_xx db**2
+with da, db the distances from the best fit and S, mean_x and c_xx the
+sufficient statistics of FitAccumulator. The surface then costs O(1) per
+grid point, whatever the number of datapoints, and the data are read once.
+
+With uncertainties in x as well (sigma_x, the effective variance
+sigma_y**2 + b**2 sigma_x**2 of York fits), chi squared is no longer
+quadratic in the slope. It is still quadratic in the intercept for a
+fixed slope, so every slope of the grid takes one pass over the data,
+evaluated in chunks of at most chunk_size (slope, point) pairs at a time
+and merged with the pairwise update of FitAccumulator.
+
+Contour levels are chi2_min + delta_chi2: the regions holding the
+probability of 1, 2, 3... standard deviations of a normal distribution
+for both parameters jointly (2.30, 6.18 and 11.83 for 1, 2 and 3 sigma).
+"""
+
+import math
+
+import numpy as np
+
+from .accumulator import FitAccumulator
+from .york import york_fit
+
+# Largest number of (slope, point) pairs evaluated at a time.
+CHUNK_SIZE = 2**20
+
+
+def chi2_surface(x, y, sigma, intercepts, slopes, sigma_x=None,
+                 chunk_size=CHUNK_SIZE):
+    """
+    Chi squared of the straight line at every point of an (intercept,
+    slope) grid.
+
+    Parameters:
+    - x (array_like): x values.
+    - y (array_like): y values.
+    - sigma (array_like): Uncertainty values for y.
+    - intercepts (array_like): 1-D grid of intercepts.
+    - slopes (array_like): 1-D grid of slopes.
+    - sigma_x (array_like, optional): Uncertainty values for x; chi
+      squared with the effective variance of york_fit if given.
+    - chunk_size (int): Largest number of (slope, point) pairs evaluated
+      at a time with sigma_x.
+
+    Returns:
+    - numpy array of shape (len(slopes), len(intercepts)), as needed by
+      matplotlib's contour(intercepts, slopes, surface).
+
+    Defined Errors:
+    - Data or grids not 1-D, data not of the same length.
+    - As for FitAccumulator (fewer than 2 datapoints, ...).
+    - Element of sigma (and sigma_x) too small (divide by zero).
+    """
+    intercepts = np.asarray(intercepts, dtype=np.float64)
+    slopes = np.asarray(slopes, dtype=np.float64)
+    if intercepts.ndim != 1 or slopes.ndim != 1:
+        raise TypeError("Grids must be 1-D arrays.")
+    x, y, sigma = (np.asarray(i, dtype=np.float64) for i in (x, y, sigma))
+    if x.ndim != 1 or not x.shape == y.shape == sigma.shape:
+        raise TypeError("Data must be 1-D arrays of same length.")
+    if sigma_x is None:
+        return _quadratic_surface(FitAccumulator().update(x, y, sigma),
+                                  intercepts, slopes)
+
+    sigma_x = np.asarray(sigma_x, dtype=np.float64)
+    if sigma_x.shape != x.shape:
+        raise TypeError("Data must be 1-D arrays of same length.")
+    if x.size < 2:
+        raise TypeError("Not enough data to fit.")
+    if np.any(np.abs(sigma) < 0.00001):    # Avoids divide by 0 error.
+        raise ZeroDivisionError("Element of sigma is too small.")
+    var_x, var_y = sigma_x**2, sigma**2
+    surface = np.empty((slopes.size, intercepts.size))
+    step = max(1, chunk_size // x.size)
+    block = max(1, chunk_size // step)
+    for lo in range(0, slopes.size, step):
+        b = slopes[lo:lo + step, None]
+        # Weighted mean and sum of squared deviations of y - b x per slope.
+        total = np.zeros((3, b.size))
+        for start in range(0, x.size, block):
+            part = slice(start, start + block)
+            weight = 1.0 / (var_y[part] + b * b * var_x[part])
+            r = y[part] - b * x[part]
+            s = weight.sum(axis=1)
+            mean = np.einsum('ij,ij->i', weight, r) / s
+            dr = r - mean[:, None]
+            total = _merge(total, (s, mean, np.einsum('ij,ij,ij->i', weight,
+                                                      dr, dr)))
+        s, mean, m2 = total
+        surface[lo:lo + step] = m2[:, None] + s[:, None] * (
+            intercepts - mean[:, None])**2
+    return surface
+
+
+def delta_chi2(n_sigma=(1, 2, 3), joint=True):
+    """
+    Chi squared above the minimum that bounds the confidence regions.
+
+    Parameters:
+    - n_sigma (float or sequence of float): Confidence as the number of
+      standard deviations of a normal distribution.
+    - joint (bool): Region of both parameters together (2 degrees of
+      freedom) if set, else the interval of one parameter.
+
+    Returns:
+    - numpy array of delta chi squared, one per element of n_sigma.
+    """
+    n_sigma = np.atleast_1d(np.asarray(n_sigma, dtype=np.float64))
+    if not joint:
+        return n_sigma**2
+    # chi squared with 2 degrees of freedom: P(< d) = 1 - exp(-d / 2).
+    outside = np.array([math.erfc(k / math.sqrt(2.0)) for k in n_sigma])
+    return -2.0 * np.log(outside)
+
+
+def confidence_region(x, y, sigma, sigma_x=None, n_sigma=(1, 2, 3),
+                      size=201, extent=1.2, chunk_size=CHUNK_SIZE):
+    """
+    Chi squared surface around the best fit and its contour levels.
+
+    Parameters:
+    - x, y, sigma, sigma_x, chunk_size: As for chi2_surface.
+    - n_sigma (sequence of float): Contours, as for delta_chi2 (joint).
+    - size (int): Grid points along each parameter.
+    - extent (float): Half-width of the grid relative to the largest
+      contour of the quadratic approximation.
+
+    Returns:
+    - Dictionary with:
+      'fit': the best fit (FitAccumulator.result, or york_fit with
+      sigma_x),
+      'intercepts', 'slopes': the grid,
+      'chi_squared': the surface (see chi2_surface),
+      'levels': chi squared of the contours, increasing with n_sigma.
+
+    Defined Errors:
+    - As for chi2_surface and the fit.
+    """
+    if sigma_x is None:
+        fit = FitAccumulator().update(x, y, sigma).result()
+    else:
+        fit = york_fit(x, y, sigma_x, sigma)
+    n_sigma = np.sort(np.atleast_1d(n_sigma))
+    levels = fit['chi_squared'] + delta_chi2(n_sigma)
+    half = extent * math.sqrt(levels[-1] - fit['chi_squared'])
+    intercepts = fit['intercept'] + np.linspace(-half, half, size) \
+        * fit['sigma_a']
+    slopes = fit['slope'] + np.linspace(-half, half, size) * fit['sigma_b']
+    surface = chi2_surface(x, y, sigma, intercepts, slopes, sigma_x,
+                           chunk_size)
+    return {
+        'fit': fit,
+        'intercepts': intercepts,
+        'slopes': slopes,
+        'chi_squared': surface,
+        'levels': levels,
+    }
+
+
+def _quadratic_surface(accumulator, intercepts, slopes):
+    """
+    Chi squared on the grid from the statistics of a filled accumulator.
+    """
+    fit = accumulator.result()
+    db = slopes[:, None] - fit['slope']
+    da = intercepts - fit['intercept']
+    return fit['chi_squared'] + accumulator.weight_sum * (
+        da + accumulator.mean_x * db)**2 + accumulator.c_xx * db**2
+
+
+def _merge(a, b):
+    """
+    Weight sums, weighted means and sums of squared deviations of a and b
+    combined (Chan, Golub and LeVeque), element by element.
+    """
+    s_a, mean_a, m2_a = a
+    s_b, mean_b, m2_b = b
+    total = s_a + s_b
+    delta = mean_b - mean_a
+    return (total, mean_a + delta * s_b / total,
+            m2_a + m2_b + delta * delta * s_a * s_b / total)
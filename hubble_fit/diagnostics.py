@@ -0,0 +1,107 @@
+"""
+Leave-one-out influence diagnostics of the straight-line fit.
+
+Removing point i from a (weighted) least-squares fit changes the
+parameters by a rank-one update that only needs the full-data fit, the
+point's residual e_i and its leverage h_i, so every leave-one-out
+intercept, slope and chi squared comes from one O(n) pass instead of n
+refits:
+- slope change: w_i (x_i - mean_x) e_i / (s_xx (1 - h_i))
+- chi squared without i: chi2 - w_i e_i**2 / (1 - h_i)
+with w_i = 1 / sigma_i**2 (as in fit and compute_with_cython) or 1 for an
+unweighted fit (as in fit_param), mean_x the weighted mean of x and s_xx
+the weighted sum of squared deviations from it.
+"""
+
+import numpy as np
+
+# Fields of the array returned by influence, one row per point.
+INFLUENCE_DTYPE = np.dtype([
+    ('intercept', np.float64),
+    ('slope', np.float64),
+    ('chi_squared', np.float64),
+    ('leverage', np.float64),
+    ('cooks_distance', np.float64),
+    ('studentized', np.float64),
+])
+
+
+def influence(x, y, sigma=None):
+    """
+    Leave-one-out fits, leverage and Cook's distance of every point.
+
+    Parameters:
+    - x (array_like): x values.
+    - y (array_like): y values.
+    - sigma (array_like, optional): Uncertainty values for y; None for an
+      unweighted fit as in fit_param.
+
+    Returns:
+    - numpy structured array (INFLUENCE_DTYPE), row i with:
+      'intercept', 'slope', 'chi_squared': the fit without point i
+      (chi_squared is the weighted residual sum of squares of the other
+      points),
+      'leverage': diagonal of the hat matrix, h_i,
+      'cooks_distance': Cook's distance with the residual variance
+      chi2 / (n - 2) of the full fit,
+      'studentized': residual divided by its standard error estimated
+      without point i.
+      Rows whose removal leaves all x equal (h_i = 1) are NaN.
+
+    Defined Errors:
+    - Data not 1-D of the same length, or fewer than 3 datapoints.
+    - Element of sigma too small (divide by zero).
+    - All x values equal (divide by zero).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    weight = np.ones_like(x) if sigma is None else np.asarray(
+        sigma, dtype=np.float64)
+    if x.ndim != 1 or not x.shape == y.shape == weight.shape:
+        raise TypeError("Data must be 1-D arrays of same length.")
+    n = x.size
+    if n < 3:
+        raise TypeError("Not enough data for leave-one-out fits.")
+    if sigma is not None:
+        if np.any(np.abs(weight) < 0.00001):    # Avoids divide by 0 error.
+            raise ZeroDivisionError("Element of sigma is too small.")
+        weight = weight**-2
+
+    s = weight.sum()
+    mean_x = np.dot(weight, x) / s
+    mean_y = np.dot(weight, y) / s
+    dx = x - mean_x
+    wdx = weight * dx
+    s_xx = np.dot(wdx, dx)
+    if s_xx == 0:
+        raise ZeroDivisionError("All x values are equal.")
+    b = np.dot(wdx, y - mean_y) / s_xx
+    a = mean_y - b * mean_x
+    residual = y - a - b * x
+    chi2 = np.dot(weight * residual, residual)
+
+    leverage = weight * (1.0 / s + dx * dx / s_xx)
+    result = np.empty(n, dtype=INFLUENCE_DTYPE)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Weighted residual scaled by 1 / (1 - h_i): the change of the
+        # fitted value at x_i when point i is left out.
+        pull = weight * residual / (1.0 - leverage)
+        delta_b = pull * dx / s_xx
+        result['slope'] = b - delta_b
+        result['intercept'] = a - pull * (1.0 / s - mean_x * dx / s_xx)
+        chi2_without = np.maximum(chi2 - pull * residual, 0.0)
+        result['chi_squared'] = chi2_without
+        result['leverage'] = leverage
+        variance = chi2 / (n - 2)
+        scaled = weight * residual**2
+        result['cooks_distance'] = scaled * leverage / (
+            2 * variance * (1.0 - leverage)**2)
+        # Without point i, n - 3 degrees of freedom are left.
+        variance_without = chi2_without / (n - 3) if n > 3 else np.nan
+        result['studentized'] = np.sqrt(weight) * residual / np.sqrt(
+            variance_without * (1.0 - leverage))
+    invalid = leverage >= 1.0 - 1e-12
+    for name in ('intercept', 'slope', 'chi_squared', 'cooks_distance',
+                 'studentized'):
+        result[name][invalid] = np.nan
+    return result
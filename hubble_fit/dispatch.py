@@ -0,0 +1,266 @@
+"""
+One weighted straight-line fit entry point over every backend.
+
+Backends, from the smallest to the largest inputs they are chosen for:
+- 'python': the loops of the pseudo-code on Python floats. Only chosen
+  for a few points given as a list or tuple when the compiled module is
+  missing, where converting to arrays costs more than the fit itself.
+- 'compiled': compute_with_cython of cython/code/compute.pyx, one pass
+  over the data without temporaries.
+- 'parallel': parallel_compute_with_cython of the same module, for large
+  inputs when more than one CPU is available.
+- 'numpy': whole-array NumPy sums. Always available, and used whenever
+  the compiled module is not.
+
+The compiled module is looked up once, on first use: as an importable
+'compute' module, then as a build in cython/code of this repository. If
+it is missing, or raises an unexpected error, the NumPy path runs instead
+unless a backend was chosen explicitly. Every backend checks the input the
+same way, counts x values as equal below the same relative spread
+(EQUAL_X_TOLERANCE) and raises the same errors, so the choice changes only
+the speed; the result names the backend that ran.
+"""
+
+import functools
+import importlib.machinery
+import importlib.util
+import math
+import os
+import warnings
+
+import numpy as np
+
+from .validation import validate_fit_data
+
+BACKENDS = ('python', 'numpy', 'compiled', 'parallel')
+
+# Crossover points measured with benchmarks/bench_fitters.py.
+PYTHON_MAX_POINTS = 24
+PARALLEL_MIN_POINTS = 2**20
+
+RESULT_KEYS = ('intercept', 'slope', 'sigma_a', 'sigma_b', 'chi_squared')
+
+# Relative spread of x, s_tt / sum(w x**2), below which all x values count
+# as equal; the same tolerance as in cython/code/compute.pyx.
+EQUAL_X_TOLERANCE = 1e-12
+
+
+def fit(x, y, sigma=None, backend=None):
+    """
+    Perform a weighted least-squares linear fit with the fastest backend.
+
+    Parameters:
+    - x (array_like): x values.
+    - y (array_like): y values.
+    - sigma (array_like, optional): Uncertainty values for y; all 1 if
+      None.
+    - backend (str, optional): One of BACKENDS to use instead of the
+      automatic choice (see select_backend).
+
+    Returns:
+    - Dictionary of intercept, slope, error of each, and quality of fit
+      as returned by fit in pseudo_code/linear_fit.py, plus 'backend', the
+      name of the backend that ran.
+
+    Defined Errors:
+    - Data not 1-D of the same length, or not numeric.
+    - Only one datapoint.
+    - Data not finite (ValueError).
+    - Element of sigma too small (divide by zero).
+    - Sum of variance too small (divide by zero).
+    - All x values equal (divide by zero).
+    - Unknown or unavailable backend (ValueError).
+    """
+    if backend is not None and backend not in available_backends():
+        raise ValueError(f"Backend {backend!r} is not available.")
+    sequence = isinstance(x, (list, tuple))
+    if backend == 'python' or (backend is None and sequence
+                               and len(x) <= PYTHON_MAX_POINTS
+                               and _compiled() is None):
+        return _fit_python(x, y, sigma)
+
+    x, y, sigma = _as_arrays(x, y, sigma)
+    fallback = backend is None
+    if backend is None:
+        backend = select_backend(x.shape[0])
+    if backend in ('compiled', 'parallel'):
+        result = _fit_compiled(x, y, sigma, backend, fallback)
+        if result is not None:
+            return result
+    return _fit_numpy(x, y, sigma)
+
+
+def select_backend(n, sequence=False):
+    """
+    Name of the backend fit chooses for n points (given as a list or
+    tuple if sequence is set) on this machine.
+    """
+    if _compiled() is None:
+        return 'python' if sequence and n <= PYTHON_MAX_POINTS else 'numpy'
+    if n >= PARALLEL_MIN_POINTS and _cpu_count() > 1:
+        return 'parallel'
+    return 'compiled'
+
+
+def available_backends():
+    """
+    Names of the backends that can run on this machine.
+    """
+    if _compiled() is None:
+        return ('python', 'numpy')
+    return BACKENDS
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled():
+    """
+    The compiled compute module, or None if it has not been built.
+    """
+    try:
+        import compute    # pylint: disable=import-outside-toplevel
+    except ImportError:
+        pass
+    else:
+        if hasattr(compute, 'parallel_compute_with_cython'):
+            return compute
+    directory = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), 'cython', 'code')
+    for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+        path = os.path.join(directory, 'compute' + suffix)
+        if not os.path.exists(path):
+            continue
+        spec = importlib.util.spec_from_file_location('compute', path)
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except ImportError:
+            return None
+        return module
+    return None
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:    # Not available on macOS and Windows.
+        return os.cpu_count() or 1
+
+
+def _as_arrays(x, y, sigma):
+    """
+    x, y and sigma as checked 1-D arrays of one float dtype (float32 is
+    kept if all three are float32, anything else becomes float64).
+    """
+    return validate_fit_data(x, y, sigma)
+
+
+def _fit_compiled(x, y, sigma, backend, fallback):
+    """
+    Fit with the compiled module. If it fails unexpectedly, None when
+    fallback is set (the NumPy path runs instead), the error otherwise. On
+    data it can not fit, the error of the other backends is raised.
+    """
+    compute = _compiled()
+    try:
+        if backend == 'parallel':
+            result = compute.parallel_compute_with_cython(x, y, sigma,
+                                                          verbose=False)
+        else:
+            result = compute.compute_with_cython(x, y, sigma, verbose=False)
+    except Exception as exc:    # pylint: disable=broad-except
+        if not fallback:
+            raise
+        warnings.warn(f"Compiled fit failed ({exc!r}), using NumPy.",
+                      RuntimeWarning, stacklevel=3)
+        return None
+    if 'error' in result:
+        # The data passed validate_fit_data, so only the sums can fail.
+        weight = np.asarray(sigma, dtype=np.float64)**-2
+        if abs(weight.sum()) < 0.000001:
+            raise ZeroDivisionError("Sum of variance is too small.")
+        raise ZeroDivisionError("All x values are equal.")
+    result['backend'] = backend
+    return result
+
+
+def _fit_numpy(x, y, sigma):
+    """
+    Fit with whole-array NumPy sums, in float64.
+    """
+    x, y, sigma = (np.asarray(i, dtype=np.float64) for i in (x, y, sigma))
+    if np.min(np.abs(sigma)) < 0.00001:    # Avoids divide by 0 error.
+        raise ZeroDivisionError("Element of sigma is too small.")
+    weight = sigma**-2
+    variance_sum = weight.sum()
+    if abs(variance_sum) < 0.000001:    # Avoids divide by 0 error.
+        raise ZeroDivisionError("Sum of variance is too small.")
+    s_x = np.dot(weight, x)
+    s_y = np.dot(weight, y)
+    # t_i**2 = w_i (x_i - s_x/S)**2 and t_i y_i / sigma_i = w_i dx_i y_i
+    dx = x - s_x / variance_sum
+    wdx = weight * dx
+    s_tt = np.dot(wdx, dx)
+    if _equal_x(s_tt, variance_sum, s_x):
+        raise ZeroDivisionError("All x values are equal.")
+    b = np.dot(wdx, y) / s_tt
+    a = (s_y - s_x * b) / variance_sum
+    resid = (y - a - b * x) / sigma
+    return _result(a, b, variance_sum, s_x, s_tt, np.dot(resid, resid),
+                   'numpy')
+
+
+def _fit_python(x, y, sigma):
+    """
+    Fit with the loops of the pseudo-code, for a few points.
+    """
+    try:
+        x, y = [float(i) for i in x], [float(i) for i in y]
+        sigma = [1.0] * len(x) if sigma is None else [float(i)
+                                                      for i in sigma]
+    except (TypeError, ValueError) as exc:
+        raise TypeError("Elements of data are not all numeric.") from exc
+    if not all(map(math.isfinite, x + y + sigma)):
+        # Raises the error of the other backends, naming the indices.
+        validate_fit_data(x, y, sigma)
+    n = len(x)
+    if not len(y) == len(sigma) == n:
+        raise TypeError("Data must be 1-D arrays of same length.")
+    if n < 2:
+        raise TypeError("Not enough data to fit.")
+
+    variance_sum, s_x, s_y = 0.0, 0.0, 0.0
+    for i in range(n):
+        if abs(sigma[i]) < 0.00001:    # Avoids divide by 0 error.
+            raise ZeroDivisionError("Element of sigma is too small.")
+        variance_sum += 1.0 / sigma[i]**2
+        s_x += x[i] / sigma[i]**2
+        s_y += y[i] / sigma[i]**2
+    if abs(variance_sum) < 0.000001:    # Avoids divide by 0 error.
+        raise ZeroDivisionError("Sum of variance is too small.")
+
+    s_tt, b = 0.0, 0.0
+    for i in range(n):
+        t_i = 1.0 / sigma[i] * (x[i] - s_x / variance_sum)
+        s_tt += t_i**2
+        b += t_i * y[i] / sigma[i]
+    if _equal_x(s_tt, variance_sum, s_x):
+        raise ZeroDivisionError("All x values are equal.")
+    b /= s_tt
+    a = (s_y - s_x * b) / variance_sum
+    chi2 = sum(((y[i] - a - b * x[i]) / sigma[i])**2 for i in range(n))
+    return _result(a, b, variance_sum, s_x, s_tt, chi2, 'python')
+
+
+def _equal_x(s_tt, variance_sum, s_x):
+    """
+    Whether s_tt is within rounding of zero, as in the compiled module.
+    """
+    return s_tt <= EQUAL_X_TOLERANCE * (s_tt + s_x**2 / variance_sum)
+
+
+def _result(a, b, variance_sum, s_x, s_tt, chi2, backend):
+    sigma_a = ((1 + s_x**2 / (variance_sum * s_tt)) / variance_sum)**0.5
+    values = (a, b, sigma_a, (1.0 / s_tt)**0.5, chi2)
+    result = {key: float(value) for key, value in zip(RESULT_KEYS, values)}
+    result['backend'] = backend
+    return result
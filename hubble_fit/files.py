@@ -0,0 +1,293 @@
+"""
+Fits of many CSV files at once, from the command line or from Python.
+
+The files follow the conventions of read_data_from_csv in
+pseudo_code/linear_fit.py: a header line naming the columns, with the
+x, y and sigma columns named 'x', 'y' and 'sigma' unless given otherwise.
+Sources are CSV files, directories (every *.csv file in them) or glob
+patterns.
+
+Every file is fitted on its own by a pool of worker processes. A worker
+reads a file in blocks of chunksize rows into a FitAccumulator, so it
+holds one block at a time whatever the size of the file, and at most
+max_pending files are handed to the pool at a time, so the jobs waiting
+in the pool do not grow with the number of files either. A file that
+cannot be fitted (missing, missing columns, non-numeric or non-finite
+values, too few points, ...) does not stop the run: its error is
+recorded in its row of the results, as is a worker that crashes.
+
+read_csv_blocks, the block reader of the workers, is also the chunked
+mode of read_data_from_csv.
+
+The results are one column per field, written to one .npz file:
+- 'path' (str): The source file.
+- 'points' (int64): Rows fitted (0 if the file failed).
+- 'intercept', 'slope', 'sigma_a', 'sigma_b', 'chi_squared' (float64):
+  The fit, NaN if the file failed.
+- 'error' (str): The reason the file failed, '' if it was fitted.
+
+Usage (from the repository root):
+    python -m hubble_fit.files Data/ --output fits.npz
+    python -m hubble_fit.files "runs/**/*.csv" --x r --y v --sigma err \\
+        --workers 4 --output fits.npz
+Exits with status 1 if any file failed, after writing all results.
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import numpy as np
+
+from .accumulator import FitAccumulator
+from .dispatch import RESULT_KEYS
+from .validation import validate_fit_data
+
+# Rows of a file read at a time by a worker.
+CHUNKSIZE = 2**18
+
+COLUMNS = ('path', 'points') + RESULT_KEYS + ('error',)
+
+
+def fit_files(sources, output=None, x='x', y='y', sigma='sigma',
+              chunksize=CHUNKSIZE, n_workers=None, max_pending=None):
+    """
+    Fits every CSV file of sources and collects the results in columns.
+
+    Parameters:
+    - sources (str or sequence of str): CSV files, directories of CSV
+      files or glob patterns.
+    - output (str, optional): .npz file the result columns are written
+      to.
+    - x, y (str): Headers of the x and y columns.
+    - sigma (str or None): Header of the uncertainties of y; all 1 if
+      None.
+    - chunksize (int): Rows of a file read at a time.
+    - n_workers (int or None): Worker processes; 1 fits in this process,
+      None uses all CPUs.
+    - max_pending (int, optional): Most files handed to the pool at a
+      time; 2 * n_workers if None.
+
+    Returns:
+    - dict: Column name -> numpy array, one row per file in the order of
+      sources (see COLUMNS).
+
+    Defined Errors:
+    - Headers not strings, chunksize not a positive integer (TypeError).
+    - No CSV file in sources (FileNotFoundError).
+    Errors of single files are recorded in the 'error' column instead.
+    """
+    headers = [x, y] if sigma is None else [x, y, sigma]
+    if not all(isinstance(i, str) for i in headers):
+        raise TypeError("File path and headers must be strings.")
+    _check_chunksize(chunksize)
+    paths = find_files(sources)
+    if not paths:
+        raise FileNotFoundError("No CSV files found.")
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    jobs = [(path, headers, chunksize) for path in paths]
+
+    if n_workers == 1 or len(jobs) < 2:
+        rows = [_fit_file(job) for job in jobs]
+    else:
+        rows = _run_pool(jobs, min(n_workers, len(jobs)),
+                         max_pending or 2 * n_workers)
+
+    columns = _to_columns(rows)
+    if output is not None:
+        np.savez(output, **columns)
+    return columns
+
+
+def read_csv_blocks(path, headers, chunksize=CHUNKSIZE):
+    """
+    Float64 blocks of columns of a CSV file, chunksize rows at a time.
+
+    Parameters:
+    - path (str): The CSV file.
+    - headers (sequence of str): Headers of the columns to read.
+    - chunksize (int): Most rows of a block.
+
+    Returns:
+    - iterator: One tuple of float64 NumPy arrays, in the order of
+      headers, per block. Only one block is held in memory at a time.
+
+    Defined Errors:
+    - Chunksize not a positive integer (TypeError).
+    - CSV unable to be found (FileNotFoundError).
+    - Specified headers not in CSV (KeyError).
+    These are raised by the call itself, before any block is read; values
+    that are not numbers raise ValueError while reading.
+    """
+    _check_chunksize(chunksize)
+    import pandas as pd    # pylint: disable=import-outside-toplevel
+    # Reads only the header line to validate the columns.
+    try:
+        columns = pd.read_csv(path, nrows=0).columns
+    except FileNotFoundError as exc:
+        raise FileNotFoundError("File was not found.") from exc
+    if any(i not in columns for i in headers):
+        raise KeyError("File headers not found in CSV.")
+
+    def blocks():
+        # Only the needed columns are parsed, directly as float64.
+        with pd.read_csv(path, usecols=headers, dtype=np.float64,
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield tuple(chunk[i].to_numpy() for i in headers)
+
+    return blocks()
+
+
+def find_files(sources):
+    """
+    Sorted CSV files of sources (files, directories or glob patterns),
+    each once, in the order of sources.
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            found = glob.glob(os.path.join(glob.escape(source), '*.csv'))
+        elif glob.has_magic(source):
+            found = glob.glob(source, recursive=True)
+        else:
+            # Kept even if missing, to be reported as such.
+            found = [source]
+        paths.extend(sorted(found))
+    return list(dict.fromkeys(paths))
+
+
+def read_results(path):
+    """
+    Result columns written by fit_files.
+    """
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _run_pool(jobs, n_workers, max_pending):
+    """
+    Rows of the jobs fitted on a pool, with at most max_pending jobs
+    submitted and not yet collected at any time.
+    """
+    # multiprocessing is only loaded when a pool is used.
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                    wait)
+    rows = [None] * len(jobs)
+    pending = {}
+
+    def collect(future):
+        # A crashed worker (BrokenProcessPool, MemoryError, ...) fails only
+        # its own files; the rows already collected are kept.
+        index = pending.pop(future)
+        try:
+            rows[index] = future.result()
+        except Exception as exc:    # pylint: disable=broad-except
+            rows[index] = _error_row(jobs[index][0], exc)
+
+    with ProcessPoolExecutor(n_workers) as pool:
+        for index, job in enumerate(jobs):
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            try:
+                pending[pool.submit(_fit_file, job)] = index
+            except Exception as exc:    # pylint: disable=broad-except
+                rows[index] = _error_row(job[0], exc)
+        for future in list(pending):
+            collect(future)
+    return rows
+
+
+def _fit_file(job):
+    """
+    Row of results of one (path, headers, chunksize) job, with the error
+    of a file that could not be fitted instead of raising it.
+    """
+    path, headers, chunksize = job
+    try:
+        accumulator = FitAccumulator()
+        for block in read_csv_blocks(path, headers, chunksize):
+            try:
+                block = validate_fit_data(*block, min_points=0)
+            except (ValueError, ZeroDivisionError) as exc:
+                # The indices of the error count from the block's start.
+                raise type(exc)(f"Rows {accumulator.count} on: "
+                                f"{exc}") from exc
+            accumulator.update(*block)
+        return dict(accumulator.result(), path=path,
+                    points=accumulator.count, error='')
+    except (OSError, KeyError, TypeError, ValueError,
+            ZeroDivisionError) as exc:
+        return _error_row(path, exc)
+
+
+def _error_row(path, exc):
+    """
+    Row of results of a file that failed with exc.
+    """
+    message = exc.args[0] if isinstance(exc, KeyError) and exc.args \
+        else str(exc)
+    return {'path': path, 'points': 0,
+            'error': f"{type(exc).__name__}: {message}"}
+
+
+def _check_chunksize(chunksize):
+    if isinstance(chunksize, bool) or not isinstance(chunksize, int) \
+            or chunksize < 1:
+        raise TypeError("Chunksize must be a positive integer.")
+
+
+def _to_columns(rows):
+    """
+    Result columns of the rows of fit_files.
+    """
+    columns = {'path': np.array([row['path'] for row in rows], dtype=str),
+               'points': np.array([row['points'] for row in rows],
+                                  dtype=np.int64)}
+    for key in RESULT_KEYS:
+        columns[key] = np.array([row.get(key, np.nan) for row in rows],
+                                dtype=np.float64)
+    columns['error'] = np.array([row['error'] for row in rows], dtype=str)
+    return columns
+
+
+def main(argv=None):
+    """
+    Command line entry point; returns the exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('sources', nargs='+',
+                        help='CSV files, directories or glob patterns')
+    parser.add_argument('--output', required=True,
+                        help='.npz file to write the results to')
+    parser.add_argument('--x', default='x', help='header of the x column')
+    parser.add_argument('--y', default='y', help='header of the y column')
+    parser.add_argument('--sigma', default='sigma',
+                        help="header of the sigma column, '' for none")
+    parser.add_argument('--workers', type=int, help='worker processes')
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE,
+                        help='rows of a file read at a time')
+    args = parser.parse_args(argv)
+
+    try:
+        columns = fit_files(args.sources, args.output, args.x, args.y,
+                            args.sigma or None, args.chunksize, args.workers)
+    except (FileNotFoundError, TypeError) as exc:
+        parser.error(str(exc))
+    failed = np.flatnonzero(columns['error'] != '')
+    print(f"Fitted {columns['path'].size - failed.size} of "
+          f"{columns['path'].size} files into {args.output}.")
+    for i in failed:
+        print(f"FAILED {columns['path'][i]}: {columns['error'][i]}")
+    return 1 if failed.size else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
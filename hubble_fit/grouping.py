@@ -0,0 +1,100 @@
+"""
+Per-group averages of velocity-distance data.
+
+group_statistics reduces objects to one point per group (mean r, mean v,
+standard error of v and member count), as done for the nine groups of
+Hubble's Figure 1. Labels are turned into integer group codes once, and
+every per-group sum is a single np.bincount over those codes, so it
+scales to millions of objects and thousands of groups. Only the distinct
+object names, not every object, pass through the label map.
+"""
+
+import numpy as np
+
+
+def group_statistics(objects, r, v, label_map=None, dropna=True):
+    """
+    Mean distance, mean velocity and standard error of the velocity of
+    every group of objects.
+
+    Parameters:
+    - objects (array_like): Name or group key of every object.
+    - r (array_like): Distance of every object.
+    - v (array_like): Velocity of every object.
+    - label_map (dict, optional): Maps object names to group labels.
+      Objects missing from it are left out. If None, objects are used as
+      the group labels directly.
+    - dropna (bool): Leave out groups whose standard error is undefined
+      (a single member).
+
+    Returns:
+    - numpy structured array, one row per group sorted by label, with
+      fields 'group', 'x' (mean r), 'y' (mean v), 'sigma' (standard
+      error of v, sample standard deviation / sqrt(count)) and 'count'.
+      x, y and sigma can be passed straight to a weighted fit.
+
+    Defined Errors:
+    - Inputs not 1-D of the same length.
+    """
+    objects = np.asarray(objects)
+    r = np.asarray(r, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    if objects.ndim != 1 or not objects.shape == r.shape == v.shape:
+        raise TypeError("Data must be 1-D arrays of same length.")
+
+    # Only the distinct object names go through the label map.
+    names, codes = _factorize(objects)
+    if label_map is not None:
+        mapped = [label_map.get(name) for name in names.tolist()]
+        groups = np.unique([i for i in mapped if i is not None])
+        lookup = {label: code for code, label in enumerate(groups.tolist())}
+        name_to_group = np.array([lookup.get(i, -1) for i in mapped],
+                                 dtype=np.intp)
+        codes = name_to_group[codes]
+        keep = codes >= 0
+        codes, r, v = codes[keep], r[keep], v[keep]
+    else:
+        groups = names
+    m = groups.size
+    count = np.bincount(codes, minlength=m)
+    mean_r = np.bincount(codes, r, minlength=m) / count
+    # Velocities are shifted by one member of their group so the sums of
+    # squares do not lose precision to large common offsets.
+    anchor = np.zeros(m)
+    anchor[codes] = v
+    shifted = v - anchor[codes]
+    sum_shift = np.bincount(codes, shifted, minlength=m)
+    sum_square = np.bincount(codes, shifted * shifted, minlength=m)
+    mean_v = anchor + sum_shift / count
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (sum_square - sum_shift**2 / count) / (count - 1)
+        std_error = np.sqrt(np.maximum(variance, 0.0) / count)
+    std_error[count < 2] = np.nan
+
+    result = np.empty(m, dtype=[('group', groups.dtype), ('x', np.float64),
+                                ('y', np.float64), ('sigma', np.float64),
+                                ('count', np.intp)])
+    result['group'] = groups
+    result['x'] = mean_r
+    result['y'] = mean_v
+    result['sigma'] = std_error
+    result['count'] = count
+    if dropna:
+        result = result[np.isfinite(std_error)]
+    return result
+
+
+def _factorize(keys):
+    """
+    Sorted distinct keys and the integer code of every key. Integer keys
+    spanning a small range are coded with one bincount instead of a sort.
+    """
+    if keys.dtype.kind in 'iu' and keys.size:
+        low = keys.min()
+        span = int(keys.max()) - int(low)
+        if span < 4 * keys.size + 1024:
+            present = np.bincount(keys - low, minlength=span + 1) > 0
+            names = (np.flatnonzero(present) + low).astype(keys.dtype)
+            codes = (np.cumsum(present) - 1)[keys - low]
+            return names, codes
+    return np.unique(keys, return_inverse=True)
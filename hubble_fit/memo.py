@@ -0,0 +1,199 @@
+"""
+Content-addressed memoization of fit results.
+
+FitCache.memoize wraps a fit function (fit, linear_fit, dict_maker,
+compute_with_cython, fit_batch, ...) so that calls with identical data and
+options return the stored result instead of fitting again. The key is a
+BLAKE2 digest of the function name and of every argument: arrays (and
+lists of numbers, converted to arrays) by dtype, shape and raw bytes,
+tuples, other lists and dicts item by item, everything else by its pickle
+(repr if it can not be pickled). Lambdas and closures, whose names are not
+unique, are also keyed by their identity, so they only share results
+within one process. Results are kept in memory in least-recently-used
+order under a byte budget and, if a directory is given, also pickled to
+disk so other processes can reuse them.
+"""
+
+from collections import OrderedDict
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+
+class FitCache:
+    """
+    LRU cache of fit results keyed by the contents of the inputs.
+
+    Parameters:
+    - max_bytes (int): Memory budget of the stored results.
+    - directory (str, optional): If given, results are also written there
+      and looked up on a memory miss.
+
+    Attributes:
+    - hits (int): Calls answered from memory or disk.
+    - misses (int): Calls that ran the fit.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def memoize(self, func):
+        """
+        Returns func wrapped with this cache. Exceptions are not cached.
+        """
+        name = f'{func.__module__}.{func.__qualname__}'
+        if '<' in name:    # <lambda> or <locals>: the name is not unique.
+            name += f'#{id(func)}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(name, args, kwargs)
+            found, result = self._get(key)
+            if found:
+                return _copy(result)
+            result = func(*args, **kwargs)
+            self._put(key, result)
+            return _copy(result)
+
+        wrapper.cache = self
+        return wrapper
+
+    def info(self):
+        """
+        Dictionary of hits, misses, stored entries and their bytes.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self._bytes}
+
+    def clear(self):
+        """
+        Removes every stored result, in memory and on disk, and resets the
+        counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+        if self.directory is not None:
+            for file in os.listdir(self.directory):
+                if file.endswith('.pkl'):
+                    os.remove(os.path.join(self.directory, file))
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key][0]
+        if self.directory is not None:
+            try:
+                with open(self._disk_path(key), 'rb') as file:
+                    result = pickle.load(file)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                pass
+            else:
+                self._remember(key, result)
+                with self._lock:
+                    self.hits += 1
+                return True, result
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def _put(self, key, result):
+        self._remember(key, result)
+        if self.directory is not None:
+            # Written to a temporary file and renamed, so other processes
+            # never read a partly written result.
+            handle, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, self._disk_path(key))
+
+    def _remember(self, key, result):
+        size = _size_of(result)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+
+def make_key(name, args, kwargs):
+    """
+    Hex digest identifying a call of the function called name.
+    """
+    digest = hashlib.blake2b(name.encode(), digest_size=20)
+    for value in args:
+        _hash_value(digest, value)
+    for keyword, value in sorted(kwargs.items()):
+        digest.update(b'k' + keyword.encode())
+        _hash_value(digest, value)
+    return digest.hexdigest()
+
+
+def _hash_value(digest, value):
+    if isinstance(value, (list, np.ndarray, memoryview)) or \
+            hasattr(value, '__array__'):
+        try:
+            array = np.ascontiguousarray(value)
+        except ValueError:    # Ragged lists, hashed item by item below.
+            array = None
+        if array is not None and array.dtype.kind != 'O':
+            digest.update(f'a{array.dtype.str}{array.shape}'.encode())
+            digest.update(array.reshape(-1).view(np.uint8))
+            return
+    if isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _hash_value(digest, item)
+        return
+    if isinstance(value, dict):
+        digest.update(f'd{len(value)}'.encode())
+        for key, item in value.items():
+            _hash_value(digest, key)
+            _hash_value(digest, item)
+        return
+    try:
+        digest.update(b'p' + pickle.dumps(value, protocol=4))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        digest.update(b'r' + repr(value).encode())
+
+
+def _size_of(result):
+    if isinstance(result, np.ndarray):
+        return result.nbytes + sys.getsizeof(result)
+    if isinstance(result, dict):
+        return sys.getsizeof(result) + sum(
+            sys.getsizeof(k) + _size_of(v) for k, v in result.items())
+    return sys.getsizeof(result)
+
+
+def _copy(result):
+    # Callers get their own copy, so changing it does not change the cache;
+    # arrays inside a dictionary are copied too.
+    if isinstance(result, dict):
+        return {key: _copy(value) for key, value in result.items()}
+    if isinstance(result, np.ndarray):
+        return result.copy()
+    return result
@@ -0,0 +1,241 @@
+"""
+Monte Carlo propagation of the fitted Hubble constant to the age of the
+universe.
+
+Hubble constants are drawn from a normal distribution (the fitted slope
+and its sigma_b), or taken from an existing array such as bootstrap
+slopes, and turned into ages with age_of_univ.age_array, in blocks of a
+fixed size. Each block is converted in place in one reused buffer, so
+memory does not grow with the number of samples.
+
+The mean, standard deviation and range are merged block by block.
+Quantiles are exact: a second pass regenerates the same blocks (each has
+its own child of one SeedSequence) and counts the ages into a fine
+histogram over the whole range; a third keeps only the ages in the
+histogram bins that hold the requested order statistics. A single block
+needs neither.
+"""
+
+import numpy as np
+
+from age_of_univ.age_of_un_funk import age_array
+
+DEFAULT_QUANTILES = (0.025, 0.16, 0.5, 0.84, 0.975)
+HISTOGRAM_BINS = 2**16
+
+
+def age_distribution(slope, sigma_b, n_samples=10**6, unit='Gyr',
+                     quantiles=DEFAULT_QUANTILES, seed=None,
+                     block_size=2**20):
+    """
+    Distribution of the age of the universe for a normally distributed
+    Hubble constant.
+
+    Parameters:
+    - slope (float): Fitted Hubble constant in km/s/Mpc.
+    - sigma_b (float): Its uncertainty.
+    - n_samples (int): Number of Hubble constants drawn.
+    - unit (str): 's', 'yr' or 'Gyr'.
+    - quantiles (sequence of float): Quantiles to report, in [0, 1].
+    - seed (int or None): Seed of the SeedSequence the blocks are drawn
+      with.
+    - block_size (int): Samples drawn and converted at a time.
+
+    Returns:
+    - Dictionary as returned by age_statistics.
+
+    Defined Errors:
+    - n_samples or block_size not positive, sigma_b negative.
+    - Quantiles outside [0, 1].
+    """
+    if n_samples < 1 or block_size < 1:
+        raise ValueError("n_samples and block_size must be positive.")
+    if sigma_b < 0:
+        raise ValueError("sigma_b must not be negative.")
+    sizes = [block_size] * (n_samples // block_size)
+    if n_samples % block_size:
+        sizes.append(n_samples % block_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    buffer = np.empty(min(block_size, n_samples))
+
+    def blocks():
+        for child, size in zip(seeds, sizes):
+            block = buffer[:size]
+            np.random.default_rng(child).standard_normal(out=block)
+            block *= sigma_b
+            block += slope
+            yield block
+
+    return _summarize(blocks, unit, quantiles)
+
+
+def age_statistics(hubble, unit='Gyr', quantiles=DEFAULT_QUANTILES,
+                   block_size=2**20):
+    """
+    Summary of the ages of the universe for an array of Hubble
+    constants, e.g. the bootstrap slopes of resample.bootstrap.
+
+    Parameters:
+    - hubble (array_like): Hubble constants in km/s/Mpc.
+    - unit, quantiles, block_size: As for age_distribution.
+
+    Returns:
+    - Dictionary with 'unit', 'count' (ages used), 'n_invalid' (samples
+      with a Hubble constant <= 0 or not finite, left out), 'mean', 'std'
+      (sample standard deviation), 'min', 'max' and 'quantiles'
+      ({quantile: age}, interpolated linearly as numpy.quantile does).
+
+    Defined Errors:
+    - block_size not positive.
+    - Quantiles outside [0, 1].
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be positive.")
+    hubble = np.asarray(hubble, dtype=np.float64).reshape(-1)
+    buffer = np.empty(min(block_size, hubble.size))
+
+    def blocks():
+        for lo in range(0, hubble.size, block_size):
+            block = buffer[:min(block_size, hubble.size - lo)]
+            block[...] = hubble[lo:lo + block_size]
+            yield block
+
+    return _summarize(blocks, unit, quantiles)
+
+
+def _summarize(blocks, unit, quantiles):
+    """
+    Statistics of the ages of the Hubble constants yielded by blocks(),
+    which must yield the same values every time it is called.
+    """
+    quantiles = np.asarray(quantiles, dtype=np.float64).reshape(-1)
+    if np.any((quantiles < 0) | (quantiles > 1)):
+        raise ValueError("Quantiles must be between 0 and 1.")
+    moments = [0, 0.0, 0.0]    # count, mean and sum of squared deviations
+    low, high = np.inf, -np.inf
+    n_invalid = 0
+
+    for n_blocks, block in enumerate(blocks(), 1):
+        ages, invalid = _ages(block, unit)
+        n_invalid += invalid
+        if not ages.size:
+            continue
+        _merge(moments, ages)
+        low, high = min(low, ages.min()), max(high, ages.max())
+
+    count = moments[0]
+    result = {'unit': unit, 'count': count, 'n_invalid': int(n_invalid),
+              'mean': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan,
+              'quantiles': {float(q): np.nan for q in quantiles}}
+    if not count:
+        return result
+    result.update(mean=float(moments[1]), min=float(low), max=float(high),
+                  std=float(np.sqrt(moments[2] / (count - 1)))
+                  if count > 1 else np.nan)
+    if n_blocks == 1:    # The ages of the only block are still at hand.
+        values = np.quantile(ages, quantiles)
+    else:
+        values = _interpolate(_order_statistics(
+            blocks, unit, quantiles, count, (low, high)), quantiles, count)
+    result['quantiles'] = {float(q): float(v)
+                           for q, v in zip(quantiles, values)}
+    return result
+
+
+def _ages(block, unit):
+    """
+    Converts block in place and returns its valid ages and how many
+    Hubble constants were invalid.
+    """
+    valid = block > 0
+    invalid = block.size - np.count_nonzero(valid)
+    with np.errstate(divide='ignore'):    # Zeros are left out below.
+        ages = age_array(block, unit, out=block)
+    if invalid:
+        ages = ages[valid & np.isfinite(ages)]
+    return ages, invalid
+
+
+def _merge(moments, ages):
+    """
+    Adds a block to the running count, mean and sum of squared deviations
+    (Chan, Golub and LeVeque).
+    """
+    n, mean, m2 = moments
+    k = ages.size
+    block_mean = ages.mean()
+    deviations = ages - block_mean
+    block_m2 = np.dot(deviations, deviations)
+    delta = block_mean - mean
+    total = n + k
+    moments[:] = [total, mean + delta * k / total,
+                  m2 + block_m2 + delta * delta * n * k / total]
+
+
+def _histogram_index(ages, edges):
+    """
+    Histogram bin of every age, for HISTOGRAM_BINS bins between edges;
+    bin 0 holds the ages below and the last bin the ages above the range.
+    """
+    low, high = edges
+    scale = HISTOGRAM_BINS / (high - low) if high > low else 0.0
+    index = (ages - low) * scale
+    np.floor(index, out=index)
+    np.clip(index, -1, HISTOGRAM_BINS, out=index)
+    return index.astype(np.intp) + 1
+
+
+def _ranks(quantiles, count):
+    """
+    0-based order statistics needed for the quantiles, with numpy's
+    linear interpolation.
+    """
+    position = quantiles * (count - 1)
+    return np.unique(np.concatenate([np.floor(position),
+                                     np.ceil(position)]).astype(np.int64))
+
+
+def _order_statistics(blocks, unit, quantiles, count, edges):
+    """
+    Second and third pass: the histogram of the ages between edges, the
+    range of all of them, then the sorted ages of the bins holding the
+    needed order statistics, with the number of ages below each of those
+    bins.
+    """
+    counts = np.zeros(HISTOGRAM_BINS + 2, dtype=np.int64)
+    for block in blocks():
+        counts += np.bincount(_histogram_index(_ages(block, unit)[0], edges),
+                              minlength=HISTOGRAM_BINS + 2)
+    ranks = _ranks(quantiles, count)
+    cumulative = np.cumsum(counts)
+    bins = np.unique(np.searchsorted(cumulative, ranks, side='right'))
+    selected = []
+    for block in blocks():
+        ages = _ages(block, unit)[0]
+        index = _histogram_index(ages, edges)
+        selected.append(ages[np.isin(index, bins)])
+    values = np.sort(np.concatenate(selected))
+    below = np.concatenate([[0], cumulative])[bins]
+    return bins, below, counts[bins], values
+
+
+def _interpolate(kept, quantiles, count):
+    """
+    Quantiles from the order statistics found by _order_statistics.
+    """
+    bins, below, sizes, values = kept
+    # Position of every selected bin's first age in values.
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    def order_statistic(rank):
+        j = np.searchsorted(below + sizes, rank, side='right')
+        return values[starts[j] + rank - below[j]]
+
+    position = quantiles * (count - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    result = []
+    for p, lo, hi in zip(position, lower, upper):
+        a, b = order_statistic(lo), order_statistic(hi)
+        result.append(a + (b - a) * (p - lo))
+    return np.array(result)
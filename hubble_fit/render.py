@@ -0,0 +1,295 @@
+"""
+Headless figures of the straight-line fit for data of any size.
+
+Drawing one error bar per point takes time and memory in proportion to
+the data, so beyond max_points the data are aggregated before drawing:
+- 'binned': weighted means of y in bins of x, with the error of each mean.
+- 'density': a 2-D histogram of the points as an image.
+Either way the figure holds O(bins) artists, and the fit line with its
+confidence band (from the parameter covariance of FitAccumulator) is drawn
+on top. Figures are built on matplotlib's Figure and saved straight to
+files, without pyplot or a display, so they can be rendered on servers and
+in worker processes.
+
+render_batch renders many figures on a pool of worker processes. Each
+worker imports matplotlib once, when it starts, and then renders every
+figure it is given.
+"""
+
+import os
+
+import numpy as np
+
+from .accumulator import FitAccumulator
+
+MODES = ('auto', 'points', 'binned', 'density')
+
+# Largest number of points drawn one by one in 'auto' mode.
+MAX_POINTS = 10000
+
+
+def binned_means(x, y, sigma=None, bins=50, limits=None):
+    """
+    Weighted mean of y in equal-width bins of x.
+
+    Parameters:
+    - x (array_like): x values.
+    - y (array_like): y values.
+    - sigma (array_like, optional): Uncertainty values for y; if None,
+      plain means with the standard error from the scatter in each bin.
+    - bins (int): Number of bins.
+    - limits (tuple of float, optional): Range of the bins; the range of
+      x if None.
+
+    Returns:
+    - Dictionary of numpy arrays over the non-empty bins:
+      'x': bin centres, 'y': means, 'error': errors of the means (NaN for
+      a single unweighted point), 'count': points per bin.
+
+    Defined Errors:
+    - Data not 1-D of the same length, or empty.
+    - Element of sigma too small (divide by zero).
+    """
+    x, y, sigma = _as_arrays(x, y, sigma)
+    if x.size == 0:
+        raise TypeError("Not enough data to plot.")
+    low, high = (x.min(), x.max()) if limits is None else limits
+    edges = np.linspace(low, high, bins + 1)
+    ids = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, bins - 1)
+    inside = (x >= low) & (x <= high)
+    ids, y = ids[inside], y[inside]
+    weight = np.ones_like(y) if sigma is None else sigma[inside]**-2
+
+    count = np.bincount(ids, minlength=bins)
+    s = np.bincount(ids, weight, minlength=bins)
+    filled = count > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.bincount(ids, weight * y, minlength=bins) / s
+        if sigma is None:
+            spread = np.bincount(ids, (y - mean[ids])**2, minlength=bins)
+            error = np.sqrt(spread / (count - 1) / count)
+        else:
+            error = 1.0 / np.sqrt(s)
+    centres = 0.5 * (edges[:-1] + edges[1:])
+    return {'x': centres[filled], 'y': mean[filled],
+            'error': error[filled], 'count': count[filled]}
+
+
+def fit_band(accumulator, x, n_sigma=1.0):
+    """
+    Fitted line and its confidence band.
+
+    Parameters:
+    - accumulator (FitAccumulator): Statistics of the fitted data.
+    - x (array_like): x values to evaluate the line at.
+    - n_sigma (float): Half-width of the band in standard deviations.
+
+    Returns:
+    - Tuple of numpy arrays (line, low, high) at x.
+
+    Defined Errors:
+    - As for FitAccumulator.result.
+    """
+    fit = accumulator.result()
+    x = np.asarray(x, dtype=np.float64)
+    line = fit['intercept'] + fit['slope'] * x
+    # Variance of a + b x, with cov(a, b) = -mean_x / c_xx.
+    dx = x - accumulator.mean_x
+    width = n_sigma * np.sqrt(1.0 / accumulator.weight_sum
+                              + dx * dx / accumulator.c_xx)
+    return line, line - width, line + width
+
+
+def render_fit(x, y, sigma, path, mode='auto', bins=50,
+               max_points=MAX_POINTS, n_sigma=1.0, title=None,
+               labels=('r ($10^6$ parsecs)', 'v (km/s)'), figsize=(8, 6),
+               dpi=100):
+    """
+    Fit the data and save a figure of the data, fit line and band.
+
+    Parameters:
+    - x (array_like): Distances.
+    - y (array_like): Velocities.
+    - sigma (array_like or None): Uncertainties of y; if None, all 1 for
+      the fit, no error bars in 'points' mode and a band scaled by the
+      scatter of the residuals, sqrt(chi2 / (n - 2)).
+    - path (str): Output file; the format follows the extension (.png,
+      .pdf, .svg, ...).
+    - mode (str): One of MODES; 'auto' draws the points up to max_points
+      and binned means beyond.
+    - bins (int or tuple of int): Bins of 'binned' (along x) or 'density'
+      (along x and y, or one number for both).
+    - max_points (int): Largest number of points drawn one by one in
+      'auto' mode.
+    - n_sigma (float): Half-width of the confidence band.
+    - title (str, optional): Figure title.
+    - labels (tuple of str): x and y axis labels.
+    - figsize (tuple of float), dpi (int): Size and resolution.
+
+    Returns:
+    - Dictionary of intercept, slope, error of each and quality of fit
+      (FitAccumulator.result) plus 'mode', the mode that was drawn, and
+      'path'.
+
+    Defined Errors:
+    - As for FitAccumulator.
+    - Unknown mode (ValueError).
+    """
+    # matplotlib is only loaded when a figure is drawn.
+    # pylint: disable=import-outside-toplevel
+    from matplotlib.colors import LogNorm
+    from matplotlib.figure import Figure
+
+    if mode not in MODES:
+        raise ValueError(f"Mode must be one of {', '.join(MODES)}.")
+    x, y, weighted = _as_arrays(x, y, sigma)
+    sigma = np.ones_like(x) if weighted is None else weighted
+    accumulator = FitAccumulator().update(x, y, sigma)
+    result = accumulator.result()
+    if mode == 'auto':
+        mode = 'points' if x.size <= max_points else 'binned'
+
+    figure = Figure(figsize=figsize)
+    ax = figure.add_subplot()
+    if mode == 'points':
+        ax.errorbar(x, y, yerr=weighted, fmt='o', color='purple',
+                    markersize=3, label='Data')
+    elif mode == 'binned':
+        means = binned_means(x, y, weighted, bins)
+        ax.errorbar(means['x'], means['y'], yerr=means['error'], fmt='o',
+                    color='purple', markersize=3,
+                    label=f'Binned means ({x.size} points)')
+    else:
+        counts, x_edges, y_edges = np.histogram2d(x, y, bins)
+        image = ax.pcolormesh(x_edges, y_edges,
+                              np.ma.masked_equal(counts.T, 0),
+                              norm=LogNorm(), cmap='Purples')
+        figure.colorbar(image, ax=ax, label='Points per bin')
+
+    scale = 1.0
+    if weighted is None and x.size > 2:
+        scale = np.sqrt(result['chi_squared'] / (x.size - 2))
+    grid = np.linspace(x.min(), x.max(), 200)
+    line, low, high = fit_band(accumulator, grid, n_sigma * scale)
+    ax.fill_between(grid, low, high, color='red', alpha=0.25, linewidth=0,
+                    label=f'{n_sigma:g}$\\sigma$ band')
+    ax.plot(grid, line, color='red',
+            label=f'Best Fit Line: v = {result["intercept"]:.2f} + '
+                  f'{result["slope"]:.2f}*r')
+    ax.set_xlabel(labels[0])
+    ax.set_ylabel(labels[1])
+    if title is not None:
+        ax.set_title(title)
+    ax.legend(loc='upper left')
+    ax.grid(True)
+    figure.savefig(path, dpi=dpi)
+    result['mode'] = mode
+    result['path'] = path
+    return result
+
+
+def render_batch(jobs, n_workers=None):
+    """
+    Render many figures with render_fit on a pool of worker processes.
+
+    Parameters:
+    - jobs (iterable of dict): Keyword arguments of render_fit per figure.
+    - n_workers (int or None): Worker processes; 1 renders in this
+      process, None uses all CPUs.
+
+    Returns:
+    - List with one entry per job, in order: the result of render_fit, or
+      {'path': path, 'error': message} for a job whose data could not be
+      fitted.
+    """
+    jobs = list(jobs)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers == 1 or len(jobs) < 2:
+        _init_worker()
+        return [_render_job(job) for job in jobs]
+    # multiprocessing is only loaded when a pool is used.
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(min(n_workers, len(jobs)),
+                             initializer=_init_worker) as pool:
+        return list(pool.map(_render_job, jobs))
+
+
+def render_groups(x, y, sigma, groups, directory, extension='png',
+                  n_workers=None, **options):
+    """
+    Render one figure per group of the data with render_batch.
+
+    Parameters:
+    - x, y, sigma: As for render_fit.
+    - groups (array_like): Group label of every point.
+    - directory (str): Output directory, created if missing; figure of
+      group g is '<directory>/<g>.<extension>'.
+    - extension (str): File format.
+    - n_workers: As for render_batch.
+    - options: Further keyword arguments of render_fit; the title
+      defaults to the group label.
+
+    Returns:
+    - Dictionary of group label -> entry of render_batch.
+
+    Defined Errors:
+    - Data not 1-D of the same length.
+    """
+    x, y, sigma = _as_arrays(x, y, sigma)
+    groups = np.asarray(groups)
+    if groups.shape != x.shape:
+        raise TypeError("Data must be 1-D arrays of same length.")
+    os.makedirs(directory, exist_ok=True)
+    labels, ids = np.unique(groups, return_inverse=True)
+    # Points of each group, in their original order.
+    order = np.argsort(ids, kind='stable')
+    bounds = np.searchsorted(ids[order], np.arange(labels.size + 1))
+    jobs = []
+    for label, lo, hi in zip(labels, bounds[:-1], bounds[1:]):
+        part = order[lo:hi]
+        name = str(label).replace(os.sep, '_')
+        jobs.append(dict(options, x=x[part], y=y[part],
+                         sigma=None if sigma is None else sigma[part],
+                         path=os.path.join(directory,
+                                           f'{name}.{extension}'),
+                         title=options.get('title', str(label))))
+    results = render_batch(jobs, n_workers)
+    return {label.item(): result for label, result in zip(labels, results)}
+
+
+def _as_arrays(x, y, sigma):
+    """
+    x, y and sigma (None kept) as checked 1-D float64 arrays.
+    """
+    x, y = (np.asarray(i, dtype=np.float64) for i in (x, y))
+    if sigma is not None:
+        sigma = np.asarray(sigma, dtype=np.float64)
+        if sigma.shape != x.shape:
+            raise TypeError("Data must be 1-D arrays of same length.")
+        if np.any(np.abs(sigma) < 0.00001):    # Avoids divide by 0 error.
+            raise ZeroDivisionError("Element of sigma is too small.")
+    if x.ndim != 1 or x.shape != y.shape:
+        raise TypeError("Data must be 1-D arrays of same length.")
+    return x, y, sigma
+
+
+def _init_worker():
+    """
+    Imports the parts of matplotlib render_fit needs, once per process.
+    """
+    # pylint: disable=import-outside-toplevel,unused-import
+    import matplotlib.backends.backend_agg  # noqa: F401
+    import matplotlib.colors  # noqa: F401
+    import matplotlib.figure  # noqa: F401
+
+
+def _render_job(job):
+    """
+    render_fit of one job, with fit errors returned instead of raised.
+    """
+    try:
+        return render_fit(**job)
+    except (TypeError, ZeroDivisionError) as exc:
+        return {'path': job.get('path'), 'error': str(exc)}
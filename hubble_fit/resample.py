@@ -0,0 +1,213 @@
+"""
+Bootstrap and jackknife uncertainties for the weighted straight-line fit.
+
+A bootstrap resample of n points is described by how often each original
+point was drawn, so a block of resamples is a (block, n) matrix of
+multinomial counts. The weighted sums of every resample in the block then
+come from one matrix product with the per-point terms, without gathering
+the resampled data. Blocks are independent: each gets its own child of one
+SeedSequence, so the samples are reproducible for a given seed whatever
+the number of worker processes that computes them.
+
+The jackknife (leave-one-out) estimates come from the full-data sums minus
+each point's own terms, which is O(n).
+"""
+
+import os
+
+import numpy as np
+
+from age_of_univ.age_of_un_funk import age
+
+# Fields of the sample arrays returned by bootstrap and jackknife.
+# age is age_of_univ.age of the slope (seconds for a slope in km/s/Mpc).
+SAMPLE_DTYPE = np.dtype([
+    ('intercept', np.float64),
+    ('slope', np.float64),
+    ('age', np.float64),
+])
+
+# Data of a pool worker process, set once by _init_worker. Only pool
+# workers use it; the serial path passes the data to _fit_block directly.
+_WORKER_DATA = {}
+
+
+def bootstrap(x, y, sigma=None, n_resamples=100000, confidence=0.95,
+              seed=None, block_size=2000, n_workers=1):
+    """
+    Bootstrap distribution of the intercept, slope and age of the universe.
+
+    Parameters:
+    - x (array_like): Distances.
+    - y (array_like): Velocities.
+    - sigma (array_like, optional): Uncertainties of y; None for an
+      unweighted fit as in fit_param.
+    - n_resamples (int): Number of bootstrap resamples.
+    - confidence (float): Level of the percentile intervals.
+    - seed (int or None): Seed of the SeedSequence the block streams are
+      spawned from.
+    - block_size (int): Resamples drawn and fitted together; memory use is
+      about 8 * block_size * len(x) bytes per process.
+    - n_workers (int or None): Worker processes; 1 computes in this
+      process, None uses all CPUs.
+
+    Returns:
+    - Dictionary with:
+      'samples': structured array (SAMPLE_DTYPE) of the valid resamples,
+      'intervals': {field: (low, high)} percentile intervals,
+      'confidence': the confidence level,
+      'n_failed': resamples dropped because all their x were equal.
+
+    Defined Errors:
+    - Data not 1-D of the same length, or fewer than 3 datapoints.
+    - Element of sigma too small (divide by zero).
+    - n_resamples or block_size not positive, confidence not in (0, 1).
+    """
+    terms, shifts = _fit_terms(x, y, sigma)
+    if n_resamples < 1 or block_size < 1:
+        raise ValueError("n_resamples and block_size must be positive.")
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1.")
+
+    sizes = [block_size] * (n_resamples // block_size)
+    if n_resamples % block_size:
+        sizes.append(n_resamples % block_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers == 1 or len(sizes) == 1:
+        blocks = [_fit_block(terms, shifts, s, k)
+                  for s, k in zip(seeds, sizes)]
+    else:
+        # multiprocessing is only loaded when a pool is used.
+        # pylint: disable=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(n_workers, initializer=_init_worker,
+                                 initargs=(terms, shifts)) as pool:
+            blocks = list(pool.map(_bootstrap_block, seeds, sizes))
+
+    samples = np.concatenate(blocks)
+    valid = np.isfinite(samples['slope'])
+    samples = samples[valid]
+    return {
+        'samples': samples,
+        'intervals': percentile_intervals(samples, confidence),
+        'confidence': confidence,
+        'n_failed': int(valid.size - valid.sum()),
+    }
+
+
+def jackknife(x, y, sigma=None):
+    """
+    Jackknife (leave-one-out) estimates of the intercept, slope and age.
+
+    Parameters:
+    - x, y, sigma: As for bootstrap.
+
+    Returns:
+    - Dictionary with:
+      'samples': structured array (SAMPLE_DTYPE), row i fitted without
+      point i,
+      'estimate', 'bias', 'standard_error': {field: float} jackknife
+      estimates from the leave-one-out samples.
+
+    Defined Errors:
+    - As for bootstrap.
+    """
+    terms, shifts = _fit_terms(x, y, sigma)
+    n = terms.shape[1]
+    full = terms.sum(axis=1)
+    samples = _solve(full[:, None] - terms, shifts)
+    fitted = _solve(full[:, None], shifts)[0]
+
+    estimate, bias, error = {}, {}, {}
+    for name in SAMPLE_DTYPE.names:
+        mean = samples[name].mean()
+        bias[name] = float((n - 1) * (mean - fitted[name]))
+        estimate[name] = float(fitted[name] - bias[name])
+        error[name] = float(np.sqrt((n - 1) / n * np.sum(
+            (samples[name] - mean)**2)))
+    return {'samples': samples, 'estimate': estimate, 'bias': bias,
+            'standard_error': error}
+
+
+def percentile_intervals(samples, confidence=0.95):
+    """
+    Equal-tailed percentile interval of every field of samples.
+    """
+    tails = [50 * (1 - confidence), 50 * (1 + confidence)]
+    return {name: tuple(float(i) for i in np.percentile(samples[name],
+                                                        tails))
+            for name in samples.dtype.names}
+
+
+def _fit_terms(x, y, sigma):
+    """
+    Per-point terms whose sums give a weighted fit: rows are w, w*x, w*y,
+    w*x*x and w*x*y, shape (5, n), with x and y shifted by their weighted
+    means (returned as the second value) to limit cancellation.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    sigma = np.ones_like(x) if sigma is None else np.asarray(
+        sigma, dtype=np.float64)
+    if x.ndim != 1 or not x.shape == y.shape == sigma.shape:
+        raise TypeError("Data must be 1-D arrays of same length.")
+    if x.size < 3:
+        raise TypeError("Not enough data to resample.")
+    if np.any(np.abs(sigma) < 0.00001):    # Avoids divide by 0 error.
+        raise ZeroDivisionError("Element of sigma is too small.")
+
+    w = sigma**-2
+    x0 = np.dot(w, x) / w.sum()
+    y0 = np.dot(w, y) / w.sum()
+    dx = x - x0
+    dy = y - y0
+    return np.stack([w, w * dx, w * dy, w * dx * dx, w * dx * dy]), (x0, y0)
+
+
+def _solve(sums, shifts):
+    """
+    Intercept, slope and age from columns of summed terms (5, m) of data
+    shifted by shifts. Degenerate columns (all x equal) give NaN.
+    """
+    s, s_x, s_y, s_xx, s_xy = sums
+    x0, y0 = shifts
+    result = np.empty(s.shape[0], dtype=SAMPLE_DTYPE)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = s * s_xx - s_x * s_x
+        # Relative test: rounding leaves denom slightly off zero
+        # when all x of a resample are equal.
+        valid = denom > 1e-10 * s * s_xx
+        slope = np.where(valid, (s * s_xy - s_x * s_y) / denom, np.nan)
+        result['slope'] = slope
+        result['intercept'] = (y0 + s_y / s) - slope * (x0 + s_x / s)
+        result['age'] = age(slope)
+    return result
+
+
+def _init_worker(terms, shifts):
+    """
+    Stores the per-point terms in the worker process.
+    """
+    _WORKER_DATA['terms'] = terms
+    _WORKER_DATA['shifts'] = shifts
+
+
+def _bootstrap_block(seed, size):
+    """
+    _fit_block on the data of the pool worker.
+    """
+    return _fit_block(_WORKER_DATA['terms'], _WORKER_DATA['shifts'], seed,
+                      size)
+
+
+def _fit_block(terms, shifts, seed, size):
+    """
+    Fits size resamples drawn with the stream of seed.
+    """
+    n = terms.shape[1]
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(n, np.full(n, 1.0 / n), size=size)
+    return _solve(terms @ counts.T.astype(np.float64), shifts)
@@ -0,0 +1,190 @@
+"""
+Robust straight-line fits by iteratively reweighted least squares.
+
+Each iteration is one ordinary weighted fit from fit_batch, with the
+uncertainties sigma / sqrt(u) where u are robust weights in [0, 1]
+computed from the standardized residuals of the previous fit:
+- Huber: u = min(1, c / |z|), which limits the pull of large residuals.
+- Tukey biweight: u = (1 - (z / c)**2)**2 for |z| < c and 0 beyond, which
+  drops gross outliers completely.
+Here z = (y - a - b*x) / sigma / scale, with scale the normalized median
+absolute standardized residual (re-estimated every iteration; residuals
+of a fit are centred on zero already) or a fixed value. The iterations
+start from the ordinary weighted fit and stop when neither parameter of
+a series moves by more than tol times its standard error. Batches of
+series are fitted together in the layouts of fit_batch, so one iteration
+costs a few whole-array passes for the whole batch.
+"""
+
+import numpy as np
+
+from .batch import FIT_DTYPE, fit_batch
+
+# Tuning constants with 95% efficiency for normally distributed errors.
+TUNING = {'huber': 1.345, 'tukey': 4.685}
+# Makes the median absolute residual estimate the standard deviation of
+# normally distributed residuals.
+MAD_NORMAL = 1.482602218505602
+
+# Columns of the structured array returned by robust_fit_batch.
+ROBUST_DTYPE = np.dtype(FIT_DTYPE.descr + [
+    ('scale', np.float64),
+    ('iterations', np.intp),
+    ('converged', np.bool_),
+])
+
+
+def robust_fit(x, y, sigma=None, method='huber', tuning=None, scale=None,
+               tol=1e-3, max_iter=50):
+    """
+    Perform a robust weighted least-squares linear fit.
+
+    Parameters:
+    - x (array_like): x values.
+    - y (array_like): y values.
+    - sigma (array_like, optional): Uncertainty values for y; all 1 if
+      None.
+    - method (str): 'huber' or 'tukey'.
+    - tuning (float, optional): Tuning constant c; TUNING[method] if None.
+    - scale (float, optional): Fixed scale of the standardized residuals,
+      e.g. 1.0 to trust sigma; estimated from the residuals if None.
+    - tol (float): Largest change of the intercept and slope at
+      convergence, relative to sigma_a and sigma_b.
+    - max_iter (int): Largest number of reweighted fits.
+
+    Returns:
+    - Dictionary of intercept, slope, error of each and quality of fit of
+      the final weighted fit (with the same keys as fit), plus 'weights'
+      (numpy array of the final robust weight of every point), 'scale',
+      'iterations' and 'converged'.
+
+    Defined Errors:
+    - As for robust_fit_batch, with data not 1-D of the same length.
+    """
+    arrays = [np.asarray(i, dtype=np.float64) for i in (x, y)]
+    if sigma is not None:
+        arrays.append(np.asarray(sigma, dtype=np.float64))
+    if any(a.ndim != 1 or a.shape != arrays[0].shape for a in arrays):
+        raise TypeError("Data must be 1-D arrays of same length.")
+    result, weights = robust_fit_batch(*(a[None] for a in arrays),
+                                       method=method, tuning=tuning,
+                                       scale=scale, tol=tol,
+                                       max_iter=max_iter)
+    fit = {name: result[name].item() for name in ROBUST_DTYPE.names}
+    fit['weights'] = weights[0]
+    return fit
+
+
+def robust_fit_batch(x, y, sigma=None, offsets=None, method='huber',
+                     tuning=None, scale=None, tol=1e-3, max_iter=50):
+    """
+    Perform a robust weighted least-squares linear fit on every series of
+    a batch.
+
+    Parameters:
+    - x, y, sigma, offsets: Series as for fit_batch; sigma all 1 if None.
+    - method, tuning, tol, max_iter: As for robust_fit.
+    - scale (float or array_like, optional): Fixed scale, one for all
+      series or one per series; estimated per series if None.
+
+    Returns:
+    - numpy structured array of length m with the fields of FIT_DTYPE and
+      'scale', 'iterations' and 'converged' (see ROBUST_DTYPE).
+    - numpy array of the final robust weights, same layout as x.
+
+    Defined Errors:
+    - As for fit_batch, also when the weights leave fewer than two
+      distinct x values in a series.
+    - Unknown method, or max_iter less than 1 (ValueError).
+    """
+    if method not in TUNING:
+        raise ValueError(f"Method must be one of {', '.join(TUNING)}.")
+    if max_iter < 1:
+        raise ValueError("max_iter must be at least 1.")
+    tuning = TUNING[method] if tuning is None else tuning
+    x, y = (np.asarray(i, dtype=np.float64) for i in (x, y))
+    sigma = np.ones_like(x) if sigma is None else np.asarray(
+        sigma, dtype=np.float64)
+    fit = fit_batch(x, y, sigma, offsets)    # Also checks the input.
+    m = fit.size
+
+    if offsets is None:
+        def spread(values):    # One value per series to every point.
+            return values[:, None]
+    else:
+        offsets = np.asarray(offsets, dtype=np.intp)
+        ids = np.repeat(np.arange(m), np.diff(offsets))
+
+        def spread(values):
+            return values[ids]
+
+    fixed = None if scale is None else np.broadcast_to(
+        np.asarray(scale, dtype=np.float64), (m,))
+    iterations = np.full(m, max_iter, dtype=np.intp)
+    converged = np.zeros(m, dtype=bool)
+    weights = np.ones_like(x)
+    current = fixed if fixed is not None else np.ones(m)
+    for iteration in range(1, max_iter + 1):
+        z = (y - spread(fit['intercept']) - spread(fit['slope']) * x) / sigma
+        if fixed is None:
+            current = np.where(converged, current, _mad_scale(z, offsets))
+        z /= spread(np.maximum(current, np.finfo(np.float64).tiny))
+        # Converged series keep their scale, weights and fit.
+        weights = np.where(spread(converged), weights,
+                           _weights(np.abs(z), method, tuning))
+        previous = fit
+        with np.errstate(divide='ignore'):    # Weight 0 gives sigma inf.
+            fit = fit_batch(x, y, sigma / np.sqrt(weights), offsets)
+        fit[converged] = previous[converged]
+        done = ~converged & (
+            np.abs(fit['intercept'] - previous['intercept'])
+            <= tol * fit['sigma_a']) & (
+            np.abs(fit['slope'] - previous['slope']) <= tol * fit['sigma_b'])
+        iterations[done] = iteration
+        converged |= done
+        if converged.all():
+            break
+
+    result = np.empty(m, dtype=ROBUST_DTYPE)
+    for name in FIT_DTYPE.names:
+        result[name] = fit[name]
+    result['scale'] = current
+    result['iterations'] = iterations
+    result['converged'] = converged
+    return result, weights
+
+
+def _weights(z, method, tuning):
+    """
+    Robust weights of the absolute standardized residuals z.
+    """
+    if method == 'huber':
+        return np.minimum(1.0, tuning / np.maximum(
+            z, np.finfo(np.float64).tiny))
+    t = (z / tuning)**2
+    return np.where(t < 1.0, (1.0 - t)**2, 0.0)
+
+
+def _mad_scale(z, offsets):
+    """
+    Normalized median of |z| of every series.
+    """
+    if offsets is None:
+        return MAD_NORMAL * np.median(np.abs(z), axis=1)
+    return MAD_NORMAL * _ragged_median(np.abs(z), offsets)
+
+
+def _ragged_median(values, offsets):
+    """
+    Median of every series of concatenated values split by offsets.
+    """
+    counts = np.diff(offsets)
+    if np.all(counts == counts[0]):
+        return np.median(values.reshape(counts.size, counts[0]), axis=1)
+    # Sorted by value, then (stably) by series: each series in order.
+    ids = np.repeat(np.arange(counts.size), counts)
+    order = np.argsort(values)
+    ordered = values[order[np.argsort(ids[order], kind='stable')]]
+    start = offsets[:-1]
+    return 0.5 * (ordered[start + (counts - 1) // 2]
+                  + ordered[start + counts // 2])
@@ -0,0 +1,205 @@
+"""
+Weighted straight-line fits over sliding and expanding windows.
+
+The points are taken in the given order (e.g. by distance or by time), and
+window j of a sliding fit holds points j to j + window - 1, window j of an
+expanding fit points 0 to j. Each window's fit needs only the weighted
+sums of fit in pseudo_code/linear_fit.py, which change by one point
+entering and one leaving per step:
+- 'compiled': rolling_compute_with_cython of cython/code/compute.pyx adds
+  and removes points with weighted Welford updates, one pass over the data.
+- 'numpy': every window's sums are differences of running sums. The
+  running sums restart every two window lengths, with the deviations
+  taken from the block's first point, so the rounding errors stay those
+  of a few windows whatever the length of the data. Expanding windows
+  add the total of the earlier blocks (of BLOCK_SIZE points) to the
+  running sums of the last block.
+Both cost O(1) per window, independent of the window length.
+"""
+
+import numpy as np
+
+from .batch import FIT_DTYPE
+from .dispatch import _compiled
+
+# Points per block of running sums of expanding fits in the NumPy path.
+BLOCK_SIZE = 4096
+# Relative size of the spread of x below which the x values of a window
+# count as equal (the rest is rounding of the running sums).
+EQUAL_X_TOLERANCE = 1e-12
+
+
+def rolling_fit(x, y, sigma=None, window=10, backend=None):
+    """
+    Perform a weighted least-squares linear fit on every window of
+    consecutive points.
+
+    Parameters:
+    - x (array_like): x values, in window order.
+    - y (array_like): y values.
+    - sigma (array_like, optional): Uncertainty values for y; all 1 if
+      None.
+    - window (int): Points per window.
+    - backend (str, optional): 'compiled' or 'numpy'; the compiled module
+      if it is built, else NumPy, if None.
+
+    Returns:
+    - numpy structured array (FIT_DTYPE) of len(x) - window + 1 rows; row
+      j is the fit of points j to j + window - 1, NaN if all their x
+      values are equal.
+
+    Defined Errors:
+    - Data not 1-D of the same length, or shorter than the window.
+    - Window of fewer than 2 points.
+    - Element of sigma too small (divide by zero).
+    - Unknown or unavailable backend (ValueError).
+    """
+    x, y, sigma = _as_arrays(x, y, sigma, window)
+    if _use_compiled(backend):
+        return _compiled().rolling_compute_with_cython(x, y, sigma, window)
+    starts = np.arange(x.size - window + 1)
+    return _finish(*_window_sums(x, y, sigma, starts, starts + window,
+                                 2 * window))
+
+
+def expanding_fit(x, y, sigma=None, min_points=2, backend=None):
+    """
+    Perform a weighted least-squares linear fit on every leading run of
+    points.
+
+    Parameters:
+    - x, y, sigma, backend: As for rolling_fit.
+    - min_points (int): Fewest points of a window that is fitted.
+
+    Returns:
+    - numpy structured array (FIT_DTYPE) of len(x) rows; row j is the fit
+      of points 0 to j, NaN if j + 1 < min_points or all their x values
+      are equal.
+
+    Defined Errors:
+    - As for rolling_fit, with min_points as the window.
+    """
+    x, y, sigma = _as_arrays(x, y, sigma, min_points)
+    if _use_compiled(backend):
+        return _compiled().rolling_compute_with_cython(x, y, sigma,
+                                                       min_points, True)
+    # A leading run is the start of its last point's block plus the
+    # total of the blocks before, moved to the origin of that block.
+    n = x.size
+    result = np.empty(n, dtype=FIT_DTYPE)
+    before, origin = np.zeros(6), (x[0], y[0])
+    for lo in range(0, n, BLOCK_SIZE):
+        part = slice(lo, min(lo + BLOCK_SIZE, n))
+        stops = np.arange(1, part.stop - lo + 1)
+        sums, origin_x, origin_y = _window_sums(
+            x[part], y[part], sigma[part], np.zeros_like(stops), stops,
+            BLOCK_SIZE)
+        sums += _shift(before, origin[0] - x[lo], origin[1] - y[lo])[:, None]
+        result[part] = _finish(sums, origin_x, origin_y)
+        before, origin = sums[:, -1], (x[lo], y[lo])
+    result[:min_points - 1] = np.nan
+    return result
+
+
+def _as_arrays(x, y, sigma, window):
+    """
+    x, y and sigma as checked 1-D float64 arrays.
+    """
+    x, y = (np.asarray(i, dtype=np.float64) for i in (x, y))
+    sigma = np.ones_like(x) if sigma is None else np.asarray(
+        sigma, dtype=np.float64)
+    if x.ndim != 1 or not x.shape == y.shape == sigma.shape:
+        raise TypeError("Data must be 1-D arrays of same length.")
+    if window < 2 or x.size < window:
+        raise TypeError("Not enough data to fit.")
+    if np.any(np.abs(sigma) < 0.00001):    # Avoids divide by 0 error.
+        raise ZeroDivisionError("Element of sigma is too small.")
+    return x, y, sigma
+
+
+def _use_compiled(backend):
+    """
+    Whether the compiled module runs for the backend option.
+    """
+    if backend not in (None, 'numpy', 'compiled'):
+        raise ValueError(f"Backend {backend!r} is not available.")
+    if backend == 'compiled' and _compiled() is None:
+        raise ValueError("Backend 'compiled' is not available.")
+    return backend != 'numpy' and _compiled() is not None
+
+
+def _window_sums(x, y, sigma, starts, stops, block):
+    """
+    Weighted sums of the windows starts[j]:stops[j] (none longer than
+    block), as the rows of sum_w, sum_w dx, sum_w dy, sum_w dx dx,
+    sum_w dx dy and sum_w dy dy, with dx and dy the deviations from the
+    first point of the window's first block; then the x and y of that
+    point.
+    """
+    n = x.size
+    n_blocks = -(-n // block)
+    # Deviations from the first point of each block.
+    origin_x, origin_y = x[::block], y[::block]
+    ids = np.arange(n) // block
+    dx, dy = x - origin_x[ids], y - origin_y[ids]
+    weight = sigma**-2
+    terms = np.zeros((6, n_blocks * block))
+    terms[0, :n] = weight
+    terms[1, :n] = weight * dx
+    terms[2, :n] = weight * dy
+    terms[3, :n] = terms[1, :n] * dx
+    terms[4, :n] = terms[1, :n] * dy
+    terms[5, :n] = terms[2, :n] * dy
+    running = np.zeros((6, n_blocks, block + 1))
+    np.cumsum(terms.reshape(6, n_blocks, block), axis=2,
+              out=running[:, :, 1:])
+
+    # A window covers the end of its first block and, if it runs past
+    # it, the start of the next one (empty otherwise).
+    first = starts // block
+    head = running[:, first, np.minimum(stops - first * block, block)] \
+        - running[:, first, starts - first * block]
+    second = np.minimum(first + 1, n_blocks - 1)
+    tail = running[:, second, np.maximum(stops - (first + 1) * block, 0)]
+    tail = _shift(tail, origin_x[second] - origin_x[first],
+                  origin_y[second] - origin_y[first])
+    return head + tail, origin_x[first], origin_y[first]
+
+
+def _shift(sums, shift_x, shift_y):
+    """
+    Sums of deviations from an origin moved by -shift_x, -shift_y.
+    """
+    s, s_x, s_y, s_xx, s_xy, s_yy = sums
+    return np.stack([
+        s,
+        s_x + shift_x * s,
+        s_y + shift_y * s,
+        s_xx + shift_x * (2.0 * s_x + shift_x * s),
+        s_xy + shift_x * s_y + shift_y * (s_x + shift_x * s),
+        s_yy + shift_y * (2.0 * s_y + shift_y * s),
+    ])
+
+
+def _finish(sums, origin_x, origin_y):
+    """
+    Fits from the sums of deviations from (origin_x, origin_y), one origin
+    per window; NaN where all x values of a window are equal.
+    """
+    s, s_x, s_y, s_xx, s_xy, s_yy = sums
+    result = np.empty(s.size, dtype=FIT_DTYPE)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x, mean_y = s_x / s, s_y / s
+        c_xx = s_xx - s_x * mean_x
+        c_xy = s_xy - s_x * mean_y
+        c_yy = s_yy - s_y * mean_y
+        # Within rounding of zero, all x values of the window are equal.
+        c_xx = np.where(c_xx > EQUAL_X_TOLERANCE * s_xx, c_xx, np.nan)
+        b = c_xy / c_xx
+        mean_x += origin_x
+        result['intercept'] = mean_y + origin_y - b * mean_x
+        result['slope'] = b
+        result['sigma_a'] = np.sqrt((1 + mean_x**2 * s / c_xx) / s)
+        result['sigma_b'] = np.sqrt(1.0 / c_xx)
+        result['chi_squared'] = np.maximum(c_yy - b * c_xy, 0.0)
+    return result
@@ -0,0 +1,325 @@
+"""
+Long-running local fit server that batches concurrent small fits.
+
+Many short-lived client processes calling the fit each pay for importing
+NumPy and warming up the fitting code. FitServer does that once and serves
+fits over a Unix socket or a localhost TCP port with asyncio, speaking the
+framed JSON / float64 protocol described in hubble_fit/client.py (whose
+FitClient needs only the standard library).
+
+Micro-batching: every valid request of at most max_points points is put
+in a queue. A single task takes the first waiting request, waits up to
+max_delay seconds for more to arrive, and fits up to max_batch of them
+with one fit_batch call over their concatenated data (backend 'batch').
+As each connection has one request at a time, the task only waits while
+other connections could still send one, so a lone client never waits.
+If the batch call fails (a sum of variance too small or all x values
+equal in one of the series), each request of the batch is fitted on its
+own so that only the failing ones get the error; any other failure of
+a batch is the error of its requests, and the task goes on with the
+next batch. Batches are fitted in a worker thread, so the event loop
+keeps reading and answering requests meanwhile. Larger requests are
+fitted straight away with hubble_fit.fit (the compiled kernel where
+built) in a worker thread. The data of every request is checked first
+with validate_fit_data, so invalid data never reaches a batch.
+
+FitServer.stats gives the request, error and batch counts, the current
+and largest queue depth, and histograms of the request latency (from the
+request being read to its result being ready) and of the batch sizes.
+
+Usage (from the repository root):
+    python -m hubble_fit.server --socket /tmp/hubble_fit.sock
+    python -m hubble_fit.server --port 8642
+"""
+
+import argparse
+import asyncio
+import json
+import os
+
+import numpy as np
+
+from .batch import fit_batch
+from .client import DEFAULT_HOST, DEFAULT_PORT, FRAME, encode_frame
+from .dispatch import RESULT_KEYS, fit
+from .validation import validate_fit_data
+
+# Upper edges in seconds of the latency histogram bins (4 per decade from
+# 10 microseconds to 10 seconds); the last bin holds anything slower.
+LATENCY_EDGES = 10.0 ** np.arange(-5.0, 1.25, 0.25)
+
+# Upper edges of the batch size histogram bins.
+BATCH_EDGES = 2 ** np.arange(11)
+
+
+class FitServer:
+    """
+    asyncio fit server with micro-batching of small requests.
+
+    Parameters:
+    - max_batch (int): Most requests fitted in one batch.
+    - max_delay (float): Seconds a batch waits for more requests after
+      its first one.
+    - max_points (int): Most points of a request fitted in a batch.
+    """
+
+    def __init__(self, max_batch=256, max_delay=0.0005, max_points=4096):
+        if max_batch < 1 or max_delay < 0 or max_points < 2:
+            raise ValueError("max_batch, max_delay and max_points must be "
+                             "positive.")
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_points = max_points
+        self.address = None
+        self._server = None
+        self._queue = None
+        self._batcher = None
+        self._connections = 0
+        self._counts = {'requests': 0, 'errors': 0, 'batches': 0,
+                        'batched_requests': 0, 'max_queue_depth': 0}
+        self._latency = np.zeros(LATENCY_EDGES.size + 1, dtype=np.int64)
+        self._batch_sizes = np.zeros(BATCH_EDGES.size + 1, dtype=np.int64)
+
+    async def start(self, path=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Starts serving on the Unix socket path, or if None on host and
+        port (0 for any free port); the address is then in self.address.
+        """
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batches())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle,
+                                                           path)
+            self.address = path
+        else:
+            self._server = await asyncio.start_server(self._handle, host,
+                                                      port)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self
+
+    async def close(self):
+        """
+        Stops serving and removes the Unix socket.
+        """
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    async def serve_forever(self):
+        """
+        Serves until cancelled.
+        """
+        await self._server.serve_forever()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def stats(self):
+        """
+        Statistics of the requests served so far.
+
+        Returns:
+        - Dictionary of the counts 'requests', 'errors', 'batches' and
+          'batched_requests', the current 'queue_depth' and
+          'max_queue_depth', and the histograms 'latency' and
+          'batch_size', each a dictionary of the upper bin 'edges' and
+          the 'counts' (one more, for values beyond the last edge), with
+          the 50th and 99th 'percentiles' of the latency as the upper
+          edges of their bins.
+        """
+        stats = dict(self._counts)
+        stats['queue_depth'] = self._queue.qsize() if self._queue else 0
+        stats['latency'] = {
+            'edges': LATENCY_EDGES.tolist(),
+            'counts': self._latency.tolist(),
+            'percentiles': {str(q): _percentile(self._latency, q)
+                            for q in (50, 99)}}
+        stats['batch_size'] = {'edges': BATCH_EDGES.tolist(),
+                               'counts': self._batch_sizes.tolist()}
+        return stats
+
+    async def _handle(self, reader, writer):
+        """
+        Serves the requests of one connection, one after the other.
+        """
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    lengths = await reader.readexactly(FRAME.size)
+                except asyncio.IncompleteReadError:
+                    break
+                header_size, payload_size = FRAME.unpack(lengths)
+                header = await reader.readexactly(header_size)
+                payload = await reader.readexactly(payload_size)
+                writer.write(encode_frame(await self._respond(header,
+                                                              payload)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def _respond(self, header, payload):
+        """
+        Response header of one request.
+        """
+        try:
+            request = json.loads(header)
+            op = request.get('op')
+        except (ValueError, AttributeError):
+            return {'ok': False, 'error': 'ValueError',
+                    'message': "Request is not a JSON object."}
+        if op == 'stats':
+            return {'ok': True, 'stats': self.stats()}
+        if op != 'fit':
+            return {'ok': False, 'error': 'ValueError',
+                    'message': f"Unknown operation {op!r}."}
+
+        start = asyncio.get_running_loop().time()
+        self._counts['requests'] += 1
+        try:
+            result = await self._fit(request, payload)
+        except Exception as exc:    # pylint: disable=broad-except
+            self._counts['errors'] += 1
+            response = {'ok': False, 'error': type(exc).__name__,
+                        'message': str(exc)}
+        else:
+            response = {'ok': True, 'result': result}
+        elapsed = asyncio.get_running_loop().time() - start
+        self._latency[np.searchsorted(LATENCY_EDGES, elapsed)] += 1
+        return response
+
+    async def _fit(self, request, payload):
+        """
+        Result of a fit request, batched if it is small.
+        """
+        x, y, sigma = validate_fit_data(*_request_data(request, payload))
+        if x.size > self.max_points:
+            return await asyncio.to_thread(fit, x, y, sigma)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((x, y, sigma, future))
+        self._counts['max_queue_depth'] = max(
+            self._counts['max_queue_depth'], self._queue.qsize())
+        return await future
+
+    async def _batches(self):
+        """
+        Fits the queued requests in batches, forever.
+        """
+        while True:
+            batch = [await self._queue.get()]
+            # Other connections may send a request in the meantime.
+            waiting = 1 + self._queue.qsize()
+            if self.max_delay and waiting < min(self._connections,
+                                                self.max_batch):
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._counts['batches'] += 1
+            self._counts['batched_requests'] += len(batch)
+            self._batch_sizes[np.searchsorted(BATCH_EDGES, len(batch))] += 1
+            futures = [item[3] for item in batch]
+            try:
+                # In a worker thread, so a large batch does not hold up
+                # the connections.
+                outcomes = await asyncio.to_thread(_fit_items, batch)
+            except Exception as exc:    # pylint: disable=broad-except
+                # Any other failure is the error of this batch only.
+                outcomes = [exc] * len(batch)
+            for future, outcome in zip(futures, outcomes):
+                if future.done():    # The client went away.
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+
+def _request_data(request, payload):
+    """
+    x, y and sigma (or None) of a fit request.
+    """
+    if 'n' not in request:
+        return request.get('x'), request.get('y'), request.get('sigma')
+    n, columns = request['n'], 3 if request.get('sigma') else 2
+    if not isinstance(n, int) or n < 0 or len(payload) != 8 * n * columns:
+        raise TypeError("Payload must hold n float64 values per column.")
+    data = np.frombuffer(payload, dtype='<f8').reshape(columns, n)
+    return data[0], data[1], data[2] if columns == 3 else None
+
+
+def _fit_items(batch):
+    """
+    Results of the (x, y, sigma, future) items of a batch: one fit_batch
+    call over all of them, else each on its own with its result or error.
+    """
+    counts = [item[0].size for item in batch]
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    try:
+        rows = fit_batch(*(np.concatenate([item[k] for item in batch])
+                           for k in range(3)), offsets=offsets)
+    except (TypeError, ValueError, ZeroDivisionError):
+        outcomes = []
+        for x, y, sigma, _ in batch:
+            try:
+                outcomes.append(fit(x, y, sigma, backend='numpy'))
+            except (TypeError, ValueError, ZeroDivisionError) as exc:
+                outcomes.append(exc)
+        return outcomes
+    return [dict({key: float(row[key]) for key in RESULT_KEYS},
+                 backend='batch') for row in rows]
+
+
+def _percentile(counts, q):
+    """
+    Upper edge of the latency bin holding the q-th percentile, None if
+    there is no request or it is beyond the last edge.
+    """
+    total = counts.sum()
+    if not total:
+        return None
+    k = int(np.searchsorted(np.cumsum(counts), q / 100 * total))
+    return float(LATENCY_EDGES[k]) if k < LATENCY_EDGES.size else None
+
+
+async def _serve(args):
+    server = FitServer(args.max_batch, args.max_delay, args.max_points)
+    await server.start(args.socket, args.host, args.port)
+    print(f"Serving fits on {server.address}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    """
+    Command line entry point: serves until interrupted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--socket', help='Unix socket to serve on')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-delay', type=float, default=0.0005,
+                        help='seconds a batch waits for more requests')
+    parser.add_argument('--max-points', type=int, default=4096,
+                        help='largest request fitted in a batch')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
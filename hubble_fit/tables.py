@@ -0,0 +1,298 @@
+"""
+Reader for the whitespace separated Markdown tables of Hubble's data.
+
+The tables (Data/raw_data_table1.md, Data/raw_data_table2.md, ...) have a
+header line of column names and one row per object, with
+- '..' for a missing value (NaN),
+- a leading '+' on positive velocities,
+- quoted names such as 'S.Mag.' (kept with their quotes, as in the
+  GROUP_LABELS of grouped_data_generator.py; a quoted name may contain
+  spaces),
+- '#' starting a comment, e.g. a commented-out row,
+- blank lines between groups.
+
+read_markdown_table parses such a file in one streaming pass over blocks
+of bytes, without a Python loop over lines or values:
+- The bytes of a block are an array; the runs of non-space bytes are the
+  values and the newlines give every value's line, which checks that each
+  row has one value per column.
+- The values of each column are gathered into a fixed-width bytes array.
+- At the end each column is converted as a whole. Plain decimals (digits,
+  an optional sign and point) are parsed digit position by digit
+  position into an integer mantissa and a count of decimals; as both are
+  exact, mantissa / 10**decimals is the correctly rounded float64. A
+  column is int64 if all its values are integers, float64 if all are
+  numbers or '..', else str.
+No pandas is needed.
+"""
+
+import re
+
+import numpy as np
+
+# Bytes read from the file at a time.
+BLOCK_SIZE = 2**22
+
+MISSING = b'..'
+
+# Most digits of a plain decimal; its mantissa is then exact in float64.
+MAX_DIGITS = 15
+
+_COMMENT = re.compile(rb'#[^\n]*')
+
+# Powers of ten that divide the mantissa of a plain decimal.
+_POWERS = 10.0**np.arange(MAX_DIGITS + 1)
+
+
+def read_markdown_table(path, columns=None, dtypes=None,
+                        block_size=BLOCK_SIZE):
+    """
+    Reads a whitespace separated table into typed numpy columns.
+
+    Parameters:
+    - path (str): The table file.
+    - columns (sequence of str, optional): Columns to keep, all if None.
+    - dtypes (dict, optional): Column name -> numpy dtype (e.g. float or
+      str) instead of the inferred type.
+    - block_size (int): Bytes read at a time.
+
+    Returns:
+    - dict: Column name -> numpy array (int64, float64 with NaN for '..',
+      or str), in the order of columns, or of the file if None.
+
+    Defined Errors:
+    - File not found.
+    - No header line, or columns not in the header (KeyError).
+    - A row without one value per column (ValueError, with the line
+      number), or a column not of its dtype (ValueError).
+    """
+    try:
+        file = open(path, 'rb')    # pylint: disable=consider-using-with
+    except FileNotFoundError as exc:
+        raise FileNotFoundError("File was not found.") from exc
+    table = _Table(columns)
+    with file:
+        rest = b''
+        for block in iter(lambda: file.read(block_size), b''):
+            # Complete lines only; the last partial one waits for the next
+            # block.
+            chunk = rest + block
+            cut = chunk.rfind(b'\n') + 1
+            table.read(chunk[:cut])
+            rest = chunk[cut:]
+        table.read(rest + b'\n')
+    if table.names is None:
+        raise KeyError("File has no header line.")
+
+    dtypes = dtypes or {}
+    return {table.names[j]: _convert(table.parts[j],
+                                     dtypes.get(table.names[j]),
+                                     table.names[j])
+            for j in table.keep}
+
+
+class _Table:
+    """
+    Header and per-column lists of bytes arrays of the lines read so far.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.names = None
+        self.keep = None
+        self.parts = None
+        self.lines = 0
+
+    def read(self, chunk):
+        """
+        Adds the rows of chunk, complete lines ending in a newline; the
+        first row of the file is the header.
+        """
+        if b'#' in chunk:
+            chunk = _COMMENT.sub(b'', chunk)
+        data, starts, ends = _tokens(chunk)
+        newlines = np.flatnonzero(data == ord('\n'))
+        if self.names is None:
+            if not starts.size:
+                self.lines += newlines.size
+                return
+            # Values before the newline that ends the first row.
+            stop = np.searchsorted(
+                starts, newlines[np.searchsorted(newlines, starts[0])])
+            self._header([chunk[i:j].decode()
+                          for i, j in zip(starts[:stop], ends[:stop])])
+            starts, ends = starts[stop:], ends[stop:]
+
+        width = len(self.names)
+        counts = np.diff(np.searchsorted(starts, newlines), prepend=0)
+        bad = np.flatnonzero((counts != 0) & (counts != width))
+        if bad.size:
+            raise ValueError(f"Line {self.lines + bad[0] + 1} does not have "
+                             f"{width} values.")
+        self.lines += newlines.size
+
+        starts = starts.reshape(-1, width)
+        lengths = ends.reshape(-1, width) - starts
+        if starts.size:
+            # Room for the longest value after the last one.
+            data = np.concatenate((data, np.zeros(lengths.max(), np.uint8)))
+        for j in self.keep:
+            self.parts[j].append(_gather(data, starts[:, j], lengths[:, j]))
+
+    def _header(self, names):
+        """
+        Sets the column names and the columns to keep.
+        """
+        missing = [name for name in self.columns or ()
+                   if name not in names]
+        if missing:
+            raise KeyError(f"Columns {missing} not in the table header.")
+        self.names = names
+        self.keep = range(len(names)) if self.columns is None else [
+            names.index(name) for name in self.columns]
+        self.parts = [[] for _ in names]
+
+
+def _tokens(chunk):
+    """
+    The bytes of chunk as a uint8 array, with the start and end of every
+    value: a run of non-space bytes, or of any bytes but newlines between
+    quotes.
+    """
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    space = data <= ord(' ')
+    starts, ends = _runs(space)
+    if b"'" in chunk or b'"' in chunk:
+        n_quotes = np.count_nonzero(data == ord("'")) \
+            + np.count_nonzero(data == ord('"'))
+        # Quoted names are mostly single values already: every quote opens
+        # a value whose last byte closes it.
+        first, last = data[starts], data[ends - 1]
+        opens = (first == ord("'")) | (first == ord('"'))
+        if n_quotes != 2 * np.count_nonzero(opens) \
+                or np.any(opens != ((last == ord("'")) | (last == ord('"')))):
+            # Else the spaces between every opening quote and its closing
+            # one are not separators.
+            quotes = np.flatnonzero((data == ord("'")) | (data == ord('"')))
+            inside = np.zeros(data.size + 1, dtype=np.int8)
+            inside[quotes[0::2]] = 1
+            inside[quotes[1::2] + 1] -= 1
+            space &= np.cumsum(inside[:-1], dtype=np.int8) == 0
+            space |= data == ord('\n')
+            starts, ends = _runs(space)
+    return data, starts, ends
+
+
+def _runs(space):
+    """
+    Starts and ends of the runs of False in space.
+    """
+    padded = np.ones(space.size + 2, dtype=bool)
+    padded[1:-1] = space
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def _gather(data, starts, lengths):
+    """
+    Fixed-width bytes array of the values at starts, of the given lengths.
+    """
+    size = max(int(lengths.max()), 1) if lengths.size else 1
+    # Every size bytes of data from each offset, as one bytes item.
+    windows = np.ndarray((data.size - size + 1,), dtype=f'S{size}',
+                         buffer=data, strides=(1,))
+    values = windows[starts]
+    # Zero the bytes past the end of each value: row k of the mask table
+    # holds k ones.
+    masks = np.tri(size + 1, size, -1, dtype=np.uint8)
+    values.view(np.uint8).reshape(-1, size)[...] *= masks.view(
+        f'V{size}')[lengths].view(np.uint8).reshape(-1, size)
+    return values
+
+
+def _convert(parts, dtype, name):
+    """
+    One column from its bytes arrays: dtype if given, else the narrowest
+    of int64, float64 and str that holds every value.
+    """
+    values = np.concatenate(parts) if parts else np.array([], dtype='S1')
+    if dtype is not None and np.dtype(dtype).kind in 'US':
+        return _decode(values)
+    missing = values == MISSING
+    # A look at the first values rules out most text columns at once.
+    numbers = None if _decimals(values[:1024], missing[:1024]) is None \
+        else _decimals(values, missing)
+    if numbers is None:
+        try:
+            # Exponents, 'nan', 'inf', ...
+            numbers = np.where(missing, b'nan', values).astype(np.float64)
+        except ValueError as exc:
+            if dtype is None:
+                return _decode(values)
+            raise ValueError(f"Column {name} is not {dtype}.") from exc
+    if dtype is None:
+        return numbers
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'iu' and numbers.dtype.kind == 'f':
+        raise ValueError(f"Column {name} is not {dtype}.")
+    return numbers.astype(dtype)
+
+
+def _decimals(values, missing):
+    """
+    Values parsed as plain decimals: int64 if none has a point and none is
+    missing, else float64 with NaN where missing; None if any other value
+    is not a plain decimal of at most MAX_DIGITS digits.
+    """
+    # A sign, the digits and a point at most.
+    if values.itemsize > MAX_DIGITS + 2:
+        return None
+    # One row per character position, contiguous.
+    chars = np.ascontiguousarray(
+        values.view(np.uint8).reshape(values.size, values.itemsize).T)
+    digits = chars - np.uint8(ord('0'))
+    is_digit = digits < 10
+    is_point = chars == ord('.')
+    is_sign = (chars == ord('+')) | (chars == ord('-'))
+    if not np.all(is_digit | is_point | is_sign | (chars == 0)):
+        return None
+    n_digits = np.zeros(values.size, dtype=np.uint8)
+    n_points = np.zeros(values.size, dtype=np.uint8)
+    point = np.zeros(values.size, dtype=np.uint8)
+    for k in range(values.itemsize):
+        n_digits += is_digit[k]
+        n_points += is_point[k]
+        point += is_point[k] * np.uint8(k)
+    plain = ~is_sign[1:].any(axis=0) & (n_points <= 1) & (n_digits >= 1) \
+        & (n_digits <= MAX_DIGITS)
+    if not np.all(plain | missing):
+        return None
+
+    scale = is_digit * np.uint8(9) + np.uint8(1)
+    digits *= is_digit
+    mantissa = np.zeros(values.size, dtype=np.int64)
+    for k in range(values.itemsize):
+        mantissa *= scale[k]
+        mantissa += digits[k]
+    mantissa[chars[0] == ord('-')] *= -1
+    if not n_points.any():
+        return mantissa
+    # Values are left-aligned, so the digits after the point are all the
+    # characters after it.
+    length = n_digits + n_points + is_sign[0]
+    decimals = np.where(plain & (n_points == 1), length - 1 - point, 0)
+    # Both exact, so the division is the correctly rounded value.
+    numbers = mantissa / _POWERS[decimals]
+    numbers[missing] = np.nan
+    return numbers
+
+
+def _decode(values):
+    """
+    Bytes array as str.
+    """
+    chars = values.view(np.uint8).reshape(values.size, values.itemsize)
+    if chars.size and chars.max() >= 128:
+        return np.char.decode(values, 'utf-8')
+    # ASCII: every byte is its own code point.
+    return chars.astype(np.uint32).view(f'U{values.itemsize}').ravel()
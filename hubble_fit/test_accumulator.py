@@ -0,0 +1,101 @@
+"""
+Provides unit testing for FitAccumulator in hubble_fit/accumulator.py.
+Tests chunked and merged accumulation against known and batch results.
+"""
+import numpy as np
+import pytest
+from hubble_fit.accumulator import FitAccumulator
+from hubble_fit.batch import fit_batch
+
+X = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+Y = [-1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
+SIGMA = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+
+
+def random_data(n, offset=0.0):
+    """
+    Returns noisy straight-line data, with x shifted by offset.
+    """
+    rng = np.random.default_rng(3)
+    x = offset + rng.uniform(0.0, 2.0, n)
+    sigma = rng.uniform(0.5, 1.5, n)
+    y = 3.0 * (x - offset) + 10.0 + rng.normal(0.0, sigma)
+    return x, y, sigma
+
+
+class TestFitAccumulator:
+    """
+    Contains tests for FitAccumulator.
+    Tests the following cases:
+     - Known result in one chunk.
+     - Many chunks equal the batch fit.
+     - Merged shards equal one accumulator over all data.
+     - Accuracy with x far from zero.
+     - Defined errors.
+    """
+    def test_known_values(self):
+        """
+        One chunk of the mock data gives the known fit.
+        """
+        result = FitAccumulator().update(X, Y, SIGMA).result()
+        expected_result = {
+            'intercept': -1.0,
+            'slope': 2.0,
+            'sigma_a': 0.0723747,
+            'sigma_b': 0.0239046,
+            'chi_squared': 0.0
+        }
+        assert result == pytest.approx(expected_result, rel=1e-5, abs=1e-12)
+
+    def test_chunks_match_batch(self):
+        """
+        Feeding uneven chunks gives the same result as fit_batch.
+        """
+        x, y, sigma = random_data(1000)
+        acc = FitAccumulator()
+        for start in range(0, 1000, 77):
+            acc.update(x[start:start + 77], y[start:start + 77],
+                       sigma[start:start + 77])
+        expected = fit_batch([x], [y], [sigma])[0]
+        result = acc.result()
+        assert acc.count == 1000
+        for name in expected.dtype.names:
+            assert result[name] == pytest.approx(expected[name], rel=1e-10)
+
+    def test_merge(self):
+        """
+        Merging accumulators of separate shards equals one pass.
+        """
+        x, y, sigma = random_data(900)
+        whole = FitAccumulator().update(x, y, sigma).result()
+        shards = [FitAccumulator().update(x[i::3], y[i::3], sigma[i::3])
+                  for i in range(3)]
+        merged = FitAccumulator()
+        for shard in shards:
+            merged.merge(shard)
+        assert merged.result() == pytest.approx(whole, rel=1e-10)
+
+    def test_offset_accuracy(self):
+        """
+        Slope stays accurate when x is large compared to its spread.
+        """
+        x, y, sigma = random_data(5000, offset=1e6)
+        acc = FitAccumulator()
+        for start in range(0, 5000, 1000):
+            acc.update(x[start:start + 1000], y[start:start + 1000],
+                       sigma[start:start + 1000])
+        slope, _ = np.polyfit(x - 1e6, y, 1, w=1.0 / sigma)
+        assert acc.result()['slope'] == pytest.approx(slope, rel=1e-8)
+
+    def test_errors(self):
+        """
+        Tests the defined errors of update and result.
+        """
+        with pytest.raises(TypeError, match="same length"):
+            FitAccumulator().update([1, 2], [1, 2, 3], [1, 1])
+        with pytest.raises(ZeroDivisionError, match="Element of sigma"):
+            FitAccumulator().update([1, 2], [1, 2], [1, 1e-7])
+        with pytest.raises(TypeError, match="Not enough data"):
+            FitAccumulator().update([1], [1], [1]).result()
+        with pytest.raises(ZeroDivisionError, match="Sum of var"):
+            FitAccumulator().update([1, 2, 3], [1, 2, 3], [1e6] * 3).result()
@@ -0,0 +1,110 @@
+"""
+Provides unit testing for the batched fit in hubble_fit/batch.py.
+Checks both input layouts against known single-series results and
+the defined errors.
+"""
+import numpy as np
+import pytest
+from hubble_fit.batch import fit_batch
+
+# Same mock data and expected values as pseudo_code/test_linear_fit.py.
+X = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+Y = [-1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
+SIGMA = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+EXPECTED = {
+    'intercept': -1.0,
+    'slope': 2.0,
+    'sigma_a': 0.0723747,
+    'sigma_b': 0.0239046,
+}
+
+
+def random_series(rng, n):
+    """
+    Returns one noisy straight-line series of n points.
+    """
+    x = rng.uniform(0.0, 2.0, n)
+    sigma = rng.uniform(50.0, 150.0, n)
+    y = 500.0 * x - 40.0 + rng.normal(0.0, sigma)
+    return x, y, sigma
+
+
+class TestFitBatch:
+    """
+    Contains tests for fit_batch.
+    Tests the following cases:
+     - Known result for every row of a 2-D batch.
+     - Ragged layout agrees with weighted polyfit per series.
+     - 2-D and ragged layouts agree.
+     - Invalid shapes, offsets, sizes and sigma.
+    """
+    def test_rows_known_values(self):
+        """
+        Every row of a 2-D batch reproduces the single-series result.
+        """
+        result = fit_batch([X] * 3, [Y] * 3, [SIGMA] * 3)
+        assert result.shape == (3,)
+        for name, value in EXPECTED.items():
+            assert result[name] == pytest.approx(value, rel=1e-5)
+        assert np.all(result['chi_squared'] < 1e-20)
+
+    def test_ragged_matches_polyfit(self):
+        """
+        Slope and intercept of each ragged series match np.polyfit.
+        """
+        rng = np.random.default_rng(0)
+        series = [random_series(rng, n) for n in (2, 7, 50, 3)]
+        offsets = np.cumsum([0] + [len(s[0]) for s in series])
+        x, y, sigma = (np.concatenate(i) for i in zip(*series))
+        result = fit_batch(x, y, sigma, offsets)
+        for row, (xs, ys, ss) in zip(result, series):
+            slope, intercept = np.polyfit(xs, ys, 1, w=1.0 / ss)
+            assert row['slope'] == pytest.approx(slope, rel=1e-9)
+            assert row['intercept'] == pytest.approx(intercept, rel=1e-9)
+            chi2 = np.sum(((ys - intercept - slope * xs) / ss)**2)
+            assert row['chi_squared'] == pytest.approx(chi2, abs=1e-9)
+
+    def test_layouts_agree(self):
+        """
+        A 2-D batch and the same data in ragged form give equal results.
+        """
+        rng = np.random.default_rng(1)
+        x, y, sigma = random_series(rng, 40)
+        x, y, sigma = (i.reshape(8, 5) for i in (x, y, sigma))
+        rows = fit_batch(x, y, sigma)
+        ragged = fit_batch(x.ravel(), y.ravel(), sigma.ravel(),
+                           np.arange(0, 41, 5))
+        for name in rows.dtype.names:
+            assert np.allclose(rows[name], ragged[name], rtol=1e-12)
+
+    def test_errors(self):
+        """
+        Tests the defined errors of fit_batch.
+        """
+        with pytest.raises(TypeError, match="same shape"):
+            fit_batch([X], [Y[:-1]], [SIGMA])
+        with pytest.raises(TypeError, match="2-D"):
+            fit_batch(X, Y, SIGMA)
+        with pytest.raises(TypeError, match="Not enough data"):
+            fit_batch([[1.0]], [[1.0]], [[1.0]])
+        with pytest.raises(TypeError, match="Not enough data"):
+            fit_batch(X, Y, SIGMA, [0, 1, 6])
+        with pytest.raises(ValueError, match="Offsets"):
+            fit_batch(X, Y, SIGMA, [0, 4, 3, 6])
+        with pytest.raises(ZeroDivisionError, match="Element of sigma"):
+            fit_batch([X], [Y], [SIGMA[:-1] + [1e-7]])
+        with pytest.raises(ZeroDivisionError, match="Sum of var"):
+            fit_batch([[1, 2, 3]], [[1, 2, 3]], [[1e+6, 1e+6, 1e+6]])
+        with pytest.raises(ZeroDivisionError, match="x values"):
+            fit_batch([[1, 1, 1]], [[1, 2, 3]], [[1, 1, 1]])
+
+    def test_large_offset(self):
+        """
+        The slope survives x with a large offset and a narrow spread.
+        """
+        x = 1e4 + np.linspace(0.0, 1e-3, 5)
+        y = 2.0 * x + 1.0
+        rows = fit_batch([x], [y], [np.ones(5)])
+        ragged = fit_batch(x, y, np.ones(5), [0, 5])
+        assert rows['slope'][0] == pytest.approx(2.0, rel=1e-6)
+        assert ragged['slope'][0] == pytest.approx(2.0, rel=1e-6)
@@ -0,0 +1,149 @@
+"""
+Provides unit testing for TableCache in hubble_fit/cache.py.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+
+import numpy as np
+import pytest
+from hubble_fit.cache import TableCache
+
+TABLE = """OBJECT      m_s     r       v
+'S.Mag.'      ..      0.032   +170
+# 404       ..      ..      -25   commented out
+598         17.0    0.263   -70
+"""
+
+
+def write(path, text, mtime_ns=None):
+    """
+    Writes text to path, optionally setting its modification time.
+    """
+    path.write_text(text, encoding='utf-8')
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def entries(directory):
+    """
+    Cache entries (directories) in directory.
+    """
+    return [p for p in os.listdir(directory)
+            if os.path.isdir(os.path.join(directory, p))]
+
+
+def load_all(directory, paths):
+    """
+    Loads every path through a TableCache in directory (in a worker).
+    """
+    cache = TableCache(directory)
+    return [cache.load(path)['v'].tolist() for path in paths]
+
+
+class TestTableCache:
+    """
+    Contains tests for TableCache.
+    Tests the following cases:
+     - Markdown table parsed once, then memory-mapped.
+     - Changed source invalidates its entry.
+     - Touched but unchanged source reuses its entry.
+     - Size cap evicts least recently used entries.
+     - Custom reader and missing file.
+     - Processes sharing the directory lose no index update.
+    """
+    def test_hit_after_miss(self, tmp_path):
+        """
+        The second load is a hit and returns memory-mapped columns.
+        """
+        source = tmp_path / 'table.md'
+        write(source, TABLE)
+        cache = TableCache(str(tmp_path / 'cache'))
+        first = cache.load(str(source))
+        second = cache.load(str(source))
+        assert (cache.misses, cache.hits) == (1, 1)
+        assert isinstance(second['r'], np.memmap)
+        assert second['OBJECT'].tolist() == ["'S.Mag.'", '598']
+        assert np.isnan(second['m_s'][0])
+        assert second['v'].tolist() == [170, -70]
+        assert np.array_equal(first['m_s'], second['m_s'], equal_nan=True)
+
+    def test_invalidation(self, tmp_path):
+        """
+        New contents are parsed again and the stale entry is removed;
+        a new modification time with equal contents is still a hit.
+        """
+        source = tmp_path / 'table.csv'
+        write(source, 'x,y\n1,2\n', mtime_ns=10**18)
+        cache = TableCache(str(tmp_path / 'cache'))
+        cache.load(str(source))
+        write(source, 'x,y\n5,6\n', mtime_ns=2 * 10**18)
+        assert cache.load(str(source))['x'].tolist() == [5]
+        assert cache.misses == 2
+        assert len(entries(cache.directory)) == 1
+        write(source, 'x,y\n5,6\n', mtime_ns=3 * 10**18)
+        cache.load(str(source))
+        assert cache.hits == 1
+
+    def test_eviction(self, tmp_path):
+        """
+        Loading past max_bytes evicts the least recently used entry.
+        """
+        cache = TableCache(str(tmp_path / 'cache'), max_bytes=1)
+        paths = []
+        for i in range(3):
+            paths.append(tmp_path / f'{i}.csv')
+            write(paths[-1], f'x\n{i}\n')
+            cache.load(str(paths[-1]))
+        assert len(entries(cache.directory)) == 1
+        cache.load(str(paths[0]))
+        assert cache.misses == 4
+
+    def test_reader_and_missing(self, tmp_path):
+        """
+        A custom reader is used on a miss; a missing file raises.
+        """
+        source = tmp_path / 'data.txt'
+        write(source, 'anything')
+        cache = TableCache(str(tmp_path / 'cache'))
+        table = cache.load(str(source), lambda p: {'a': np.arange(3.0)})
+        assert table['a'].tolist() == [0.0, 1.0, 2.0]
+        with pytest.raises(FileNotFoundError, match="File was not found."):
+            cache.load(str(tmp_path / 'missing.csv'))
+
+    def test_reader_identity(self, tmp_path):
+        """
+        A load with another reader, or another tag, parses the source
+        again instead of returning the first reader's columns.
+        """
+        source = tmp_path / 'data.txt'
+        write(source, 'anything')
+        cache = TableCache(str(tmp_path / 'cache'))
+        cache.load(str(source), lambda p: {'a': np.arange(3.0)}, tag='a')
+        table = cache.load(str(source), lambda p: {'b': np.ones(2)},
+                           tag='b')
+        assert list(table) == ['b']
+        assert cache.load(str(source), dict, tag='b') is not None
+        assert (cache.misses, cache.hits) == (2, 1)
+        assert list(cache.load(str(source), lambda p: {'c': [1]})) == ['c']
+
+    def test_shared_directory(self, tmp_path):
+        """
+        Processes loading different tables at the same time all end up in
+        the index.
+        """
+        paths = []
+        for i in range(16):
+            paths.append(str(tmp_path / f'table{i}.txt'))
+            write(tmp_path / f'table{i}.txt', f'v\n{i}\n')
+        directory = str(tmp_path / 'cache')
+        with ProcessPoolExecutor(4) as pool:
+            loaded = list(pool.map(load_all, [directory] * 4,
+                                   [paths[i::4] for i in range(4)]))
+        assert sorted(v for part in loaded for (v,) in part) == \
+            list(range(16))
+        with open(os.path.join(directory, 'index.json'),
+                  encoding='utf-8') as file:
+            index = json.load(file)
+        assert sorted(index['sources']) == sorted(paths)
+        assert len(index['entries']) == 16
@@ -0,0 +1,107 @@
+"""
+Provides unit testing for the chi squared surfaces in
+hubble_fit/contours.py.
+Checks the surfaces against chi squared summed directly over the data
+and the contour levels against their known values.
+"""
+import numpy as np
+import pytest
+from hubble_fit.contours import chi2_surface, confidence_region, delta_chi2
+
+
+def line_data(n, seed=9):
+    """
+    Returns noisy straight-line data with uncertainties in x and y.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0.0, 2.0, n)
+    sigma_x = rng.uniform(0.01, 0.1, n)
+    sigma = rng.uniform(50.0, 150.0, n)
+    y = 500.0 * x - 40.0 + rng.normal(0.0, sigma)
+    return x, y, sigma, sigma_x
+
+
+def direct(x, y, variance, intercepts, slopes):
+    """
+    Chi squared summed over the data at every grid point.
+    """
+    a, b = intercepts[None, :, None], slopes[:, None, None]
+    return np.sum((y - a - b * x)**2 / variance(b), axis=2)
+
+
+def test_quadratic_surface():
+    """
+    The surface from the sufficient statistics equals the direct sum.
+    """
+    x, y, sigma, _ = line_data(40)
+    intercepts = np.linspace(-300.0, 200.0, 7)
+    slopes = np.linspace(300.0, 700.0, 5)
+    surface = chi2_surface(x, y, sigma, intercepts, slopes)
+    assert surface.shape == (5, 7)
+    assert surface == pytest.approx(
+        direct(x, y, lambda b: sigma**2, intercepts, slopes))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 30, 10**6])
+def test_effective_variance(chunk_size):
+    """
+    With sigma_x the chunked surface equals the direct sum for any
+    chunking, and equals the quadratic surface for sigma_x = 0.
+    """
+    x, y, sigma, sigma_x = line_data(25)
+    intercepts = np.linspace(-300.0, 200.0, 4)
+    slopes = np.linspace(300.0, 700.0, 6)
+    surface = chi2_surface(x, y, sigma, intercepts, slopes, sigma_x,
+                           chunk_size=chunk_size)
+    assert surface == pytest.approx(direct(
+        x, y, lambda b: sigma**2 + b * b * sigma_x**2, intercepts, slopes))
+    assert chi2_surface(x, y, sigma, intercepts, slopes, np.zeros(25),
+                        chunk_size) == pytest.approx(
+        chi2_surface(x, y, sigma, intercepts, slopes))
+
+
+def test_levels():
+    """
+    Joint levels have the probabilities of 1, 2 and 3 sigma; single
+    parameter levels are n_sigma squared.
+    """
+    assert delta_chi2() == pytest.approx([2.2957, 6.1801, 11.8292],
+                                         abs=1e-4)
+    assert delta_chi2([1, 2], joint=False) == pytest.approx([1.0, 4.0])
+
+
+@pytest.mark.parametrize('with_x_errors', [False, True])
+def test_confidence_region(with_x_errors):
+    """
+    The grid is centred on the fit, its minimum is the fit's chi squared,
+    and the 1 sigma contour reaches sqrt(2.30) sigma_b along the slope.
+    """
+    x, y, sigma, sigma_x = line_data(200)
+    region = confidence_region(x, y, sigma,
+                               sigma_x if with_x_errors else None,
+                               size=101)
+    fit, surface = region['fit'], region['chi_squared']
+    assert region['slopes'][50] == pytest.approx(fit['slope'])
+    assert region['intercepts'][50] == pytest.approx(fit['intercept'])
+    assert surface.min() == pytest.approx(fit['chi_squared'], rel=1e-6)
+    assert np.all(np.diff(region['levels']) > 0)
+    inside = np.any(surface <= region['levels'][0], axis=1)
+    reach = np.abs(region['slopes'][inside] - fit['slope']).max()
+    assert reach == pytest.approx(np.sqrt(2.2957) * fit['sigma_b'],
+                                  rel=0.05)
+
+
+def test_errors():
+    """
+    Invalid data and grids are rejected.
+    """
+    x, y, sigma, sigma_x = line_data(10)
+    grid = np.linspace(0.0, 1.0, 3)
+    with pytest.raises(TypeError):
+        chi2_surface(x, y[:-1], sigma, grid, grid)
+    with pytest.raises(TypeError):
+        chi2_surface(x, y, sigma, grid[None], grid)
+    with pytest.raises(TypeError):
+        chi2_surface(x, y, sigma, grid, grid, sigma_x[:-1])
+    with pytest.raises(ZeroDivisionError):
+        chi2_surface(x, y, np.zeros(10), grid, grid, sigma_x)
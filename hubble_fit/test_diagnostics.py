@@ -0,0 +1,99 @@
+"""
+Provides unit testing for the influence diagnostics in
+hubble_fit/diagnostics.py.
+Checks the leave-one-out fits and Cook's distance against refitting
+without each point, weighted and unweighted.
+"""
+import numpy as np
+import pytest
+import hubble_fit
+from fit_param import dict_maker
+from hubble_fit.batch import fit_batch
+from hubble_fit.diagnostics import influence
+
+
+def refit(x, y, sigma, i):
+    """
+    Returns the weighted fit and chi squared without point i.
+    """
+    keep = np.arange(x.size) != i
+    fit = fit_batch(x[None, keep], y[None, keep], sigma[None, keep])[0]
+    residual = (y[keep] - fit['intercept'] - fit['slope'] * x[keep])
+    return fit, np.sum((residual / sigma[keep])**2)
+
+
+@pytest.mark.parametrize('weighted', [True, False])
+def test_leave_one_out(weighted):
+    """
+    Every row matches a refit without that point, and Cook's distance
+    matches the shift of all fitted values.
+    """
+    rng = np.random.default_rng(7)
+    x = rng.uniform(0.0, 2.0, 30)
+    sigma = rng.uniform(50.0, 150.0, 30)
+    y = 500.0 * x - 40.0 + rng.normal(0.0, sigma)
+    y[3] += 800.0
+    result = influence(x, y, sigma if weighted else None)
+    if not weighted:
+        sigma = np.ones_like(x)
+    full, chi2 = refit(x, y, sigma, -1)
+    variance = chi2 / (x.size - 2)
+    for i in range(x.size):
+        fit, chi2_without = refit(x, y, sigma, i)
+        assert result['intercept'][i] == pytest.approx(fit['intercept'])
+        assert result['slope'][i] == pytest.approx(fit['slope'])
+        assert result['chi_squared'][i] == pytest.approx(chi2_without)
+        shift = (full['intercept'] - fit['intercept']
+                 + (full['slope'] - fit['slope']) * x) / sigma
+        assert result['cooks_distance'][i] == pytest.approx(
+            np.sum(shift**2) / (2 * variance))
+    assert np.sum(result['leverage']) == pytest.approx(2.0)
+    assert np.argmax(result['cooks_distance']) == 3
+    assert np.argmax(np.abs(result['studentized'])) == 3
+
+
+def test_unweighted_fit_param():
+    """
+    Unweighted leave-one-out fits agree with fit_param.dict_maker.
+    """
+    x = np.array([0.032, 0.034, 0.214, 0.263, 0.275, 0.275, 0.45, 0.5, 0.5,
+                  0.63, 0.8, 0.9, 0.9, 0.9, 0.9, 1.0, 1.1, 1.1, 1.4, 1.7,
+                  2.0, 2.0, 2.0, 2.0])
+    y = np.array([170.0, 290, -130, -70, -185, -220, 200, 290, 270, 200,
+                  300, -30, 650, 150, 500, 920, 450, 500, 500, 960, 500,
+                  850, 800, 1090])
+    result = influence(x, y)
+    for i in (0, 12, 23):
+        keep = np.arange(x.size) != i
+        fit = dict_maker(y[keep], x[keep])
+        assert result['slope'][i] == pytest.approx(fit['Slope'])
+        assert result['intercept'][i] == pytest.approx(fit['Y-intercept'])
+
+
+def test_errors():
+    """
+    Invalid data are rejected and undefined rows are NaN.
+    """
+    with pytest.raises(TypeError):
+        influence([1.0, 2.0, 3.0], [1.0, 2.0])
+    with pytest.raises(TypeError):
+        influence([1.0, 2.0], [1.0, 2.0])
+    with pytest.raises(ZeroDivisionError):
+        influence([1.0, 2.0, 3.0], [1.0, 2.0, 3.0], [1.0, 0.0, 1.0])
+    with pytest.raises(ZeroDivisionError):
+        influence([1.0, 1.0, 1.0], [1.0, 2.0, 3.0])
+    # Without the single point at x = 5, all x are equal.
+    result = influence([1.0, 1.0, 1.0, 5.0], [1.0, 2.0, 3.0, 4.0])
+    assert result['leverage'][3] == pytest.approx(1.0)
+    assert np.isnan(result['slope'][3])
+    assert np.all(np.isfinite(result['slope'][:3]))
+
+
+def test_package_export():
+    """
+    The package exports the function, also after its module is imported,
+    and no public name shadows a submodule.
+    """
+    assert hubble_fit.influence is influence
+    modules = set(hubble_fit._EXPORTS.values())  # pylint: disable=W0212
+    assert not set(hubble_fit.__all__) & modules
@@ -0,0 +1,123 @@
+"""
+Provides unit testing for the backend dispatch in hubble_fit/dispatch.py.
+Checks that every available backend gives the same result and the same
+errors, and that the automatic choice falls back to NumPy.
+"""
+import numpy as np
+import pytest
+from hubble_fit import dispatch
+
+# Same mock data and expected values as pseudo_code/test_linear_fit.py.
+X = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+Y = [-1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
+SIGMA = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+EXPECTED = {
+    'intercept': -1.0,
+    'slope': 2.0,
+    'sigma_a': 0.0723747,
+    'sigma_b': 0.0239046,
+}
+
+
+class FailingCompute:
+    """
+    Stands in for a compiled module whose kernels break.
+    """
+    @staticmethod
+    def compute_with_cython(x, y, sigma, verbose=True):
+        """
+        Fails like a module built for another ABI.
+        """
+        raise ValueError("Buffer dtype mismatch")
+
+
+@pytest.mark.parametrize('backend', dispatch.available_backends())
+def test_known_result(backend):
+    """
+    Every available backend fits the mock data.
+    """
+    result = dispatch.fit(X, Y, SIGMA, backend=backend)
+    assert result['backend'] == backend
+    for key, value in EXPECTED.items():
+        assert result[key] == pytest.approx(value, abs=1e-6)
+    assert result['chi_squared'] == pytest.approx(0.0, abs=1e-12)
+
+
+def test_backends_agree():
+    """
+    All backends agree on noisy data, also for float32 input.
+    """
+    rng = np.random.default_rng(3)
+    x = rng.uniform(0.0, 2.0, 5000)
+    sigma = rng.uniform(50.0, 150.0, 5000)
+    y = 500.0 * x - 40.0 + rng.normal(0.0, sigma)
+    reference = dispatch.fit(x, y, sigma, backend='numpy')
+    for backend in dispatch.available_backends():
+        for dtype in (np.float64, np.float32):
+            data = [a.astype(dtype) for a in (x, y, sigma)]
+            if backend == 'python':
+                data = [a.tolist() for a in data]
+            result = dispatch.fit(*data, backend=backend)
+            rtol = 1e-9 if dtype == np.float64 else 1e-5
+            for key in dispatch.RESULT_KEYS:
+                assert result[key] == pytest.approx(reference[key],
+                                                    rel=rtol)
+
+
+@pytest.mark.parametrize('backend', dispatch.available_backends())
+@pytest.mark.parametrize('x, y, sigma, error, match', [
+    (X, Y[:-1], SIGMA, TypeError, 'same length'),
+    (X[:1], Y[:1], SIGMA[:1], TypeError, 'Not enough data'),
+    (['a'] * 6, Y, SIGMA, TypeError, 'not all numeric'),
+    (X, Y, [0.1] * 5 + [0.0], ZeroDivisionError, 'sigma is too small'),
+    ([1.0] * 6, Y, SIGMA, ZeroDivisionError, 'x values are equal'),
+    ([0.3] * 40, list(range(40)), [1.0] * 40, ZeroDivisionError,
+     'x values are equal'),
+])
+def test_errors(backend, x, y, sigma, error, match, capsys):
+    """
+    Every backend raises the same errors, without printing.
+    """
+    with pytest.raises(error, match=match):
+        dispatch.fit(x, y, sigma, backend=backend)
+    assert capsys.readouterr().out == ''
+
+
+def test_choice(monkeypatch):
+    """
+    Without the compiled module, small lists use Python, everything else
+    NumPy; compiled backends cannot be forced.
+    """
+    monkeypatch.setattr(dispatch, '_compiled', lambda: None)
+    assert dispatch.available_backends() == ('python', 'numpy')
+    assert dispatch.fit(X, Y, SIGMA)['backend'] == 'python'
+    assert dispatch.fit(np.array(X), Y, SIGMA)['backend'] == 'numpy'
+    assert dispatch.select_backend(10**6, sequence=True) == 'numpy'
+    with pytest.raises(ValueError, match='not available'):
+        dispatch.fit(X, Y, SIGMA, backend='compiled')
+    with pytest.raises(ValueError, match='not available'):
+        dispatch.fit(X, Y, SIGMA, backend='fortran')
+
+
+def test_fallback(monkeypatch):
+    """
+    A compiled module that fails is replaced by NumPy with a warning,
+    unless the compiled backend was chosen explicitly.
+    """
+    monkeypatch.setattr(dispatch, '_compiled', FailingCompute)
+    with pytest.warns(RuntimeWarning, match='Buffer dtype mismatch'):
+        result = dispatch.fit(np.array(X), Y, SIGMA)
+    assert result['backend'] == 'numpy'
+    assert result['slope'] == pytest.approx(2.0)
+    with pytest.raises(ValueError, match='Buffer dtype mismatch'):
+        dispatch.fit(X, Y, SIGMA, backend='compiled')
+
+
+def test_unweighted():
+    """
+    Without sigma the fit uses unit uncertainties.
+    """
+    result = dispatch.fit(X, Y)
+    assert result['slope'] == pytest.approx(2.0)
+    assert result['sigma_b'] == pytest.approx(EXPECTED['sigma_b'] * 10,
+                                              rel=1e-5)
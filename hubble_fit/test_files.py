@@ -0,0 +1,148 @@
+"""
+Provides unit testing for fit_files in hubble_fit/files.py.
+"""
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from hubble_fit import dispatch
+from hubble_fit.files import COLUMNS, fit_files, main, read_results
+
+pd = pytest.importorskip('pandas')
+
+
+class CrashingPool(concurrent.futures.ThreadPoolExecutor):
+    """
+    Stands in for a process pool whose worker dies on the file b.csv.
+    """
+    def submit(self, fn, /, *args, **kwargs):
+        if args[0][0].endswith('b.csv'):
+            future = concurrent.futures.Future()
+            future.set_exception(BrokenProcessPool("worker died"))
+            return future
+        return super().submit(fn, *args, **kwargs)
+
+
+def write_csvs(directory):
+    """
+    Writes good and bad CSV files to directory; returns the good data.
+    """
+    rng = np.random.default_rng(8)
+    good = {}
+    for name, n in (('a.csv', 50), ('b.csv', 7)):
+        x = rng.uniform(0, 2, n)
+        data = {'r': x, 'v': 400.0 * x + rng.normal(0, 20, n),
+                'err': rng.uniform(10, 30, n)}
+        pd.DataFrame(data).to_csv(directory / name, index=False)
+        good[str(directory / name)] = data
+    pd.DataFrame({'r': [1.0, 2.0], 'v': ['a', 'b'], 'err': [1.0, 1.0]}) \
+        .to_csv(directory / 'c_text.csv', index=False)
+    pd.DataFrame({'r': [1.0, 2.0], 'v': [1.0, 2.0]}) \
+        .to_csv(directory / 'd_header.csv', index=False)
+    pd.DataFrame({'r': [1.0, 2.0, 3.0], 'v': [1.0, None, 3.0],
+                  'err': [1.0, 1.0, 1.0]}) \
+        .to_csv(directory / 'e_missing.csv', index=False)
+    pd.DataFrame({'r': [1.0], 'v': [1.0], 'err': [1.0]}) \
+        .to_csv(directory / 'f_one.csv', index=False)
+    (directory / 'notes.txt').write_text('not a table')
+    return good
+
+
+class TestFitFiles:
+    """
+    Contains tests for fit_files and its command line.
+    Tests the following cases:
+     - Good files match fit, read in blocks, in and out of a pool.
+     - Bad files are recorded with their reason and do not stop the run.
+     - A crashed worker fails only its own file.
+     - Results are written to one .npz file of columns.
+     - Command line with glob patterns and its exit status.
+    """
+    @pytest.mark.parametrize('n_workers, max_pending', [(1, None), (2, 1)])
+    def test_directory(self, tmp_path, n_workers, max_pending):
+        """
+        Every CSV file of a directory gets a row, in order.
+        """
+        good = write_csvs(tmp_path)
+        output = str(tmp_path / 'fits.npz')
+        columns = fit_files(str(tmp_path), output, 'r', 'v', 'err',
+                            chunksize=5, n_workers=n_workers,
+                            max_pending=max_pending)
+        assert tuple(columns) == COLUMNS
+        assert [p.rsplit('/', 1)[1] for p in columns['path']] == [
+            'a.csv', 'b.csv', 'c_text.csv', 'd_header.csv',
+            'e_missing.csv', 'f_one.csv']
+        for i, (path, data) in enumerate(good.items()):
+            assert columns['path'][i] == path
+            assert columns['error'][i] == ''
+            assert columns['points'][i] == len(data['r'])
+            expected = dispatch.fit(data['r'], data['v'], data['err'])
+            for key in ('intercept', 'slope', 'sigma_a', 'sigma_b',
+                        'chi_squared'):
+                assert columns[key][i] == pytest.approx(expected[key])
+
+        errors = columns['error'][2:].tolist()
+        assert errors[0].startswith('ValueError')
+        assert errors[1] == 'KeyError: File headers not found in CSV.'
+        assert errors[2].startswith('ValueError: Rows 0 on: Data y is not '
+                                    'finite (indices 1)')
+        assert errors[3] == 'TypeError: Not enough data to fit.'
+        assert np.isnan(columns['slope'][2:]).all()
+        assert (columns['points'][2:] == 0).all()
+
+        saved = read_results(output)
+        for name, values in columns.items():
+            np.testing.assert_array_equal(saved[name], values)
+
+    def test_worker_crash(self, tmp_path, monkeypatch):
+        """
+        The file of a crashed worker gets the error, the others their fit.
+        """
+        write_csvs(tmp_path)
+        monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor',
+                            CrashingPool)
+        columns = fit_files(str(tmp_path), x='r', y='v', sigma='err',
+                            n_workers=2, max_pending=1)
+        assert columns['error'][0] == ''
+        assert columns['error'][1] == 'BrokenProcessPool: worker died'
+        assert columns['points'][1] == 0
+        assert columns['error'][3] == \
+            'KeyError: File headers not found in CSV.'
+
+    def test_sources(self, tmp_path):
+        """
+        Files, globs and missing files; sigma may be left out.
+        """
+        good = write_csvs(tmp_path)
+        columns = fit_files([str(tmp_path / 'b.csv'), str(tmp_path / 'a*'),
+                             str(tmp_path / 'none.csv')], x='r', y='v',
+                            sigma=None, n_workers=1)
+        assert columns['path'].tolist() == [
+            str(tmp_path / 'b.csv'), str(tmp_path / 'a.csv'),
+            str(tmp_path / 'none.csv')]
+        data = good[str(tmp_path / 'a.csv')]
+        assert columns['slope'][1] == pytest.approx(
+            dispatch.fit(data['r'], data['v'])['slope'])
+        assert columns['error'][2] == \
+            'FileNotFoundError: File was not found.'
+        with pytest.raises(FileNotFoundError):
+            fit_files(str(tmp_path / '*.dat'))
+        with pytest.raises(TypeError, match="Chunksize"):
+            fit_files(str(tmp_path), chunksize=0)
+
+    def test_main(self, tmp_path, capsys):
+        """
+        The command line writes all results and exits with 1 if a file
+        failed, 0 if none did.
+        """
+        write_csvs(tmp_path)
+        output = str(tmp_path / 'fits.npz')
+        assert main([str(tmp_path / '*.csv'), '--x', 'r', '--y', 'v',
+                     '--sigma', 'err', '--workers', '1',
+                     '--output', output]) == 1
+        assert 'Fitted 2 of 6 files' in capsys.readouterr().out
+        assert read_results(output)['path'].size == 6
+        assert main([str(tmp_path / '[ab].csv'), '--x', 'r', '--y', 'v',
+                     '--sigma', 'err', '--output', output]) == 0
+        assert read_results(output)['path'].size == 2
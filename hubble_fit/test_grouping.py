@@ -0,0 +1,73 @@
+"""
+Provides unit testing for group_statistics in hubble_fit/grouping.py.
+"""
+import numpy as np
+import pytest
+from hubble_fit.grouping import group_statistics
+
+OBJECTS = ['a', 'b', 'c', 'd', 'e', 'f']
+R = [1.0, 3.0, 2.0, 4.0, 6.0, 9.0]
+V = [10.0, 30.0, 20.0, 40.0, 60.0, 90.0]
+LABELS = {'a': 'G1', 'b': 'G1', 'c': 'G2', 'd': 'G2', 'e': 'G2', 'f': 'G3'}
+
+
+class TestGroupStatistics:
+    """
+    Contains tests for group_statistics.
+    Tests the following cases:
+     - Label map with a single-member group and an unmapped object.
+     - Integer group codes without a label map.
+     - Agreement with a direct per-group computation at scale.
+     - Invalid input.
+    """
+    def test_label_map(self):
+        """
+        Means, standard errors and counts for a small labelled table.
+        Single-member groups are dropped unless dropna is False.
+        """
+        labels = dict(LABELS)
+        del labels['b']
+        result = group_statistics(OBJECTS, R, V, labels, dropna=False)
+        assert result['group'].tolist() == ['G1', 'G2', 'G3']
+        assert result['count'].tolist() == [1, 3, 1]
+        assert result['x'].tolist() == pytest.approx([1.0, 4.0, 9.0])
+        assert result['y'].tolist() == pytest.approx([10.0, 40.0, 90.0])
+        assert np.isnan(result['sigma'][0])
+        assert result['sigma'][1] == pytest.approx(20.0 / np.sqrt(3))
+
+        result = group_statistics(OBJECTS, R, V, labels)
+        assert result['group'].tolist() == ['G2']
+
+    def test_integer_codes(self):
+        """
+        Integer keys are used as groups directly.
+        """
+        result = group_statistics([7, 7, 3, 3, 3], [1, 2, 3, 4, 5],
+                                  [1, 3, 5, 5, 5])
+        assert result['group'].tolist() == [3, 7]
+        assert result['sigma'].tolist() == pytest.approx([0.0, 1.0])
+
+    def test_matches_direct(self):
+        """
+        Large random data agrees with a per-group NumPy computation, also
+        with a large common velocity offset.
+        """
+        rng = np.random.default_rng(2)
+        keys = rng.integers(0, 50, 20000)
+        r = rng.uniform(0.0, 2.0, keys.size)
+        v = 1e8 + rng.normal(0.0, 100.0, keys.size)
+        result = group_statistics(keys, r, v)
+        for row in result:
+            members = v[keys == row['group']]
+            assert row['count'] == members.size
+            assert row['x'] == pytest.approx(r[keys == row['group']].mean())
+            assert row['y'] == pytest.approx(members.mean(), rel=1e-14)
+            assert row['sigma'] == pytest.approx(
+                members.std(ddof=1) / np.sqrt(members.size), rel=1e-9)
+
+    def test_errors(self):
+        """
+        Inputs of different length raise TypeError.
+        """
+        with pytest.raises(TypeError, match="same length"):
+            group_statistics(OBJECTS, R[:-1], V)
@@ -0,0 +1,121 @@
+"""
+Provides unit testing for FitCache in hubble_fit/memo.py.
+"""
+import numpy as np
+import pytest
+from hubble_fit.batch import fit_batch
+from hubble_fit.memo import FitCache, make_key
+
+X = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+Y = [-1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
+SIGMA = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+
+
+def counting_fit(calls):
+    """
+    Returns a fit function that appends to calls every time it runs.
+    """
+    def fit(x, y, sigma, scale=1.0):
+        calls.append(1)
+        row = fit_batch([x], [y], [sigma])[0]
+        return {name: float(row[name]) * scale for name in row.dtype.names}
+    return fit
+
+
+class TestFitCache:
+    """
+    Contains tests for FitCache.
+    Tests the following cases:
+     - Identical data hits, changed data or options miss.
+     - Lists and arrays with the same contents share an entry.
+     - Nested arguments and same-named functions get their own keys.
+     - LRU eviction under the byte budget.
+     - Results persist through the disk directory.
+     - Exceptions are not cached and results are copies.
+    """
+    def test_hits_and_misses(self):
+        """
+        Repeated calls hit; different data or keyword options miss.
+        """
+        calls = []
+        fit = FitCache().memoize(counting_fit(calls))
+        first = fit(np.array(X), np.array(Y), np.array(SIGMA))
+        assert fit(np.array(X), np.array(Y), np.array(SIGMA)) == first
+        fit(np.array(X), np.array(Y), np.array(SIGMA), scale=2.0)
+        fit(np.array(X), np.array(Y) + 1, np.array(SIGMA))
+        assert len(calls) == 3
+        assert fit.cache.info()['hits'] == 1
+        assert fit.cache.info()['misses'] == 3
+
+    def test_list_and_array_keys(self):
+        """
+        Lists hash like arrays of the same dtype and contents.
+        """
+        assert make_key('f', (X,), {}) == make_key('f', (np.array(X),), {})
+        assert make_key('f', (X,), {}) != make_key('g', (X,), {})
+        assert make_key('f', (np.float32(X),), {}) \
+            != make_key('f', (np.array(X),), {})
+
+    def test_nested_keys(self):
+        """
+        Tuples of large arrays are hashed in full, ragged lists are
+        accepted and functions with the same name do not share entries.
+        """
+        first = tuple(np.arange(5000.0) for _ in range(2))
+        second = tuple(a.copy() for a in first)
+        second[1][2500] = -1.0
+        assert make_key('f', (first,), {}) != make_key('f', (second,), {})
+        assert make_key('f', (first,), {}) == \
+            make_key('f', (tuple(a.copy() for a in first),), {})
+        ragged = [np.arange(3.0), np.arange(4.0)]
+        assert make_key('f', (ragged,), {}) != \
+            make_key('f', ([np.arange(3.0), np.arange(5.0)],), {})
+        assert make_key('f', ({'a': 1},), {}) != \
+            make_key('f', ({'a': 2},), {})
+
+        cache = FitCache()
+        double = cache.memoize(lambda x: 2 * x)
+        triple = cache.memoize(lambda x: 3 * x)
+        assert (double(1.0), triple(1.0)) == (2.0, 3.0)
+
+    def test_lru_eviction(self):
+        """
+        The least recently used result is dropped first.
+        """
+        calls = []
+        fit = FitCache(max_bytes=1500).memoize(counting_fit(calls))
+        for shift in range(4):
+            fit(X, [i + shift for i in Y], SIGMA)
+        assert fit.cache.info()['entries'] < 4
+        assert fit.cache.info()['bytes'] <= 1500
+        fit(X, [i + 3 for i in Y], SIGMA)
+        assert len(calls) == 4
+        fit(X, Y, SIGMA)
+        assert len(calls) == 5
+
+    def test_disk(self, tmp_path):
+        """
+        A second cache on the same directory reuses stored results.
+        """
+        first = FitCache(directory=str(tmp_path)).memoize(fit_batch)
+        result = first([X], [Y], [SIGMA])
+        second = FitCache(directory=str(tmp_path)).memoize(fit_batch)
+        assert second([X], [Y], [SIGMA]) == result
+        assert (second.cache.hits, second.cache.misses) == (1, 0)
+
+    def test_errors_and_copies(self):
+        """
+        Failing calls are retried; changing a result leaves the cache intact.
+        """
+        calls = []
+        fit = FitCache().memoize(counting_fit(calls))
+        for _ in range(2):
+            with pytest.raises(ZeroDivisionError):
+                fit(X, Y, [0.0] * 6)
+        result = fit(X, Y, SIGMA)
+        result['slope'] = 0.0
+        assert fit(X, Y, SIGMA)['slope'] == pytest.approx(2.0)
+        weights = FitCache().memoize(
+            lambda x: {'weights': np.asarray(x, dtype=float)})
+        weights(X)['weights'][:] = 0.0
+        assert weights(X)['weights'].tolist() == X
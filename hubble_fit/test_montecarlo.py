@@ -0,0 +1,96 @@
+"""
+Provides unit testing for the Monte Carlo age propagation in
+hubble_fit/montecarlo.py and age_array in age_of_univ/age_of_un_funk.py.
+Checks the streamed statistics against numpy on all samples at once.
+"""
+import numpy as np
+import pytest
+from age_of_univ.age_of_un_funk import age, age_array
+from hubble_fit import montecarlo
+from hubble_fit.montecarlo import age_distribution, age_statistics
+
+QUANTILES = (0.0, 0.025, 0.16, 0.5, 0.84, 0.975, 1.0)
+
+
+def test_age_array():
+    """
+    age_array agrees with age, converts units and can work in place.
+    """
+    hubble = np.array([500.0, 70.0, 1.0])
+    seconds = age_array(hubble)
+    assert seconds == pytest.approx(age(hubble))
+    assert age_array(hubble, 'yr') == pytest.approx(seconds / 3.15576e7)
+    result = age_array(hubble, 'Gyr', out=hubble)
+    assert result is hubble
+    assert hubble[1] == pytest.approx(13.98, abs=0.01)
+
+
+def test_statistics_match_numpy():
+    """
+    Streaming in small blocks gives numpy's exact quantiles, the mean and
+    the sample standard deviation, and leaves out Hubble constants <= 0.
+    """
+    rng = np.random.default_rng(4)
+    hubble = rng.normal(60.0, 30.0, 50001)
+    result = age_statistics(hubble, quantiles=QUANTILES, block_size=4096)
+    valid = hubble[hubble > 0]
+    ages = age_array(valid, 'Gyr')
+    assert result['count'] == valid.size
+    assert result['n_invalid'] == hubble.size - valid.size
+    assert result['mean'] == pytest.approx(ages.mean(), rel=1e-12)
+    assert result['std'] == pytest.approx(ages.std(ddof=1), rel=1e-9)
+    assert (result['min'], result['max']) == (ages.min(), ages.max())
+    assert list(result['quantiles'].values()) == \
+        list(np.quantile(ages, QUANTILES))
+
+
+def test_sorted_samples(monkeypatch):
+    """
+    Ordered Hubble constants, whose first block covers only a sliver of
+    the range, still give the exact quantiles and keep only a few ages
+    for them.
+    """
+    kept = []
+    order_statistics = montecarlo._order_statistics  # pylint: disable=W0212
+
+    def spy(*args):
+        result = order_statistics(*args)
+        kept.append(result[3].size)
+        return result
+
+    monkeypatch.setattr(montecarlo, '_order_statistics', spy)
+    hubble = np.linspace(20.0, 120.0, 100000)
+    result = age_statistics(hubble, quantiles=QUANTILES, block_size=1000)
+    assert list(result['quantiles'].values()) == \
+        list(np.quantile(age_array(hubble, 'Gyr'), QUANTILES))
+    assert kept[0] < 100
+
+
+def test_distribution():
+    """
+    Drawn ages are reproducible for a seed, and in one block or many they
+    centre on the age of the fitted slope with the same spread.
+    """
+    one = age_distribution(500.0, 25.0, 30000, seed=7, block_size=30000)
+    again = age_distribution(500.0, 25.0, 30000, seed=7, block_size=30000)
+    assert one == again
+    blocked = age_distribution(500.0, 25.0, 30000, seed=7, block_size=1000)
+    assert blocked['count'] == 30000
+    assert blocked['quantiles'][0.5] == pytest.approx(
+        age_array(np.array(500.0), 'Gyr'), rel=0.01)
+    assert blocked['std'] == pytest.approx(one['std'], rel=0.05)
+
+
+def test_errors():
+    """
+    Invalid sizes, uncertainties and quantiles are rejected.
+    """
+    with pytest.raises(ValueError):
+        age_distribution(500.0, 25.0, 0)
+    with pytest.raises(ValueError):
+        age_distribution(500.0, -1.0)
+    with pytest.raises(ValueError):
+        age_statistics([70.0, 80.0], quantiles=[1.5])
+    with pytest.raises(ValueError, match='^block_size'):
+        age_statistics([70.0, 80.0], block_size=0)
+    assert np.isnan(age_statistics([-1.0, 0.0])['mean'])
@@ -0,0 +1,99 @@
+"""
+Provides unit testing for the headless figures in hubble_fit/render.py.
+Checks the aggregation against direct sums and that figures are written
+in every mode, also from worker processes.
+"""
+import numpy as np
+import pytest
+from hubble_fit.accumulator import FitAccumulator
+from hubble_fit.render import binned_means, fit_band, render_fit, \
+    render_groups
+
+
+def line_data(n, seed=10):
+    """
+    Returns noisy straight-line data of n points.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0.0, 2.0, n)
+    sigma = rng.uniform(50.0, 150.0, n)
+    y = 500.0 * x - 40.0 + rng.normal(0.0, sigma)
+    return x, y, sigma
+
+
+def test_binned_means():
+    """
+    Bin means and errors equal direct sums over the points of each bin.
+    """
+    x, y, sigma = line_data(1000)
+    weighted = binned_means(x, y, sigma, bins=4, limits=(0.0, 2.0))
+    plain = binned_means(x, y, bins=4, limits=(0.0, 2.0))
+    assert weighted['x'] == pytest.approx([0.25, 0.75, 1.25, 1.75])
+    for i in range(4):
+        part = (x >= 0.5 * i) & (x < 0.5 * (i + 1))
+        weight = sigma[part]**-2
+        assert weighted['count'][i] == part.sum()
+        assert weighted['y'][i] == pytest.approx(
+            np.sum(weight * y[part]) / weight.sum())
+        assert weighted['error'][i] == pytest.approx(weight.sum()**-0.5)
+        assert plain['y'][i] == pytest.approx(y[part].mean())
+        assert plain['error'][i] == pytest.approx(
+            y[part].std(ddof=1) / np.sqrt(part.sum()))
+    sparse = binned_means([0.0, 0.1, 2.0], [1.0, 2.0, 3.0], bins=10)
+    assert sparse['count'].tolist() == [2, 1]
+
+
+def test_fit_band():
+    """
+    The band is narrowest at the weighted mean of x, where its half-width
+    is 1 / sqrt(S), and matches sigma_a at x = 0.
+    """
+    x, y, sigma = line_data(200)
+    accumulator = FitAccumulator().update(x, y, sigma)
+    fit = accumulator.result()
+    line, low, high = fit_band(accumulator, [accumulator.mean_x, 0.0], 2.0)
+    assert line[1] == pytest.approx(fit['intercept'])
+    assert high - line == pytest.approx(line - low)
+    assert high[0] - line[0] == pytest.approx(
+        2.0 / np.sqrt(accumulator.weight_sum))
+    assert high[1] - line[1] == pytest.approx(2.0 * fit['sigma_a'])
+
+
+@pytest.mark.parametrize('mode, expected', [('auto', 'binned'),
+                                            ('points', 'points'),
+                                            ('density', 'density')])
+def test_render_fit(tmp_path, mode, expected):
+    """
+    Each mode writes the figure and returns the fit.
+    """
+    x, y, sigma = line_data(500)
+    path = str(tmp_path / 'fit.png')
+    result = render_fit(x, y, sigma, path, mode=mode, max_points=100,
+                        bins=20, dpi=30)
+    assert result['mode'] == expected and result['path'] == path
+    assert (tmp_path / 'fit.png').stat().st_size > 0
+    assert result['slope'] == pytest.approx(
+        FitAccumulator().update(x, y, sigma).result()['slope'])
+    with pytest.raises(ValueError):
+        render_fit(x, y, sigma, path, mode='scatter')
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_render_groups(tmp_path, n_workers):
+    """
+    Every group gets its own figure in the created directory; groups that
+    can not be fitted report the reason.
+    """
+    x, y, _ = line_data(300)
+    groups = np.repeat(['a', 'b', 'c'], 100)
+    x[200:] = 1.0
+    tmp_path = tmp_path / 'figures'
+    results = render_groups(x, y, None, groups, str(tmp_path), 'svg',
+                            n_workers=n_workers, dpi=30)
+    assert sorted(results) == ['a', 'b', 'c']
+    assert results['a']['slope'] == pytest.approx(
+        FitAccumulator().update(x[:100], y[:100], np.ones(100)).result()[
+            'slope'])
+    assert (tmp_path / 'b.svg').exists()
+    assert results['c'] == {'path': str(tmp_path / 'c.svg'),
+                            'error': 'All x values are equal.'}
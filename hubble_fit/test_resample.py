@@ -0,0 +1,116 @@
+"""
+Provides unit testing for the bootstrap and jackknife in
+hubble_fit/resample.py.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from hubble_fit import resample
+from hubble_fit.batch import fit_batch
+from hubble_fit.resample import bootstrap, jackknife
+
+
+def random_data(n):
+    """
+    Returns noisy Hubble-like data of n points.
+    """
+    rng = np.random.default_rng(11)
+    x = rng.uniform(0.1, 2.0, n)
+    sigma = rng.uniform(50.0, 150.0, n)
+    y = 500.0 * x + rng.normal(0.0, sigma)
+    return x, y, sigma
+
+
+class TestBootstrap:
+    """
+    Contains tests for bootstrap.
+    Tests the following cases:
+     - Same seed gives the same samples with and without worker processes.
+     - Concurrent serial runs in threads do not share data.
+     - Spread of the slope agrees with the analytic sigma_b.
+     - Degenerate resamples are dropped and counted.
+     - Defined errors.
+    """
+    def test_reproducible(self):
+        """
+        The samples depend on the seed only, not on the worker count.
+        """
+        x, y, sigma = random_data(20)
+        serial = bootstrap(x, y, sigma, n_resamples=3000, seed=4,
+                           block_size=500)
+        pooled = bootstrap(x, y, sigma, n_resamples=3000, seed=4,
+                           block_size=500, n_workers=2)
+        assert np.array_equal(serial['samples'], pooled['samples'])
+        assert serial['intervals'] == pooled['intervals']
+
+    def test_threads(self):
+        """
+        Serial bootstraps of different data in threads each fit their own
+        data and leave no module state behind.
+        """
+        datasets = [random_data(20), random_data(30)]
+        expected = [bootstrap(*d, n_resamples=2000, seed=1, block_size=100)
+                    for d in datasets]
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(
+                lambda d: bootstrap(*d, n_resamples=2000, seed=1,
+                                    block_size=100), datasets * 4))
+        for result, want in zip(results, expected * 4):
+            assert np.array_equal(result['samples'], want['samples'])
+        assert not resample._WORKER_DATA  # pylint: disable=W0212
+
+    def test_matches_analytic(self):
+        """
+        For well-described data the bootstrap spread of the slope is close
+        to sigma_b, and the interval contains the fitted slope.
+        """
+        x, y, sigma = random_data(400)
+        result = bootstrap(x, y, sigma, n_resamples=4000, seed=1)
+        fitted = fit_batch([x], [y], [sigma])[0]
+        spread = result['samples']['slope'].std()
+        assert spread == pytest.approx(fitted['sigma_b'], rel=0.15)
+        low, high = result['intervals']['slope']
+        assert low < fitted['slope'] < high
+        assert result['n_failed'] == 0
+
+    def test_degenerate(self):
+        """
+        Resamples whose x are all equal are dropped.
+        """
+        result = bootstrap([1.0, 1.0, 2.0], [1.0, 2.0, 3.0], None,
+                           n_resamples=2000, seed=0)
+        assert result['n_failed'] > 0
+        assert result['samples'].size == 2000 - result['n_failed']
+        assert np.all(np.isfinite(result['samples']['slope']))
+
+    def test_errors(self):
+        """
+        Tests the defined errors of bootstrap.
+        """
+        with pytest.raises(TypeError, match="same length"):
+            bootstrap([1, 2, 3], [1, 2], [1, 1, 1])
+        with pytest.raises(TypeError, match="Not enough data"):
+            bootstrap([1, 2], [1, 2], [1, 1])
+        with pytest.raises(ZeroDivisionError, match="Element of sigma"):
+            bootstrap([1, 2, 3], [1, 2, 3], [1, 1, 0])
+        with pytest.raises(ValueError, match="Confidence"):
+            bootstrap([1, 2, 3], [1, 2, 3], confidence=1.5)
+
+
+def test_jackknife_matches_refits():
+    """
+    Every leave-one-out sample equals a fit without that point, and the
+    age is derived from the slope.
+    """
+    x, y, sigma = random_data(12)
+    result = jackknife(x, y, sigma)
+    for i, row in enumerate(result['samples']):
+        keep = np.arange(12) != i
+        expected = fit_batch([x[keep]], [y[keep]], [sigma[keep]])[0]
+        assert row['slope'] == pytest.approx(expected['slope'], rel=1e-10)
+        assert row['intercept'] == pytest.approx(expected['intercept'],
+                                                 rel=1e-8)
+    assert np.allclose(result['samples']['age'] * result['samples']['slope'],
+                       3.09e19)
+    assert result['standard_error']['slope'] > 0
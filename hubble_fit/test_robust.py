@@ -0,0 +1,97 @@
+"""
+Provides unit testing for the robust fits in hubble_fit/robust.py.
+Checks that outliers are down-weighted, that clean data give the
+ordinary fit and that the batch layouts agree with single fits.
+"""
+import numpy as np
+import pytest
+from hubble_fit.batch import fit_batch
+from hubble_fit.robust import robust_fit, robust_fit_batch
+
+
+def line_with_outliers(rng, n, n_outliers):
+    """
+    Returns a noisy straight line whose first n_outliers points are
+    shifted far away.
+    """
+    x = rng.uniform(0.0, 2.0, n)
+    sigma = rng.uniform(50.0, 150.0, n)
+    y = 500.0 * x - 40.0 + rng.normal(0.0, sigma)
+    y[:n_outliers] += 3000.0
+    return x, y, sigma
+
+
+@pytest.mark.parametrize('method', ['huber', 'tukey'])
+def test_clean_data(method):
+    """
+    Without outliers the robust fit stays close to the ordinary fit.
+    """
+    x, y, sigma = line_with_outliers(np.random.default_rng(1), 500, 0)
+    ordinary = fit_batch(x[None], y[None], sigma[None])[0]
+    result = robust_fit(x, y, sigma, method=method)
+    assert result['converged']
+    assert abs(result['slope'] - ordinary['slope']) < \
+        0.2 * ordinary['sigma_b']
+    assert np.mean(result['weights']) > 0.9
+    assert result['scale'] == pytest.approx(1.0, abs=0.15)
+
+
+def test_outliers():
+    """
+    Gross outliers get weight 0 with Tukey and small weights with Huber,
+    and the robust slopes are close to the true slope.
+    """
+    x, y, sigma = line_with_outliers(np.random.default_rng(2), 200, 10)
+    ordinary = fit_batch(x[None], y[None], sigma[None])[0]
+    tukey = robust_fit(x, y, sigma, method='tukey')
+    huber = robust_fit(x, y, sigma, method='huber')
+    assert np.all(tukey['weights'][:10] == 0.0)
+    assert np.all(huber['weights'][:10] < 0.1)
+    assert abs(ordinary['intercept'] + 40.0) > 100.0
+    for result in (tukey, huber):
+        assert result['converged'] and result['iterations'] > 1
+        assert result['slope'] == pytest.approx(500.0, abs=4 * result[
+            'sigma_b'])
+        assert result['intercept'] == pytest.approx(-40.0, abs=4 * result[
+            'sigma_a'])
+
+
+def test_batch_layouts():
+    """
+    Rows, ragged series and single fits give the same results.
+    """
+    rng = np.random.default_rng(3)
+    series = [line_with_outliers(rng, n, k)
+              for n, k in [(50, 3), (80, 0), (30, 5)]]
+    offsets = np.cumsum([0] + [s[0].size for s in series])
+    x, y, sigma = (np.concatenate(i) for i in zip(*series))
+    result, weights = robust_fit_batch(x, y, sigma, offsets, method='tukey')
+    for i, (lo, hi) in enumerate(zip(offsets[:-1], offsets[1:])):
+        single = robust_fit(x[lo:hi], y[lo:hi], sigma[lo:hi],
+                            method='tukey')
+        assert result['slope'][i] == pytest.approx(single['slope'])
+        assert weights[lo:hi] == pytest.approx(single['weights'])
+
+    x, y, sigma = (np.stack([i[:30] for i in column])
+                   for column in zip(*series))
+    result, weights = robust_fit_batch(x, y, sigma, scale=1.0)
+    assert weights.shape == x.shape
+    assert np.all(result['scale'] == 1.0)
+    ragged, _ = robust_fit_batch(x.ravel(), y.ravel(), sigma.ravel(),
+                                 np.arange(0, 91, 30), scale=1.0)
+    assert ragged['slope'] == pytest.approx(result['slope'])
+
+
+def test_errors():
+    """
+    Invalid options and data are rejected.
+    """
+    x, y, sigma = line_with_outliers(np.random.default_rng(4), 20, 0)
+    with pytest.raises(ValueError):
+        robust_fit(x, y, sigma, method='cauchy')
+    with pytest.raises(ValueError):
+        robust_fit(x, y, sigma, max_iter=0)
+    with pytest.raises(TypeError):
+        robust_fit(x, y[:-1], sigma)
+    with pytest.raises(ZeroDivisionError):
+        robust_fit(x, y, np.zeros_like(sigma))
@@ -0,0 +1,92 @@
+"""
+Provides unit testing for the window fits in hubble_fit/rolling.py.
+Checks every window against fit_batch on the same points, for each
+backend, including windows that run across blocks of running sums.
+"""
+import numpy as np
+import pytest
+from hubble_fit.batch import fit_batch
+from hubble_fit.dispatch import available_backends
+from hubble_fit.rolling import expanding_fit, rolling_fit
+
+BACKENDS = ['numpy'] + (['compiled'] if 'compiled' in available_backends()
+                        else [])
+
+
+def ordered_data(n):
+    """
+    Returns noisy straight-line data of n points ordered by x.
+    """
+    rng = np.random.default_rng(8)
+    x = np.sort(rng.uniform(0.0, 2.0, n))
+    sigma = rng.uniform(50.0, 150.0, n)
+    y = 500.0 * x - 40.0 + rng.normal(0.0, sigma)
+    return x, y, sigma
+
+
+def assert_fits(result, x, y, sigma):
+    """
+    Each row of result equals fit_batch on the matching row of points
+    (up to rounding of the chi squared of two points, which is 0).
+    """
+    expected = fit_batch(x, y, sigma)
+    for name in expected.dtype.names:
+        assert result[name] == pytest.approx(expected[name], rel=1e-6,
+                                             abs=1e-5)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('window', [2, 7, 60])
+def test_rolling(backend, window):
+    """
+    Every sliding window matches a fit of its points.
+    """
+    x, y, sigma = ordered_data(500)
+    result = rolling_fit(x, y, sigma, window, backend=backend)
+    assert result.size == 500 - window + 1
+    view = np.lib.stride_tricks.sliding_window_view
+    assert_fits(result, view(x, window), view(y, window),
+                view(sigma, window))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_expanding(backend, monkeypatch):
+    """
+    Every leading run matches a fit of its points, also past a block.
+    """
+    monkeypatch.setattr('hubble_fit.rolling.BLOCK_SIZE', 16)
+    x, y, sigma = ordered_data(50)
+    result = expanding_fit(x, y, sigma, min_points=3, backend=backend)
+    assert np.all(np.isnan(result['slope'][:2]))
+    for stop in (3, 16, 17, 33, 50):
+        assert_fits(result[stop - 1:stop], x[None, :stop], y[None, :stop],
+                    sigma[None, :stop])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_equal_x(backend):
+    """
+    Windows whose x values are all equal give NaN, unweighted by default.
+    """
+    x = np.array([1.0, 2.0, 2.0, 2.0, 3.0])
+    y = np.array([1.0, 2.0, 3.0, 4.0, 7.0])
+    result = rolling_fit(x, y, window=3, backend=backend)
+    assert np.isnan(result['slope'][1])
+    assert result['slope'][[0, 2]] == pytest.approx([1.5, 3.5])
+
+
+def test_errors():
+    """
+    Invalid data and options are rejected.
+    """
+    x, y, sigma = ordered_data(10)
+    with pytest.raises(TypeError):
+        rolling_fit(x, y[:-1], sigma, 3)
+    with pytest.raises(TypeError):
+        rolling_fit(x, y, sigma, 11)
+    with pytest.raises(TypeError):
+        expanding_fit(x, y, sigma, min_points=1)
+    with pytest.raises(ZeroDivisionError):
+        rolling_fit(x, y, np.zeros(10), 3)
+    with pytest.raises(ValueError):
+        rolling_fit(x, y, sigma, 3, backend='parallel')
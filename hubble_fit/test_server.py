@@ -0,0 +1,227 @@
+"""
+Provides unit testing for the fit server in hubble_fit/server.py and its
+client in hubble_fit/client.py.
+"""
+import array
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from hubble_fit import dispatch, server as fit_server
+from hubble_fit.client import FitClient
+from hubble_fit.server import FitServer
+
+# Same mock data and expected values as pseudo_code/test_linear_fit.py.
+X = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+Y = [-1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
+SIGMA = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+EXPECTED = {
+    'intercept': -1.0,
+    'slope': 2.0,
+    'sigma_a': 0.0723747,
+    'sigma_b': 0.0239046,
+}
+
+
+def serve(client_code, path=None, **options):
+    """
+    Runs client_code(address) in a thread against a fresh server and
+    returns its result with the server's statistics.
+    """
+    async def run():
+        async with await FitServer(**options).start(path, port=0) \
+                as server:
+            result = await asyncio.to_thread(client_code, server.address)
+            return result, server.stats()
+    return asyncio.run(run())
+
+
+def connect(address):
+    """
+    Client of the server at address (a Unix socket path or host, port).
+    """
+    if isinstance(address, str):
+        return FitClient(path=address, timeout=10)
+    return FitClient(host=address[0], port=address[1], timeout=10)
+
+
+class TestFitServer:
+    """
+    Contains tests for FitServer and FitClient.
+    Tests the following cases:
+     - Binary and JSON requests over TCP and a Unix socket.
+     - Concurrent small requests are fitted in batches.
+     - Large requests are fitted directly.
+     - Errors reach the client and the server keeps serving.
+     - A batch failing unexpectedly fails only its own requests.
+     - Latency histogram and queue depth statistics.
+    """
+    @pytest.mark.parametrize('binary', [True, False])
+    def test_known_result(self, binary):
+        """
+        The mock data gives the known result, as lists and arrays.
+        """
+        def client_code(address):
+            with connect(address) as client:
+                return [client.fit(X, Y, SIGMA, binary=binary),
+                        client.fit(np.array(X), array.array('d', Y),
+                                   np.array(SIGMA), binary=binary)]
+
+        results, stats = serve(client_code)
+        for result in results:
+            assert result['backend'] == 'batch'
+            for key, value in EXPECTED.items():
+                assert result[key] == pytest.approx(value, abs=1e-6)
+        assert stats['requests'] == 2 and stats['errors'] == 0
+
+    def test_unix_socket(self):
+        """
+        The server also listens on a Unix socket, removed when it closes.
+        """
+        path = os.path.join(tempfile.mkdtemp(), 'fit.sock')
+
+        def client_code(address):
+            with connect(address) as client:
+                return client.fit(X, Y)
+
+        result, _ = serve(client_code, path)
+        assert result['slope'] == pytest.approx(2.0)
+        assert not os.path.exists(path)
+
+    def test_batching(self):
+        """
+        Concurrent clients share batches and get their own results.
+        """
+        rng = np.random.default_rng(5)
+        data = [(rng.uniform(0, 2, 20), rng.uniform(-1, 1), rng.uniform(1, 2))
+                for _ in range(16)]
+
+        def client_code(address):
+            def one(item):
+                x, intercept, slope = item
+                with connect(address) as client:
+                    return client.fit(x, intercept + slope * x,
+                                      np.full(x.size, 0.1))
+            # Threads, standing in for client processes.
+            return list(_map_threads(one, data))
+
+        results, stats = serve(client_code, max_delay=0.05)
+        for result, (_, intercept, slope) in zip(results, data):
+            assert result['intercept'] == pytest.approx(intercept)
+            assert result['slope'] == pytest.approx(slope)
+        assert stats['batched_requests'] == 16
+        assert stats['batches'] < 16
+        assert stats['max_queue_depth'] > 1
+        assert sum(stats['batch_size']['counts']) == stats['batches']
+
+    def test_large_request(self):
+        """
+        Requests beyond max_points skip the batch and match fit.
+        """
+        rng = np.random.default_rng(6)
+        x = rng.uniform(0, 2, 500)
+        y = 3.0 * x + rng.normal(0, 0.1, 500)
+
+        def client_code(address):
+            with connect(address) as client:
+                return client.fit(x, y, np.full(500, 0.1))
+
+        result, stats = serve(client_code, max_points=100)
+        expected = dispatch.fit(x, y, np.full(500, 0.1))
+        assert result == pytest.approx(expected)
+        assert stats['batches'] == 0
+
+    def test_errors(self):
+        """
+        Fit errors are raised on the client, only for the failing series
+        of a batch, and the connection stays usable.
+        """
+        def client_code(address):
+            errors = []
+            with connect(address) as client:
+                for data in ([X, Y[:-1], SIGMA], [X, Y, [0.0] * 6],
+                             [X, [1.0, np.nan] * 3, SIGMA],
+                             [[1.0, 'a'], [1.0, 2.0]]):
+                    try:
+                        client.fit(*data, binary=False)
+                    except (TypeError, ValueError,
+                            ZeroDivisionError) as exc:
+                        errors.append(type(exc))
+                good = client.fit(X, Y, SIGMA)
+            return errors, good
+
+        (errors, good), stats = serve(client_code)
+        assert errors == [TypeError, ZeroDivisionError, ValueError,
+                          TypeError]
+        assert good['slope'] == pytest.approx(2.0)
+        # The non-numeric data never leaves the client.
+        assert stats['errors'] == 3 and stats['requests'] == 4
+
+        def batch_code(address):
+            def one(x):
+                with connect(address) as client:
+                    try:
+                        return client.fit(x, Y, SIGMA)['slope']
+                    except ZeroDivisionError:
+                        return None
+            return list(_map_threads(one, [X, [1.0] * 6, X]))
+
+        slopes, stats = serve(batch_code, max_delay=0.05)
+        assert slopes[1] is None
+        assert slopes[0] == slopes[2] == pytest.approx(2.0)
+
+    def test_batch_failure(self, monkeypatch):
+        """
+        An unexpected error of a batch reaches its clients as RuntimeError
+        and the next batch is fitted as usual.
+        """
+        fit_items = fit_server._fit_items
+        failures = [1]
+
+        def failing(batch):
+            if failures:
+                failures.pop()
+                raise MemoryError("Batch too large.")
+            return fit_items(batch)
+
+        monkeypatch.setattr(fit_server, '_fit_items', failing)
+
+        def client_code(address):
+            with connect(address) as client:
+                with pytest.raises(RuntimeError, match="Batch too large"):
+                    client.fit(X, Y, SIGMA)
+                return client.fit(X, Y, SIGMA)
+
+        good, stats = serve(client_code)
+        assert good['slope'] == pytest.approx(2.0)
+        assert stats['errors'] == 1 and stats['batches'] == 2
+
+    def test_stats(self):
+        """
+        Every request is counted once in the latency histogram.
+        """
+        def client_code(address):
+            with connect(address) as client:
+                for _ in range(10):
+                    client.fit(X, Y, SIGMA)
+                return client.stats()
+
+        stats, _ = serve(client_code)
+        assert stats['requests'] == 10
+        assert sum(stats['latency']['counts']) == 10
+        assert len(stats['latency']['counts']) == \
+            len(stats['latency']['edges']) + 1
+        assert 0 < stats['latency']['percentiles']['50'] \
+            <= stats['latency']['percentiles']['99']
+        assert stats['queue_depth'] == 0
+
+
+def _map_threads(function, items):
+    """
+    function over items, each in its own thread, in order.
+    """
+    with ThreadPoolExecutor(len(items)) as pool:
+        return pool.map(function, items)
@@ -0,0 +1,140 @@
+"""
+Provides unit testing for read_markdown_table in hubble_fit/tables.py.
+"""
+import os
+
+import numpy as np
+import pytest
+from hubble_fit.tables import read_markdown_table
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'Data')
+
+TABLE = """OBJECT      m_s     r       v       M_t
+'S.Mag.'      ..      0.032   +170    -16.0
+
+# 404       ..      ..      -25     commented out
+598         17.0    0.263   -70     -15.1   # trailing comment
+'N.G.C. 6822' 9.0  0.214   -130    12.7
+"""
+
+
+def write(path, text):
+    """
+    Writes text to path and returns the path as a string.
+    """
+    path.write_bytes(text.encode('utf-8'))
+    return str(path)
+
+
+class TestReadMarkdownTable:
+    """
+    Contains tests for read_markdown_table.
+    Tests the following cases:
+     - Typed columns with missing values, signs, quotes and comments.
+     - Same columns for any block size.
+     - Selected columns and explicit dtypes.
+     - Numbers beyond plain decimals, and text columns.
+     - Agreement with pandas on the tables in Data/.
+     - Ragged rows, unknown columns, empty and missing files.
+    """
+    def test_columns(self, tmp_path):
+        """
+        '..' is NaN, '+170' is 170, quoted names keep their quotes and
+        spaces, and comments and blank lines are skipped.
+        """
+        table = read_markdown_table(write(tmp_path / 't.md', TABLE))
+        assert list(table) == ['OBJECT', 'm_s', 'r', 'v', 'M_t']
+        assert table['OBJECT'].tolist() == ["'S.Mag.'", '598',
+                                            "'N.G.C. 6822'"]
+        assert table['v'].dtype == np.int64
+        assert table['v'].tolist() == [170, -70, -130]
+        assert table['r'].dtype == np.float64
+        assert table['r'].tolist() == [0.032, 0.263, 0.214]
+        assert np.isnan(table['m_s'][0])
+        assert table['m_s'][1:].tolist() == [17.0, 9.0]
+        assert table['M_t'].tolist() == [-16.0, -15.1, 12.7]
+
+    @pytest.mark.parametrize('block_size', [1, 7, 64, 2**22])
+    def test_block_size(self, tmp_path, block_size):
+        """
+        Lines split across blocks are parsed the same.
+        """
+        path = write(tmp_path / 't.md', TABLE.rstrip('\n'))
+        expected = read_markdown_table(path)
+        table = read_markdown_table(path, block_size=block_size)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(table[name], values)
+
+    def test_columns_and_dtypes(self, tmp_path):
+        """
+        Only the given columns are returned, in their order, with the
+        given dtypes.
+        """
+        path = write(tmp_path / 't.md', TABLE)
+        table = read_markdown_table(path, columns=['v', 'OBJECT'],
+                                    dtypes={'v': float, 'OBJECT': str})
+        assert list(table) == ['v', 'OBJECT']
+        assert table['v'].dtype == np.float64
+        with pytest.raises(ValueError):
+            read_markdown_table(path, dtypes={'m_s': int})
+        with pytest.raises(ValueError):
+            read_markdown_table(path, dtypes={'OBJECT': float})
+
+    def test_numbers(self, tmp_path):
+        """
+        Plain decimals are correctly rounded; exponents, long mantissas
+        and 'nan' fall back to NumPy's parser; other text stays str.
+        """
+        values = ['0.1', '-.5', '+2.', '1e3', '12345678901234567890',
+                  '0.30000000000000004', 'nan']
+        text = 'a b\n' + ''.join(f'{v} x{i}\n' for i, v in enumerate(values))
+        table = read_markdown_table(write(tmp_path / 't.md', text))
+        np.testing.assert_array_equal(table['a'],
+                                      [float(v) for v in values])
+        assert table['b'].tolist() == [f'x{i}' for i in range(len(values))]
+
+        rows = np.random.default_rng(0).normal(0, 1e3, 1000).round(4)
+        text = 'a\n' + ''.join(f'{v!r}\n' for v in rows.tolist())
+        table = read_markdown_table(write(tmp_path / 'n.md', text))
+        np.testing.assert_array_equal(table['a'], rows)
+
+    @pytest.mark.parametrize('name', ['raw_data_table1.md',
+                                      'raw_data_table2.md'])
+    def test_pandas(self, name):
+        """
+        The tables in Data/ read as with pandas.
+        """
+        pd = pytest.importorskip('pandas')
+        path = os.path.join(DATA, name)
+        expected = pd.read_csv(path, sep=r'\s+', comment='#',
+                               na_values=['..'])
+        table = read_markdown_table(path)
+        assert list(table) == list(expected.columns)
+        for column, values in table.items():
+            if values.dtype.kind == 'U':
+                values = values.astype(object)
+            np.testing.assert_array_equal(values, expected[column])
+
+    def test_errors(self, tmp_path):
+        """
+        Ragged rows report their line; unknown columns, files without a
+        header and missing files raise.
+        """
+        path = write(tmp_path / 'r.md', 'a b\n1 2\n\n3\n')
+        with pytest.raises(ValueError, match='Line 4'):
+            read_markdown_table(path)
+        path = write(tmp_path / 't.md', TABLE)
+        with pytest.raises(KeyError):
+            read_markdown_table(path, columns=['z'])
+        with pytest.raises(KeyError):
+            read_markdown_table(write(tmp_path / 'e.md', '# nothing\n\n'))
+        with pytest.raises(FileNotFoundError):
+            read_markdown_table(str(tmp_path / 'missing.md'))
+
+    def test_header_only(self, tmp_path):
+        """
+        A table without rows has empty columns.
+        """
+        table = read_markdown_table(write(tmp_path / 'h.md', 'a b'))
+        assert [values.size for values in table.values()] == [0, 0]
@@ -0,0 +1,154 @@
+"""
+Provides unit testing for validate_fit_data in hubble_fit/validation.py.
+"""
+import array
+import mmap
+
+import numpy as np
+import pytest
+from hubble_fit.validation import MAX_REPORTED, validate_fit_data
+
+X = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+Y = [-1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
+SIGMA = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+
+
+class TestValidateFitData:
+    """
+    Contains tests for validate_fit_data.
+    Tests the following cases:
+     - Lists, arrays, Series, memmaps and buffers give the same arrays.
+     - Contiguous float arrays are not copied.
+     - float32 is kept only if all inputs are float32.
+     - Invalid types, non-numeric elements, lengths and too few points.
+     - Non-finite values and small sigma, with their indices.
+    """
+    def test_inputs(self, tmp_path):
+        """
+        Every accepted input type gives the same float64 arrays.
+        """
+        expected = [np.array(i) for i in (X, Y, SIGMA)]
+        path = tmp_path / 'x.f8'
+        np.array(X).tofile(path)
+        with open(path, 'rb') as file:
+            # Left open: the arrays read from it point into its memory.
+            raw = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        inputs = [
+            (X, Y, SIGMA),
+            (tuple(X), np.array(Y), np.array(SIGMA, dtype=np.float32)),
+            (np.array(X, dtype=np.int64).tolist(), Y, SIGMA),
+            (np.memmap(path, dtype=np.float64, mode='r'), Y, SIGMA),
+            (raw, array.array('d', Y), memoryview(np.array(SIGMA))),
+        ]
+        for data in inputs:
+            result = validate_fit_data(*data)
+            for values, wanted in zip(result, expected):
+                assert values.dtype == np.float64
+                np.testing.assert_allclose(values, wanted, rtol=1e-6)
+
+    def test_series(self):
+        """
+        pandas Series are read in place.
+        """
+        pd = pytest.importorskip('pandas')
+        data = [pd.Series(i) for i in (X, Y, SIGMA)]
+        result = validate_fit_data(*data)
+        for values, series in zip(result, data):
+            assert np.shares_memory(values, series.to_numpy())
+
+    def test_no_copy(self, tmp_path):
+        """
+        Contiguous float arrays, also memory-mapped, are returned as
+        views; sigma None is all ones.
+        """
+        data = [np.array(i) for i in (X, Y, SIGMA)]
+        for values, given in zip(validate_fit_data(*data), data):
+            assert np.shares_memory(values, given)
+        mapped = np.memmap(tmp_path / 'y.f8', dtype=np.float64, mode='w+',
+                           shape=len(Y))
+        mapped[:] = Y
+        x, y, sigma = validate_fit_data(data[0], mapped)
+        assert np.shares_memory(y, mapped)
+        assert sigma.tolist() == [1.0] * len(X)
+
+    def test_dtype(self):
+        """
+        float32 is kept if all three inputs are float32.
+        """
+        data = [np.array(i, dtype=np.float32) for i in (X, Y, SIGMA)]
+        assert all(a.dtype == np.float32 for a in validate_fit_data(*data))
+        assert validate_fit_data(*data[:2])[2].dtype == np.float32
+        result = validate_fit_data(data[0], data[1], SIGMA)
+        assert all(a.dtype == np.float64 for a in result)
+
+    @pytest.mark.parametrize('data, match', [
+        (('string', Y, SIGMA), 'Input not in form of list'),
+        ((5, Y, SIGMA), 'Input not in form of list'),
+        ((['1', 2, 3], [1, 2, 3], [1, 1, 1]), 'Elements of list'),
+        ((X, Y[:-1], SIGMA), 'same length'),
+        (([X, X], [Y, Y], [SIGMA, SIGMA]), 'same length'),
+        (([1.0], [1.0], [1.0]), 'Not enough data'),
+    ])
+    def test_type_errors(self, data, match):
+        """
+        Invalid inputs raise TypeError.
+        """
+        with pytest.raises(TypeError, match=match):
+            validate_fit_data(*data)
+
+    def test_indices(self):
+        """
+        Non-numeric, non-finite and too small elements are named by
+        index, the first MAX_REPORTED in the message.
+        """
+        with pytest.raises(TypeError, match=r'indices 1\)') as info:
+            validate_fit_data([1.0, 'a', 3.0], [1, 2, 3])
+        assert info.value.indices.tolist() == [1]
+
+        y = np.array(Y)
+        y[[1, 4]] = [np.nan, -np.inf]
+        with pytest.raises(ValueError, match=r'y is not finite') as info:
+            validate_fit_data(X, y, SIGMA)
+        assert info.value.indices.tolist() == [1, 4]
+        assert validate_fit_data(X, y, SIGMA, finite=False)[1] is not None
+
+        sigma = np.full(30, 0.1)
+        sigma[5:] = -1e-7
+        with pytest.raises(ZeroDivisionError,
+                           match=r'Element of sigma.*and 15 more'
+                           ) as info:
+            validate_fit_data(np.arange(30.0), np.arange(30.0), sigma)
+        assert info.value.indices.tolist() == list(range(5, 30))
+        shown = str(info.value).split('(indices ')[1].split(' and')[0]
+        assert len(shown.split(', ')) == MAX_REPORTED
+
+    def test_sigma_signs(self):
+        """
+        Negative and mixed-sign sigma beyond the floor is valid, an
+        element inside it is not.
+        """
+        validate_fit_data(X, Y, [-0.1] * len(X))
+        sigma = [0.1, -0.1] * (len(X) // 2) + [0.1] * (len(X) % 2)
+        assert validate_fit_data(X, Y, sigma)[2].tolist() == sigma
+        with pytest.raises(ZeroDivisionError, match='indices 0'):
+            validate_fit_data(X, Y, [0.0] + [-0.1] * (len(X) - 1))
+
+    def test_empty(self):
+        """
+        Empty data passes with min_points=0 instead of failing on a
+        reduction.
+        """
+        for sigma in ([], None):
+            data = validate_fit_data([], [], sigma, min_points=0)
+            assert [a.size for a in data] == [0, 0, 0]
+
+    def test_large_finite(self):
+        """
+        Finite data whose sum overflows is valid.
+        """
+        x = validate_fit_data(np.full(10, 1e38, dtype=np.float32),
+                              np.arange(10, dtype=np.float32))[0]
+        assert x.dtype == np.float32
+        validate_fit_data([1e308, 1e308, 1.0], [1.0, 2.0, 3.0])
+        with pytest.raises(ValueError, match=r'x is not finite.*2\)'):
+            validate_fit_data([1e308, 1e308, np.inf], [1.0, 2.0, 3.0])
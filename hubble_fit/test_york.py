@@ -0,0 +1,87 @@
+"""
+Provides unit testing for the York fits in hubble_fit/york.py.
+Checks the Pearson data with York's weights against the published
+results and the batch layouts against single fits.
+"""
+import numpy as np
+import pytest
+from hubble_fit.batch import fit_batch
+from hubble_fit.york import york_fit, york_fit_batch
+
+# Pearson's data with York's weights (York et al. 2004, Table I and II).
+X = [0.0, 0.9, 1.8, 2.6, 3.3, 4.4, 5.2, 6.1, 6.5, 7.4]
+Y = [5.9, 5.4, 4.4, 4.6, 3.5, 3.7, 2.8, 2.8, 2.4, 1.5]
+WEIGHT_X = np.array([1000.0, 1000.0, 500.0, 800.0, 200.0, 80.0, 60.0, 20.0,
+                     1.8, 1.0])
+WEIGHT_Y = np.array([1.0, 1.8, 4.0, 8.0, 20.0, 20.0, 70.0, 70.0, 100.0,
+                     500.0])
+EXPECTED = {
+    'intercept': 5.47991022403,
+    'slope': -0.480533407446,
+    'sigma_a': 0.294970735,
+    'sigma_b': 0.0579850090,
+}
+
+
+def test_pearson_york():
+    """
+    The fit reproduces York's published solution of the Pearson data.
+    """
+    result = york_fit(X, Y, WEIGHT_X**-0.5, WEIGHT_Y**-0.5)
+    assert result['converged'] and result['iterations'] < 20
+    for key, value in EXPECTED.items():
+        assert result[key] == pytest.approx(value, rel=1e-8)
+
+
+def test_no_x_errors():
+    """
+    Without uncertainties in x the result is the ordinary weighted fit.
+    """
+    rng = np.random.default_rng(5)
+    x = rng.uniform(0.0, 2.0, (3, 40))
+    sigma = rng.uniform(50.0, 150.0, x.shape)
+    y = 500.0 * x + rng.normal(0.0, sigma)
+    result = york_fit_batch(x, y, np.zeros_like(x), sigma)
+    expected = fit_batch(x, y, sigma)
+    for key in expected.dtype.names:
+        assert result[key] == pytest.approx(expected[key])
+
+
+def test_batch_layouts():
+    """
+    Rows, ragged series and single fits give the same results, also with
+    correlated errors.
+    """
+    rng = np.random.default_rng(6)
+    x = rng.uniform(0.0, 2.0, (4, 25))
+    sigma_x = rng.uniform(0.05, 0.2, x.shape)
+    sigma_y = rng.uniform(50.0, 150.0, x.shape)
+    y = 500.0 * (x + rng.normal(0.0, sigma_x)) + rng.normal(0.0, sigma_y)
+    rows = york_fit_batch(x, y, sigma_x, sigma_y, r=0.3)
+    ragged = york_fit_batch(x.ravel(), y.ravel(), sigma_x.ravel(),
+                            sigma_y.ravel(), np.arange(0, 101, 25), r=0.3)
+    for i in range(4):
+        single = york_fit(x[i], y[i], sigma_x[i], sigma_y[i], r=0.3)
+        for key in ('intercept', 'slope', 'sigma_a', 'sigma_b'):
+            assert rows[key][i] == pytest.approx(single[key])
+            assert ragged[key][i] == pytest.approx(single[key])
+    uncorrelated = york_fit(x[0], y[0], sigma_x[0], sigma_y[0])
+    assert uncorrelated['slope'] != pytest.approx(rows['slope'][0])
+
+
+def test_errors():
+    """
+    Invalid data and options are rejected.
+    """
+    sigma_x, sigma_y = WEIGHT_X**-0.5, WEIGHT_Y**-0.5
+    with pytest.raises(TypeError):
+        york_fit(X, Y[:-1], sigma_x, sigma_y)
+    with pytest.raises(TypeError):
+        york_fit_batch(np.array([X]), np.array([Y]), sigma_x,
+                       np.array([sigma_y]))
+    with pytest.raises(ValueError):
+        york_fit(X, Y, sigma_x, sigma_y, r=1.5)
+    with pytest.raises(ValueError):
+        york_fit(X, Y, sigma_x, sigma_y, max_iter=0)
+    with pytest.raises(ZeroDivisionError):
+        york_fit(X, Y, sigma_x, np.zeros(10))
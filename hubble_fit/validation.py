@@ -0,0 +1,165 @@
+"""
+Checks of the data of a straight-line fit, with whole-array operations.
+
+validate_fit_data accepts x, y and sigma as
+- lists or tuples of numbers,
+- NumPy arrays, including np.memmap arrays,
+- pandas Series and anything else with __array__ (pandas is not
+  imported here),
+- objects with the buffer protocol: a typed memoryview or array.array is
+  read with its item format, a raw byte buffer (format 'B', such as an
+  mmap.mmap of a binary file) as float64 values,
+and returns them as 1-D arrays of one float dtype (float32 is kept if all
+three are float32, anything else becomes float64).
+
+A contiguous float array (or a Series, memmap or buffer over one) of the
+returned dtype is not copied: the result is a view of its memory. The
+data is checked in order for
+- numeric values (TypeError),
+- 1-D data of the same length (TypeError) and at least min_points points
+  (TypeError),
+- finite values (ValueError),
+- elements of sigma of at least sigma_floor in magnitude
+  (ZeroDivisionError),
+with the same messages as the fitting functions. Valid data costs one
+reduction per array and per check; only when a check fails are the
+offending indices located, which the error names in its message and
+carries as its indices attribute.
+"""
+
+import numbers
+
+import numpy as np
+
+# Smallest magnitude of an element of sigma, as in the pseudo-code.
+SIGMA_FLOOR = 0.00001
+
+# Offending indices named in an error message.
+MAX_REPORTED = 10
+
+_NAMES = ('x', 'y', 'sigma')
+
+
+def validate_fit_data(x, y, sigma=None, min_points=2,
+                      sigma_floor=SIGMA_FLOOR, finite=True):
+    """
+    Checks the data of a fit and returns it as 1-D float arrays.
+
+    Parameters:
+    - x (array_like): x values.
+    - y (array_like): y values.
+    - sigma (array_like, optional): Uncertainty values for y; all 1 if
+      None.
+    - min_points (int): Fewest points to fit.
+    - sigma_floor (float): Smallest magnitude of an element of sigma.
+    - finite (bool): Whether NaN and infinite values are errors.
+
+    Returns:
+    - tuple: x, y and sigma as 1-D arrays of float64 (float32 if all three
+      are float32), without copies of contiguous arrays of that dtype.
+
+    Defined Errors:
+    - Inputs not lists, tuples, arrays or buffers (TypeError).
+    - Elements not numeric (TypeError).
+    - Data not 1-D of the same length (TypeError).
+    - Fewer than min_points points (TypeError).
+    - Values not finite (ValueError).
+    - Element of sigma too small (ZeroDivisionError).
+    The errors of the last three name the offending indices and carry
+    them as their indices attribute.
+    """
+    given = (x, y, sigma) if sigma is not None else (x, y)
+    arrays = [_as_array(values, name) for values, name in zip(given, _NAMES)]
+    dtype = np.float32 if all(a.dtype == np.float32 for a in arrays) \
+        else np.float64
+    arrays = [np.ascontiguousarray(a, dtype=dtype) for a in arrays]
+
+    n = arrays[0].shape[0] if arrays[0].ndim == 1 else -1
+    if any(a.ndim != 1 or a.shape[0] != n for a in arrays):
+        raise TypeError("Data must be lists or 1-D arrays of same length, "
+                        f"not of shapes {[a.shape for a in arrays]}.")
+    if n < min_points:
+        raise TypeError("Not enough data to fit.")
+    if n == 0:    # Nothing to check, and no reductions of empty arrays.
+        ones = np.ones(0, dtype=dtype)
+        return arrays[0], arrays[1], arrays[2] if sigma is not None else ones
+
+    if finite:
+        for a, name in zip(arrays, _NAMES):
+            # The sum is finite if every value is; if it is not, either a
+            # value is not finite or the sum of large values overflowed,
+            # which only the search tells apart.
+            with np.errstate(over='ignore'):
+                total = a.sum()
+            if not np.isfinite(total):
+                bad = np.flatnonzero(~np.isfinite(a))
+                if bad.size:
+                    _raise(ValueError, f"Data {name} is not finite", bad)
+    if sigma is None:
+        return arrays[0], arrays[1], np.ones(n, dtype=dtype)
+
+    sigma = arrays[2]
+    # All of one sign and beyond the floor needs no temporary array; only
+    # mixed signs (which are valid, as only the magnitude matters) take
+    # the magnitudes.
+    if not (sigma.min() >= sigma_floor or sigma.max() <= -sigma_floor) \
+            and not np.abs(sigma).min() >= sigma_floor:
+        _raise(ZeroDivisionError, "Element of sigma is too small",
+               np.flatnonzero(~(np.abs(sigma) >= sigma_floor)))
+    return arrays[0], arrays[1], sigma
+
+
+def _as_array(values, name):
+    """
+    values as a numeric NumPy array, in place where possible.
+    """
+    if isinstance(values, (list, tuple, np.ndarray)) \
+            or hasattr(values, '__array__'):
+        array = values
+    elif isinstance(values, (str, bytes)):
+        raise TypeError("Input not in form of lists or arrays.")
+    else:
+        try:
+            view = memoryview(values)
+        except TypeError as exc:
+            raise TypeError("Input not in form of lists or arrays.") from exc
+        with view:
+            raw = view.format in ('B', 'b', 'c')
+        try:
+            array = np.frombuffer(values, dtype=np.float64) if raw \
+                else values
+        except ValueError as exc:
+            raise TypeError(f"Buffer {name} is not a whole number of "
+                            "float64 values.") from exc
+    try:
+        array = np.asarray(array)
+    except ValueError as exc:    # Ragged nested sequences.
+        raise TypeError("Data must be lists or 1-D arrays of same "
+                        "length.") from exc
+    if array.dtype.kind not in 'biuf':
+        _raise(TypeError, f"Elements of list or array {name} are not all "
+               "numeric", _non_numeric(values, array))
+    return array
+
+
+def _non_numeric(values, array):
+    """
+    Indices of the elements of values that are not real numbers.
+    """
+    items = values if isinstance(values, (list, tuple)) else array.ravel()
+    if array.dtype.kind != 'O' and items is not values:
+        return np.arange(array.size)
+    return np.array([i for i, item in enumerate(items)
+                     if not isinstance(item, numbers.Real)], dtype=np.intp)
+
+
+def _raise(error, message, indices):
+    """
+    Raises error with message and the first MAX_REPORTED indices.
+    """
+    shown = ', '.join(str(i) for i in indices[:MAX_REPORTED].tolist())
+    more = f' and {indices.size - MAX_REPORTED} more' \
+        if indices.size > MAX_REPORTED else ''
+    exc = error(f"{message} (indices {shown}{more}).")
+    exc.indices = indices
+    raise exc
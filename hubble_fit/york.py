@@ -0,0 +1,163 @@
+"""
+Straight-line fits with uncertainties in both x and y (York regression).
+
+Implements the solution of York et al. (2004, Am. J. Phys. 72, 367) for
+per-point uncertainties sigma_x and sigma_y and their correlation r. The
+slope b solves a fixed-point equation: given b, every point gets the
+weight W = 1 / (sigma_y**2 + b**2 sigma_x**2 - 2 b r sigma_x sigma_y),
+and the weighted sums of the deviations from the W-weighted means give
+the next b. Starting from the ordinary weighted fit of y on x, this
+converges in a few iterations. Every iteration is a handful of whole-array
+reductions over a whole batch of series, in the layouts of fit_batch.
+
+With sigma_x = 0 the result is the ordinary weighted fit of fit_batch.
+"""
+
+import numpy as np
+
+from .batch import FIT_DTYPE, fit_batch
+
+# Columns of the structured array returned by york_fit_batch.
+YORK_DTYPE = np.dtype(FIT_DTYPE.descr + [
+    ('iterations', np.intp),
+    ('converged', np.bool_),
+])
+
+
+def york_fit(x, y, sigma_x, sigma_y, r=0.0, tol=1e-10, max_iter=100):
+    """
+    Perform a least-squares linear fit with uncertainties in x and y.
+
+    Parameters:
+    - x (array_like): x values.
+    - y (array_like): y values.
+    - sigma_x (array_like): Uncertainty values for x (may be 0).
+    - sigma_y (array_like): Uncertainty values for y.
+    - r (float or array_like): Correlation of the x and y errors.
+    - tol (float): Largest relative change of the slope at convergence.
+    - max_iter (int): Largest number of iterations.
+
+    Returns:
+    - Dictionary of intercept, slope, error of each and quality of fit
+      (with the same keys as fit; chi_squared is York's weighted sum of
+      squared residuals), plus 'iterations' and 'converged'.
+
+    Defined Errors:
+    - As for york_fit_batch, with data not 1-D of the same length.
+    """
+    arrays = [np.asarray(i, dtype=np.float64) for i in (x, y, sigma_x,
+                                                        sigma_y)]
+    if any(a.ndim != 1 or a.shape != arrays[0].shape for a in arrays):
+        raise TypeError("Data must be 1-D arrays of same length.")
+    r = np.asarray(r, dtype=np.float64)
+    result = york_fit_batch(*(a[None] for a in arrays),
+                            r=r[None] if r.ndim else r, tol=tol,
+                            max_iter=max_iter)
+    return {name: result[name].item() for name in YORK_DTYPE.names}
+
+
+def york_fit_batch(x, y, sigma_x, sigma_y, offsets=None, r=0.0, tol=1e-10,
+                   max_iter=100):
+    """
+    Perform a least-squares linear fit with uncertainties in x and y on
+    every series of a batch.
+
+    Parameters:
+    - x, y, offsets: Series as for fit_batch.
+    - sigma_x, sigma_y (array_like): Uncertainties of x and y, same
+      layout as x.
+    - r (float or array_like): Correlation of the x and y errors, one
+      value or one per point.
+    - tol, max_iter: As for york_fit.
+
+    Returns:
+    - numpy structured array of length m with the fields of FIT_DTYPE and
+      'iterations' and 'converged' (see YORK_DTYPE).
+
+    Defined Errors:
+    - As for fit_batch, with sigma_y as sigma.
+    - sigma_x not of the same shape as x (TypeError).
+    - r outside [-1, 1], or max_iter less than 1 (ValueError).
+    """
+    if max_iter < 1:
+        raise ValueError("max_iter must be at least 1.")
+    x, y, sigma_x, sigma_y = (np.asarray(i, dtype=np.float64)
+                              for i in (x, y, sigma_x, sigma_y))
+    if sigma_x.shape != x.shape:
+        raise TypeError("Data must be arrays of same shape.")
+    r = np.broadcast_to(np.asarray(r, dtype=np.float64), x.shape)
+    if np.any(np.abs(r) > 1):
+        raise ValueError("Correlation must be between -1 and 1.")
+    # The ordinary weighted fit checks the input and gives the first slope.
+    start = fit_batch(x, y, sigma_y, offsets)
+    m = start.size
+
+    if offsets is None:
+        def total(values):    # Sum of every series.
+            return values.sum(axis=1)
+
+        def spread(values):    # One value per series to every point.
+            return values[:, None]
+    else:
+        ids = np.repeat(np.arange(m), np.diff(np.asarray(offsets)))
+
+        def total(values):
+            return np.bincount(ids, values, minlength=m)
+
+        def spread(values):
+            return values[ids]
+
+    var_x, var_y = sigma_x**2, sigma_y**2
+    cov = r * sigma_x * sigma_y
+    b = start['slope']
+    iterations = np.full(m, max_iter, dtype=np.intp)
+    converged = np.zeros(m, dtype=bool)
+    for iteration in range(1, max_iter + 1):
+        sums = _sums(x, y, var_x, var_y, cov, spread(b), total, spread)
+        weight, mean_x, mean_y, u, v, beta = sums
+        new = total(weight * beta * v) / total(weight * beta * u)
+        # Converged series keep their slope.
+        new = np.where(converged, b, new)
+        done = ~converged & (np.abs(new - b) <= tol * np.abs(new))
+        b = new
+        iterations[done] = iteration
+        converged |= done
+        if converged.all():
+            break
+
+    weight, mean_x, mean_y, u, v, beta = _sums(x, y, var_x, var_y, cov,
+                                               spread(b), total, spread)
+    sum_weight = total(weight)
+    a = mean_y - b * mean_x
+    # Fitted x values and their weighted mean give the uncertainties.
+    fitted_x = spread(mean_x) + beta
+    mean_fitted = total(weight * fitted_x) / sum_weight
+    spread_fitted = fitted_x - spread(mean_fitted)
+    sigma_b = np.sqrt(1.0 / total(weight * spread_fitted**2))
+    residual = y - spread(b) * x - spread(a)
+
+    result = np.empty(m, dtype=YORK_DTYPE)
+    result['intercept'] = a
+    result['slope'] = b
+    result['sigma_a'] = np.sqrt(1.0 / sum_weight
+                                + mean_fitted**2 * sigma_b**2)
+    result['sigma_b'] = sigma_b
+    result['chi_squared'] = total(weight * residual**2)
+    result['iterations'] = iterations
+    result['converged'] = converged
+    return result
+
+
+def _sums(x, y, var_x, var_y, cov, b, total, spread):
+    """
+    York's weights, weighted means, deviations and beta for the slopes b
+    (one per point).
+    """
+    weight = 1.0 / (var_y + b * b * var_x - 2.0 * b * cov)
+    sum_weight = total(weight)
+    mean_x = total(weight * x) / sum_weight
+    mean_y = total(weight * y) / sum_weight
+    u = x - spread(mean_x)
+    v = y - spread(mean_y)
+    beta = weight * (u * var_y + b * v * var_x - (b * u + v) * cov)
+    return weight, mean_x, mean_y, u, v, beta
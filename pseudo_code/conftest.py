@@ -0,0 +1,9 @@
+"""
+Puts the repository root on the path, so that linear_fit can import
+hubble_fit when the tests run from this directory.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
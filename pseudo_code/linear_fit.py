@@ -1,13 +1,26 @@
 """"
 Takes input data in the form of a csv with specified names of headers
 and producdes x, y, and errors in y as lists to use for analysis.
+Large files can be read in blocks of NumPy arrays with chunksize.
 Outputs intercept a, slope b, standard deviation of each, and a quality of fit.
 """
 
+import os
+import sys
+
 import pandas as pd
 
+if __name__ == "__main__":
+    # Only the script's directory is on the path; importers provide the
+    # repository root themselves.
+    sys.path.insert(0, os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), os.pardir))
+from hubble_fit.files import read_csv_blocks  # noqa: E402
+from hubble_fit.validation import validate_fit_data  # noqa: E402
+
 
-def read_data_from_csv(filename, x_h='x', y_h='y', sigma_h='sigma'):
+def read_data_from_csv(filename, x_h='x', y_h='y', sigma_h='sigma',
+                       chunksize=None):
     """
     Reads CSV and outputs x, y, and sigma.
     CSV must have headers named 'x','y','sigma' unless specified in input.
@@ -17,12 +30,20 @@ def read_data_from_csv(filename, x_h='x', y_h='y', sigma_h='sigma'):
     - x_h (str): Header of the column in csv coresponding to x data.
     - y_h (str): Header of the column in csv coresponding to y data.
     - sigma_h (str): Header of the column in csv coresponding to error data.
+    - chunksize (int, optional): If given, the file is read in blocks of
+      at most this many rows instead of all at once.
 
     Returns:
     - tuple: Three lists containing x, y, and sigma values.
+    - iterator (chunksize given): Tuples of three float64 NumPy arrays
+      (x, y, sigma) per block. Only one block is held in memory at a
+      time, so it can be fed straight to a streaming fit, e.g.
+      for block in read_data_from_csv(name, chunksize=10**6):
+          accumulator.update(*block)
 
     Defined Errors:
     - Inputs files or headers not strings.
+    - Chunksize not a positive integer.
     - CSV unable to be found.
     - Specified headers not in CSV.
     """
@@ -30,6 +51,8 @@ def read_data_from_csv(filename, x_h='x', y_h='y', sigma_h='sigma'):
     # Checks if input file and headers are strings.
     if not all(isinstance(i, str) for i in [filename, x_h, y_h, sigma_h]):
         raise TypeError("File path and headers must be strings.")
+    if chunksize is not None:
+        return read_csv_blocks(filename, [x_h, y_h, sigma_h], chunksize)
     # Tries to open CSV, if file not found, returns specified error.
     try:
         df = pd.read_csv(filename)
@@ -51,41 +74,37 @@ def fit(x, y, sigma):
     Perform a weighted least-squares linear fit to the given data.
 
     Parameters:
-    - x (list): List of x values.
-    - y (list): List of y values.
-    - sigma (list): List of uncertainty values for y.
+    - x (list or array_like): x values; lists, NumPy arrays (also
+      memory-mapped), pandas Series and buffers are accepted.
+    - y (list or array_like): y values.
+    - sigma (list or array_like): Uncertainty values for y.
 
     Returns:
     - Dictionary of intercept, slope, error of each, and quality of fit.
 
     Defined Errors:
-    - Inputs not lists.
+    - Inputs not lists or arrays.
     - Elements of lists not numeric.
     - Fewer x values than y or sigma.
     - Only one datapoint in lists.
+    - Values not finite (ValueError).
     - Error too small (divide by zero)
     - Sum of variance too small (divide by zero)
+    The errors of invalid elements name their indices; see
+    hubble_fit/validation.py.
     """
     # Error Checks:
-    # Checks if inputs are lists.
-    if not all(isinstance(i, list) for i in [x, y, sigma]):
-        raise TypeError("Input not in form of lists.")
-    # Checks if elements of lists are numeric.
-    if not all(isinstance(i, (int, float)) for m in [x, y, sigma] for i in m):
-        raise TypeError("Elements of list are not all numeric.")
-    # Verifies data are lists of same length.
-    if not all(len(i) == len(x) for i in [y, sigma]):
-        raise TypeError("Data must be lists of same length.")
-    # Makes sure there are at least 2 datapoint to fit.
-    if len(x) < 2:
-        raise TypeError("Not enough data to fit.")
+    # Type, numeric elements, equal lengths, at least 2 datapoints, finite
+    # values and no sigma close to 0 (divide by 0 error) are checked with
+    # whole-array operations, without copying float64 arrays.
+    x, y, sigma = validate_fit_data(x, y, sigma)
+    # Plain floats for the loops below.
+    x, y, sigma = x.tolist(), y.tolist(), sigma.tolist()
 
     n = len(x)
     variance_sum, s_x, s_y = 0.0, 0.0, 0.0
 
     for i in range(n):
-        if abs(sigma[i]) < 0.00001:    # Avoids divide by 0 error.
-            raise ZeroDivisionError("Element of sigma is too small.")
         variance_sum += 1.0 / sigma[i]**2
         s_x += x[i] * 1.0 / sigma[i]**2
         s_y += y[i] * 1.0 / sigma[i]**2
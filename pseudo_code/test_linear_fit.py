@@ -3,6 +3,7 @@ Provides unit testing for linear_fit.py functions.
 Tests cases of input errors for the read_data_from_csv function.
 Tests several potential errors and also positive results from fit function.
 """
+import numpy as np
 import pytest
 import pandas as pd
 import linear_fit as linfit
@@ -15,6 +16,8 @@ class TestReadCSV:
     - File path and headers not strings:
     - File not found.
     - Specified headers not in CSV.
+    - Chunked reading returns the same data as NumPy blocks.
+    - Chunked reading validates file, headers and chunksize up front.
     """
     def test_type_error(self):
         """
@@ -52,6 +55,48 @@ class TestReadCSV:
         # Reset test_placeholder.csv to blank file.
         pd.DataFrame().to_csv(test_csv, index=False)
 
+    def test_chunks(self):
+        """
+        Tests that chunked reading yields float64 blocks of at most
+        chunksize rows which join to the same data as a full read.
+        """
+        data = {
+            'r': [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+            'v': [-1.0, 1.0, 3.0, 5.0, 7.0, 9.0, 11.0],
+            'err': [0.1, 0.2, 0.1, 0.2, 0.1, 0.2, 0.1],
+            'name': ['a', 'b', 'c', 'd', 'e', 'f', 'g'],
+        }
+        test_csv = 'test_placeholder.csv'
+        pd.DataFrame(data).to_csv(test_csv, index=False)
+
+        blocks = list(linfit.read_data_from_csv(test_csv, 'r', 'v', 'err',
+                                                chunksize=3))
+        assert [len(b[0]) for b in blocks] == [3, 3, 1]
+        assert all(c.dtype == np.float64 for b in blocks for c in b)
+        full = linfit.read_data_from_csv(test_csv, 'r', 'v', 'err')
+        for column, expected in zip(zip(*blocks), full):
+            assert np.concatenate(column).tolist() == expected
+
+        # Reset test_placeholder.csv to blank file.
+        pd.DataFrame().to_csv(test_csv, index=False)
+
+    def test_chunk_errors(self):
+        """
+        Tests that chunked reading raises its errors at call time.
+        """
+        test_csv = 'test_placeholder.csv'
+        pd.DataFrame({'x': [1.0], 'y': [1.0]}).to_csv(test_csv, index=False)
+
+        with pytest.raises(TypeError, match="Chunksize"):
+            linfit.read_data_from_csv(test_csv, chunksize=0)
+        with pytest.raises(FileNotFoundError, match="File was not found."):
+            linfit.read_data_from_csv('non_existent_file.csv', chunksize=5)
+        with pytest.raises(KeyError, match="File headers not found in CSV."):
+            linfit.read_data_from_csv(test_csv, chunksize=5)
+
+        # Reset test_placeholder.csv to blank file.
+        pd.DataFrame().to_csv(test_csv, index=False)
+
 
 class TestFit:
     """
@@ -59,7 +104,9 @@ class TestFit:
     Tests the following cases:
      - Positive case CSV (valid data in CSV format).
      - Positive case CSV (valid data in CSV format).
+     - Positive case NumPy arrays and pandas Series.
      - Incorrect input type for lists.
+     - Data not finite.
      - Incorrect type of elements in lists.
      - Unequal data lengths.
      - Insufficent amount of data for fit.
@@ -120,6 +167,28 @@ class TestFit:
         }
         assert result == pytest.approx(expected_result, rel=1e-5)
 
+    def test_positive_arrays(self):
+        """
+        Test the function with NumPy arrays and pandas Series, which give
+        the same result as lists.
+        """
+        x = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+        y = [-1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
+        sigma = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+        expected_result = linfit.fit(x, y, sigma)
+        assert linfit.fit(np.array(x), pd.Series(y), np.array(sigma)) \
+            == pytest.approx(expected_result)
+
+    def test_not_finite(self):
+        """
+        Tests that function has expected error for NaN data.
+        """
+        x = [1, 2, 3]
+        y = [1, float('nan'), 3]
+        sigma = [1, 1, 1]
+        with pytest.raises(ValueError, match="not finite"):
+            linfit.fit(x, y, sigma)
+
     def test_invalid_type(self):
         """
         Tests that function has expected output for invalid input type.
@@ -4,6 +4,8 @@ with pytest in the command line such that
 the functionality of the fit_param module 
 may be confirmed. 
 """
+import array
+import numpy as np
 from fit_param import dict_maker
 
 def test_dict_maker():
@@ -37,4 +39,52 @@ def test_bad_data():
     assert dict_maker(y,x)==0
     x=[0,0,0,0]
     y=[0,0,0,0]
-    assert dict_maker(y,x)==0
\ No newline at end of file
+    assert dict_maker(y, x) == 0
+
+
+def test_array_input():
+    """
+    This test ensures that dict_maker gives the
+    same parameters for NumPy arrays and other
+    buffer objects as it does for lists.
+    """
+    x = [203, 303, 505, 607, 704]
+    y = [944, 1320, 2300, 2790, 3200]
+    expected = dict_maker(y, x)
+    inputs = [(np.array(y, dtype=float), np.array(x, dtype=float)),
+              (np.array(y, dtype=np.float32), np.array(x)),
+              (array.array('d', y), memoryview(array.array('d', x)))]
+    for v, d in inputs:
+        params = dict_maker(v, d)
+        for key, value in expected.items():
+            assert np.isclose(params[key], value, rtol=1e-6)
+    assert dict_maker(np.zeros(4), np.zeros(4)) == 0
+
+
+def test_large_integers():
+    """
+    This test ensures that large integer positions
+    without spread still give the zero denominator
+    error instead of an infinite fit.
+    """
+    x = [100000001] * 3
+    y = [1, 2, 3]
+    assert dict_maker(y, x) == 0
+    assert dict_maker(y, np.array(x)) == 0
+    params = dict_maker(y, [100000001, 100000002, 100000003])
+    assert params["Slope"] == 1
+
+
+def test_integer_overflow():
+    """
+    This test ensures that the sums of large integer
+    positions do not overflow, so that the fit is as
+    exact as for small integers.
+    """
+    x = [3000000000 + i for i in range(5)]
+    y = [2 * i + 7 for i in x]
+    for v, d in [(y, x), (np.array(y), np.array(x))]:
+        params = dict_maker(v, d)
+        assert params["Slope"] == 2
+        assert params["Y-intercept"] == 7
+        assert params["Uncertainty of Slope"] == 0